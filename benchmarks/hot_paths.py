@@ -0,0 +1,265 @@
+###############################################################################
+#
+#   Benchmark of the fetch, parse and decide paths of the signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, made up provider responses from realistic to
+#             oversized are parsed, indexed and looked up, with the time and
+#             memory per stage, runs on CPython and on the MicroPython unix
+#             port, results are saved and compared between versions
+###############################################################################
+#
+#   python benchmarks/hot_paths.py [--repeat N] [--save FILE] [--compare FILE]
+#   micropython benchmarks/hot_paths.py [--repeat N] [--save FILE] [--compare FILE]
+#
+import io
+import gc
+import sys
+import json
+import time
+
+# the folder of this file without os.path, which the MicroPython unix port does not have
+BENCH_DIR = __file__.rsplit('/', 1)[0] if '/' in __file__ else '.'
+sys.path.insert(0, BENCH_DIR + '/../source')
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+if not MICROPYTHON:
+    sys.path.insert(0, BENCH_DIR + '/../fleet')
+    import pc_compat
+    pc_compat.install()
+    import tracemalloc
+import config # import the config file
+config.run_system = 'pc'
+import calendar_index
+import json_stream
+import providers
+import dates
+import leds
+
+# name -> (provider, container types, days), the types after the known ones are unknown to the provider
+PAYLOADS = (
+    ('twente-realistic', 'twente',  4,   120),
+    ('twente-large',     'twente', 10,   3*365),
+    ('twente-oversized', 'twente', 24,  10*365),
+    ('rd4-realistic',    'rd4',     5,   120),
+    ('rd4-large',        'rd4',    10,   3*365),
+    ('rd4-oversized',    'rd4',    24,  10*365),
+)
+# first day of every payload
+FIRST_DAY = dates.day_number(2026, 1, 1)
+# a result is a regression when it is this much slower or larger than the saved one,
+# the times vary more between runs than the memory
+REGRESSION_TIME   = 1.25
+REGRESSION_MEMORY = 1.10
+
+
+
+#------------------------------------------------------------------------------
+def type_names(provider_name, type_count):
+    '''
+        the container types of a made up response, the known ones of the provider first,
+        Twente has numbers as types
+    '''
+    names = [name for name in providers.PROVIDERS[provider_name]['types']]
+    names.sort()
+    for number in range(len(names), type_count):
+        names.append(str(100 + number) if provider_name == 'twente' else 'unknown_' + str(number))
+    return names[0:type_count]
+
+
+
+#------------------------------------------------------------------------------
+def make_payload(provider_name, type_count, day_count):
+    '''
+        a response like the provider gives it, every type is picked up every 7 to 14 days,
+        with the extra fields the real responses have
+    '''
+    names = type_names(provider_name, type_count)
+    parts = []
+    if provider_name == 'twente':
+        for position in range(type_count):
+            pickup_dates = []
+            for day in range(FIRST_DAY + position % 7, FIRST_DAY + day_count, 7 + position % 8):
+                pickup_dates.append('"' + dates.day_string(day) + 'T00:00:00"')
+            parts.append('{"pickupDates":[' + ','.join(pickup_dates) + '],"pickupType":' + names[position]
+                         + ',"_pickupTypeText":"TYPE' + str(position) + '","description":"Container ' + str(position)
+                         + ' wordt opgehaald, zet hem voor 07:30 aan de weg"}')
+        return ('{"dataList":[' + ','.join(parts) + '],"completeness":0,"status":true,"messages":[]}').encode()
+    for day in range(FIRST_DAY, FIRST_DAY + day_count):
+        for position in range(type_count):
+            if (day - FIRST_DAY - position % 7) % (7 + position % 8) == 0:
+                parts.append('{"id":' + str(day * 100 + position) + ',"date":"' + dates.day_string(day) + '","type":"'
+                             + names[position] + '","description":"Ophaaldag ' + names[position] + '"}')
+    return ('{"success":true,"data":{"items":[[' + ','.join(parts) + ']]}}').encode()
+
+
+
+#------------------------------------------------------------------------------
+def stage_parse(provider, payload):
+    days = {}
+    json_stream.parse(io.BytesIO(payload), providers.make_scanner(provider, days))
+    return days
+
+
+
+#------------------------------------------------------------------------------
+def stage_decide(index, day_count):
+    '''
+        the LED decision of every day in the payload, like update_display
+    '''
+    for day in range(FIRST_DAY, FIRST_DAY + day_count):
+        today     = calendar_index.lookup(index, day)
+        tomorrow  = calendar_index.lookup(index, day + 1)
+        day_after = calendar_index.lookup(index, day + 2)
+        if leds.show(today, tomorrow, day_after) and today:
+            calendar_index.mask_to_colors(today)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def stage_dates(day_count):
+    '''
+        the date strings of the provider APIs and back, for every day in the payload
+    '''
+    for day in range(FIRST_DAY, FIRST_DAY + day_count):
+        dates.day_number_from_string(dates.day_string(day))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def stage_end_to_end(provider, payload):
+    '''
+        one refresh: parse, index and the lights of the first day
+    '''
+    index = calendar_index.build_index(stage_parse(provider, payload))
+    return stage_decide(index, 1)
+
+
+
+#------------------------------------------------------------------------------
+def measure_memory(function, *args):
+    '''
+        (peak, kept) bytes of one call, on MicroPython with the collector off so peak is
+        everything that was allocated
+    '''
+    gc.collect()
+    if MICROPYTHON:
+        gc.disable()
+        before = gc.mem_alloc()
+        result = function(*args)
+        peak = gc.mem_alloc() - before
+        gc.enable()
+        gc.collect()
+        kept = gc.mem_alloc() - before
+    else:
+        tracemalloc.start()
+        result = function(*args)
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    result = None
+    return peak, kept
+
+
+
+#------------------------------------------------------------------------------
+def measure(function, args, repeat):
+    '''
+        best and mean microseconds over repeat calls, and the memory of one call
+    '''
+    times = []
+    for count in range(repeat):
+        start = time.ticks_us()
+        function(*args)
+        times.append(time.ticks_diff(time.ticks_us(), start))
+    peak, kept = measure_memory(function, *args)
+    return {'us' : min(times), 'mean_us' : sum(times) // len(times), 'peak' : peak, 'kept' : kept}
+
+
+
+#------------------------------------------------------------------------------
+def run(repeat):
+    '''
+        all stages for all payloads, returns name -> measurement
+    '''
+    results = {}
+    for name, provider_name, type_count, day_count in PAYLOADS:
+        provider = providers.PROVIDERS[provider_name]
+        payload = make_payload(provider_name, type_count, day_count)
+        days = stage_parse(provider, payload)
+        index = calendar_index.build_index(days)
+        print('BENCH :', name, len(payload), 'bytes,', len(index), 'pickup days')
+        results[name + '/parse']      = measure(stage_parse, (provider, payload), repeat)
+        results[name + '/index']      = measure(calendar_index.build_index, (days,), repeat)
+        results[name + '/decide']     = measure(stage_decide, (index, day_count), repeat)
+        results[name + '/dates']      = measure(stage_dates, (day_count,), repeat)
+        results[name + '/end_to_end'] = measure(stage_end_to_end, (provider, payload), repeat)
+        payload = None
+        gc.collect()
+    return results
+
+
+
+#------------------------------------------------------------------------------
+def report(results, baseline):
+    '''
+        print the results, compared with a baseline when given
+        returns the number of regressions
+    '''
+    regressions = 0
+    print('BENCH : stage                          best us   mean us   peak B   kept B')
+    for key in sorted(results):
+        entry = results[key]
+        line = '%-32s %9d %9d %8d %8d' % (key, entry['us'], entry['mean_us'], entry['peak'], entry['kept'])
+        if key in baseline:
+            old = baseline[key]
+            time_ratio = entry['us'] / max(1, old['us'])
+            peak_ratio = entry['peak'] / max(1, old['peak'])
+            line += '   time x%.2f peak x%.2f' % (time_ratio, peak_ratio)
+            if (time_ratio > REGRESSION_TIME) or (peak_ratio > REGRESSION_MEMORY):
+                line += '  REGRESSION'
+                regressions += 1
+        print('BENCH :', line)
+    return regressions
+
+
+
+#------------------------------------------------------------------------------
+def main(argv):
+    repeat    = 5
+    save_file = ''
+    baseline  = {}
+    position  = 1
+    while position < len(argv):
+        if argv[position] == '--repeat':
+            repeat = int(argv[position + 1])
+        elif argv[position] == '--save':
+            save_file = argv[position + 1]
+        elif argv[position] == '--compare':
+            with open(argv[position + 1]) as f:
+                baseline = json.load(f)['results']
+        else:
+            print('usage: hot_paths.py [--repeat N] [--save FILE] [--compare FILE]')
+            return 2
+        position += 2
+    print('BENCH :', sys.implementation.name, sys.version.split()[0], ', repeat', repeat)
+    results = run(repeat)
+    regressions = report(results, baseline)
+    if save_file:
+        with open(save_file, 'w') as f:
+            json.dump({'implementation' : sys.implementation.name, 'version' : sys.version.split()[0],
+                       'repeat' : repeat, 'results' : results}, f)
+        print('BENCH : saved in', save_file)
+    if regressions:
+        print('BENCH :', regressions, 'regressions against the baseline')
+        return 1
+    return 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,169 @@
+###############################################################################
+#
+#   Startup benchmark of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the time to the first LEDs and the heap after the
+#             imports, for the source, .mpy and frozen builds
+#           - relay and status server only measured when the config turns them on
+###############################################################################
+#
+#   on the board, with the build that is on the flash or in the firmware:
+#       mpremote run benchmarks/startup.py
+#   on the MicroPython unix port or CPython, against a folder with the modules:
+#       micropython benchmarks/startup.py [--path DIR] [--save FILE]
+#
+#   every run measures one cold start, so run it once per build and after a reset
+#
+import gc
+import sys
+import json
+import time
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+ON_BOARD    = sys.platform == 'rp2'
+if not MICROPYTHON:
+    import tracemalloc
+# the folder of this file without os.path, which the MicroPython unix port does not have,
+# mpremote run gives no __file__ at all
+BENCH_FILE = globals().get('__file__', '')
+BENCH_DIR  = BENCH_FILE.rsplit('/', 1)[0] if '/' in BENCH_FILE else '.'
+
+# the modules main.py imports before the LEDs are restored, and the network modules after that
+BOOT_MODULES    = ('config', 'log', 'calendar_store', 'calendar_index', 'leds', 'scheduler', 'snapshot', 'dates', 'telemetry')
+NETWORK_MODULES = ('http_client', 'providers', 'ntp', 'wifi')
+
+
+
+#------------------------------------------------------------------------------
+def heap_used():
+    gc.collect()
+    if MICROPYTHON:
+        return gc.mem_alloc()
+    return tracemalloc.get_traced_memory()[0]
+
+
+
+#------------------------------------------------------------------------------
+def build_kind(module):
+    '''
+        source, mpy or frozen, from where a module was imported from
+    '''
+    module_file = getattr(module, '__file__', '')
+    if (not module_file) or module_file.startswith('.frozen'):
+        return 'frozen'
+    return 'mpy' if module_file.endswith('.mpy') else 'source'
+
+
+
+#------------------------------------------------------------------------------
+def import_modules(names):
+    '''
+        import the modules one by one, returns name -> (microseconds, heap bytes kept)
+    '''
+    result = {}
+    for name in names:
+        heap_before = heap_used()
+        start = time.ticks_us()
+        __import__(name)
+        result[name] = (time.ticks_diff(time.ticks_us(), start), heap_used() - heap_before)
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def network_modules(config):
+    '''
+        the network modules main.py imports with this config, the relay and the status server
+        only when they are turned on
+    '''
+    names = NETWORK_MODULES
+    if (config.relay_mode != 'off') or config.fleet_url:
+        names += ('relay',)
+    if config.status_port:
+        names += ('status_server',)
+    return names
+
+
+
+#------------------------------------------------------------------------------
+def first_leds():
+    '''
+        the boot path of main.py up to the first LEDs: LED engine, stored calendar and snapshot
+        returns microseconds
+    '''
+    import leds
+    import calendar_store
+    import snapshot
+    start = time.ticks_us()
+    leds.init()
+    leds.set_system(10)
+    calendar_store.load()
+    if snapshot.load():
+        leds.show(snapshot.lights_today, snapshot.lights_tomorrow, snapshot.lights_day_after)
+    return time.ticks_diff(time.ticks_us(), start)
+
+
+
+#------------------------------------------------------------------------------
+def main(argv):
+    save_file = ''
+    path      = ''
+    position  = 1
+    while position < len(argv):
+        if argv[position] == '--path':
+            path = argv[position + 1]
+        elif argv[position] == '--save':
+            save_file = argv[position + 1]
+        else:
+            print('usage: startup.py [--path DIR] [--save FILE]')
+            return 2
+        position += 2
+    if not ON_BOARD:
+        sys.path.insert(0, path or BENCH_DIR + '/../source')
+        if not MICROPYTHON:
+            sys.path.insert(1, BENCH_DIR + '/../fleet')
+            import pc_compat
+            pc_compat.install()
+            tracemalloc.start()
+    heap_start = heap_used()
+    import_start = time.ticks_us()
+    boot = import_modules(BOOT_MODULES[0:1])
+    if not ON_BOARD:
+        # no LED pins off the board
+        sys.modules['config'].run_system = 'pc'
+    boot.update(import_modules(BOOT_MODULES[1:]))
+    boot_us = time.ticks_diff(time.ticks_us(), import_start)
+    leds_us = first_leds()
+    heap_boot = heap_used()
+    network_names = network_modules(sys.modules['config'])
+    network = import_modules(network_names)
+    heap_all = heap_used()
+    kind = build_kind(sys.modules['config'])
+    heap_free = gc.mem_free() if hasattr(gc, 'mem_free') else 0
+
+    print('STARTUP :', sys.implementation.name, sys.platform, ',', kind, 'build')
+    print('STARTUP : module                us     heap B')
+    for name in BOOT_MODULES + network_names:
+        entry = boot[name] if name in boot else network[name]
+        print('STARTUP : %-16s %8d %8d' % (name, entry[0], entry[1]))
+    print('STARTUP : boot modules imported in', boot_us, 'us, first LEDs after', boot_us + leds_us, 'us')
+    print('STARTUP : heap after the boot modules', heap_boot - heap_start, 'bytes, after all modules', heap_all - heap_start,
+          'bytes,', heap_free, 'bytes free')
+    if save_file:
+        with open(save_file, 'w') as f:
+            json.dump({'implementation' : sys.implementation.name, 'platform' : sys.platform, 'build' : kind,
+                       'first_led_us' : boot_us + leds_us, 'boot_import_us' : boot_us,
+                       'heap_boot' : heap_boot - heap_start, 'heap_all' : heap_all - heap_start,
+                       'heap_free' : heap_free,
+                       'modules' : {name : list(entry) for name, entry in list(boot.items()) + list(network.items())}}, f)
+        print('STARTUP : saved in', save_file)
+    return 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
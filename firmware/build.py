@@ -0,0 +1,126 @@
+###############################################################################
+#
+#   Precompiled and frozen builds of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, compiles the device code to .mpy files or writes
+#             a manifest to freeze it into a MicroPython firmware image, the
+#             main script becomes the module tower behind a one line main.py
+###############################################################################
+#
+#   python firmware/build.py mpy    [--out DIR] [--config-source] [--opt N] [--mpy-cross PATH]
+#   python firmware/build.py frozen [--out DIR] [--config-source] [--opt N]
+#
+import os
+import sys
+import glob
+import shutil
+import argparse
+import subprocess
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source')
+# MicroPython only runs main.py from source, so the main script is built as this module
+MAIN_MODULE = 'tower'
+MAIN_STUB = ('# the signal tower is in the precompiled module ' + MAIN_MODULE + ', see firmware/build.py\n'
+             'import ' + MAIN_MODULE + '\n')
+# architecture of the PI pico, only matters for native code
+MARCH = 'armv6m'
+
+
+
+#------------------------------------------------------------------------------
+def source_modules(config_source):
+    '''
+        (module name, source file) of the device code, config is left out when it stays a .py file
+    '''
+    modules = []
+    for path in sorted(glob.glob(os.path.join(SOURCE_DIR, '*.py'))):
+        name = os.path.basename(path)[:-3]
+        if (name == 'config') and config_source:
+            continue
+        modules.append((MAIN_MODULE if name == 'main' else name, path))
+    return modules
+
+
+
+#------------------------------------------------------------------------------
+def write_common(out_dir, config_source):
+    '''
+        the one line main.py and, when asked, config.py as source so it can be edited on the flash
+    '''
+    with open(os.path.join(out_dir, 'main.py'), 'w') as f:
+        f.write(MAIN_STUB)
+    if config_source:
+        shutil.copy(os.path.join(SOURCE_DIR, 'config.py'), os.path.join(out_dir, 'config.py'))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def build_mpy(args):
+    '''
+        compile every module with mpy-cross, the result is copied to the flash as it is
+    '''
+    mpy_cross = shutil.which(args.mpy_cross)
+    if mpy_cross == None:
+        print('BUILD :', args.mpy_cross, 'not found, install it with pip install mpy-cross or build it from the MicroPython tree')
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    total = 0
+    for name, path in source_modules(args.config_source):
+        target = os.path.join(args.out, name + '.mpy')
+        result = subprocess.run([mpy_cross, '-march=' + MARCH, '-O' + str(args.opt), '-s', name + '.py', '-o', target, path])
+        if result.returncode != 0:
+            print('BUILD : mpy-cross failed on', path)
+            return 1
+        total += os.path.getsize(target)
+        print('BUILD : %-16s %6d bytes source %6d bytes mpy' % (name, os.path.getsize(path), os.path.getsize(target)))
+    write_common(args.out, args.config_source)
+    print('BUILD :', total, 'bytes of .mpy in', args.out)
+    print('BUILD : copy to the board with   mpremote fs cp -r', os.path.join(args.out, '.'), ':')
+    print('BUILD : remove the old .py files first, a .py file is imported before the .mpy file with the same name')
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def build_frozen(args):
+    '''
+        write the modules and a manifest for a firmware build, the modules are then in the flash
+        of the firmware image and their bytecode does not use the heap
+    '''
+    modules_dir = os.path.join(args.out, 'modules')
+    os.makedirs(modules_dir, exist_ok=True)
+    lines = ['# frozen modules of the trash container signal tower, made by firmware/build.py',
+             'include("$(BOARD_DIR)/manifest.py")']
+    for name, path in source_modules(args.config_source):
+        shutil.copy(path, os.path.join(modules_dir, name + '.py'))
+        lines.append('module("' + name + '.py", base_path="' + os.path.abspath(modules_dir) + '", opt=' + str(args.opt) + ')')
+    manifest = os.path.join(args.out, 'manifest.py')
+    with open(manifest, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    write_common(args.out, args.config_source)
+    print('BUILD : manifest in', manifest)
+    print('BUILD : build the firmware in the MicroPython tree with')
+    print('BUILD :     make -C ports/rp2 BOARD=RPI_PICO_W FROZEN_MANIFEST=' + os.path.abspath(manifest))
+    print('BUILD : flash firmware.uf2 and copy only', os.path.join(args.out, 'main.py'), 'to the board',
+          '(and config.py when it is kept as source)')
+    return 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='precompiled or frozen build of the signal tower')
+    parser.add_argument('kind', choices=['mpy', 'frozen'])
+    parser.add_argument('--out', default='', help='output folder, default firmware/build-<kind>')
+    parser.add_argument('--config-source', action='store_true', help='keep config.py as source to edit it on the board')
+    parser.add_argument('--opt', type=int, default=0, choices=[0, 1, 2, 3],
+                        help='optimisation level, 3 also drops the line numbers of the tracebacks')
+    parser.add_argument('--mpy-cross', default='mpy-cross', help='mpy-cross of the MicroPython version on the board')
+    args = parser.parse_args()
+    if not args.out:
+        args.out = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build-' + args.kind)
+    sys.exit(build_mpy(args) if args.kind == 'mpy' else build_frozen(args))
@@ -0,0 +1,220 @@
+###############################################################################
+#
+#   Fleet calendar service for the trash container signal towers
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, runs on a PC, fetches the calendars of many
+#             addresses side by side with the provider code of the towers and
+#             serves every tower its calendar as a small relay frame
+###############################################################################
+import json
+import time
+import asyncio
+import argparse
+
+# the device code is shared with the towers
+import pc_compat
+pc_compat.install()
+import config # import the config file
+import calendar_index
+import http_client
+import providers
+import relay
+import dates
+
+# the configured addresses, the same address is only fetched once
+addresses     = {}      # address key -> address dict
+devices       = {}      # device name -> address key
+# precomputed frames, address key -> (time.time() until which it is valid, frame)
+cache         = {}
+stats         = {
+    'refreshed'  : 0,   # successful calendar fetches
+    'failed'     : 0,   # failed calendar fetches, the old frame is kept until it expires
+    'evicted'    : 0,   # frames dropped after their time to live
+    'hits'       : 0,   # frames served
+    'misses'     : 0,   # requests for an unknown or expired calendar
+}
+ttl_seconds   = 24*60*60
+
+
+
+#------------------------------------------------------------------------------
+def load_addresses(device_list):
+    '''
+        register the devices and their addresses, identical addresses share one key
+        device_list : list of dicts with a 'device' name and the address fields, see providers.config_address
+        returns the number of different addresses
+    '''
+    for entry in device_list:
+        address = dict(entry)
+        name = address.pop('device', '')
+        key = providers.address_key(address)
+        addresses[key] = address
+        if name:
+            devices[name] = key
+    print('FLEET :', len(device_list), 'devices,', len(addresses), 'different addresses')
+    return len(addresses)
+
+
+
+#------------------------------------------------------------------------------
+def evict(now):
+    '''
+        drop the frames that are past their time to live
+    '''
+    for key in [key for key in cache if cache[key][0] <= now]:
+        del cache[key]
+        stats['evicted'] += 1
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def due_keys(now, margin):
+    '''
+        the addresses without a frame or with a frame that expires within margin seconds
+    '''
+    return [key for key in addresses if (key not in cache) or (cache[key][0] - margin <= now)]
+
+
+
+#------------------------------------------------------------------------------
+async def refresh_one(key, day_today, limit):
+    '''
+        fetch the calendar of one address and precompute its frame
+        returns True when the frame was updated
+    '''
+    async with limit:
+        now = int(time.time())
+        try:
+            days, horizon = await providers.fetch_calendar(addresses[key], day_today)
+        except Exception as e:
+            print('FLEET : error for', hex(key), ':', e)
+            days = {}
+    if len(days) == 0:
+        stats['failed'] += 1
+        return False
+    cache[key] = (now + ttl_seconds, relay.pack_frame(key, 0, now, horizon, calendar_index.build_index(days)))
+    stats['refreshed'] += 1
+    return True
+
+
+
+#------------------------------------------------------------------------------
+async def refresh(keys, concurrency):
+    '''
+        fetch the calendars of the addresses, at most concurrency addresses at the same time,
+        the connections to a provider are kept alive and shared
+        returns (refreshed, failed, seconds)
+    '''
+    start = time.monotonic()
+    limit = asyncio.Semaphore(concurrency)
+    day_today = dates.read_clock()[1]
+    results = await asyncio.gather(*[refresh_one(key, day_today, limit) for key in keys])
+    http_client.close_all()
+    refreshed = results.count(True)
+    return refreshed, len(results) - refreshed, time.monotonic() - start
+
+
+
+#------------------------------------------------------------------------------
+def lookup(path):
+    '''
+        frame for /calendar/<address key in hex> or /device/<name>, None when unknown or expired
+    '''
+    parts = path.strip('/').split('/')
+    key = None
+    if (len(parts) == 2) and (parts[0] == 'calendar'):
+        try:
+            key = int(parts[1], 16)
+        except ValueError:
+            return None
+    elif (len(parts) == 2) and (parts[0] == 'device'):
+        key = devices.get(parts[1])
+    entry = cache.get(key)
+    if (entry == None) or (entry[0] <= time.time()):
+        return None
+    return entry[1]
+
+
+
+#------------------------------------------------------------------------------
+async def handle(reader, writer):
+    '''
+        serve the towers, keep-alive so a tower can ask again over the same connection
+    '''
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, version = request_line.decode().split()
+            while True:
+                line = await reader.readline()
+                if (not line) or (line == b'\r\n'):
+                    break
+            content_type = b'application/octet-stream'
+            if path == '/status':
+                status, data = 200, json.dumps(dict(stats, addresses=len(addresses), cached=len(cache))).encode()
+                content_type = b'application/json'
+            else:
+                data = lookup(path) if method == 'GET' else None
+                if data == None:
+                    stats['misses'] += 1
+                    status, data = 404, b''
+                else:
+                    stats['hits'] += 1
+                    status = 200
+            writer.write(b'HTTP/1.1 ' + str(status).encode() + (b' OK' if status == 200 else b' Not Found')
+                         + b'\r\nContent-Type: ' + content_type + b'\r\nContent-Length: ' + str(len(data)).encode()
+                         + b'\r\n\r\n' + data)
+            await writer.drain()
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+
+#------------------------------------------------------------------------------
+async def run(args):
+    '''
+        serve the frames and keep them fresh
+    '''
+    global ttl_seconds
+    ttl_seconds = int(args.ttl_hours * 60*60)
+    with open(args.addresses) as f:
+        load_addresses(json.load(f))
+    server = await asyncio.start_server(handle, args.host, args.port)
+    print('FLEET : serving on', args.host, args.port)
+    while True:
+        now = time.time()
+        evict(now)
+        keys = due_keys(now, ttl_seconds // 4)
+        if keys:
+            refreshed, failed, seconds = await refresh(keys, args.concurrency)
+            print('FLEET : refreshed', refreshed, 'addresses,', failed, 'failed, in', round(seconds, 2), 'seconds')
+        await asyncio.sleep(args.check_minutes * 60)
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='fleet calendar service for the trash container signal towers')
+    parser.add_argument('addresses', help='json file with a list of {"device": name, "company": ..., address fields}')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--concurrency', type=int, default=16, help='addresses fetched at the same time')
+    parser.add_argument('--ttl-hours', type=float, default=24, help='time to live of a fetched calendar')
+    parser.add_argument('--check-minutes', type=float, default=15, help='how often to look for calendars to refresh')
+    parser.add_argument('--provider-url', action='append', default=[], metavar='NAME=URL',
+                        help='other server for a provider, like rd4=http://127.0.0.1:8081 for the mock provider')
+    args = parser.parse_args()
+    for setting in args.provider_url:
+        name, base_url = setting.split('=', 1)
+        providers.set_base_url(name, base_url)
+    # keep as many idle connections per provider as there are fetches at the same time
+    config.http_max_parallel = args.concurrency
+    asyncio.run(run(args))
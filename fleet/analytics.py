@@ -0,0 +1,281 @@
+###############################################################################
+#
+#   Fleet schedule analytics for the trash container signal towers
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, runs on a PC with NumPy, loads a year of pickups
+#             of all fleet addresses with the provider code of the towers into
+#             one address x day array of color masks and answers the pickups
+#             per day and color, the next pickup of every address and the
+#             changes between two snapshots without Python loops
+###############################################################################
+#
+#   python fleet/analytics.py fleet/addresses_example.json [--first-day YYYY-MM-DD] [--days N]
+#                             [--save FILE] [--compare FILE] [--top N] [--provider-url NAME=URL]
+#
+import json
+import time
+import asyncio
+import argparse
+
+import numpy as np
+
+# the device code is shared with the towers
+import pc_compat
+pc_compat.install()
+import config # import the config file
+import calendar_index
+import http_client
+import providers
+import dates
+import log
+
+COLOR_COUNT = len(calendar_index.COLOR_NAMES)
+ALL_COLORS  = (1 << COLOR_COUNT) - 1
+# day number of an address without a pickup in the snapshot
+NO_PICKUP   = -1
+
+# a snapshot is a dict with
+#   keys      : uint32 array of the address keys, see providers.address_key, one row per address
+#   first_day : day number of the first column
+#   masks     : uint8 array address x day with the color mask of every pickup day, 0 for no pickup
+#   valid     : bool array, False for an address whose calendar could not be fetched
+
+
+
+#------------------------------------------------------------------------------
+def new_snapshot(keys, first_day, day_count):
+    '''
+        an empty snapshot for the address keys, day_count days from day number first_day
+    '''
+    return {'keys'      : np.array(keys, dtype=np.uint32),
+            'first_day' : first_day,
+            'masks'     : np.zeros((len(keys), day_count), dtype=np.uint8),
+            'valid'     : np.zeros(len(keys), dtype=bool)}
+
+
+
+#------------------------------------------------------------------------------
+def add_calendar(snapshot, row, days):
+    '''
+        put the dict day number -> color mask of a provider response in a row,
+        the days outside the snapshot are left out
+    '''
+    columns = np.fromiter(days.keys(), dtype=np.int32, count=len(days)) - snapshot['first_day']
+    values  = np.fromiter(days.values(), dtype=np.uint8, count=len(days))
+    inside  = (columns >= 0) & (columns < snapshot['masks'].shape[1])
+    snapshot['masks'][row, columns[inside]] = values[inside]
+    snapshot['valid'][row] = True
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_row(snapshot, row, address, limit):
+    '''
+        fetch the pickups of one address for the days of the snapshot
+        returns True when the row was filled
+    '''
+    first_day = snapshot['first_day']
+    last_day  = first_day + snapshot['masks'].shape[1] - 1
+    days = {}
+    async with limit:
+        try:
+            result = await providers.fetch_range(address, first_day, last_day, days)
+        except Exception as e:
+            print('ANALYTICS : error for', hex(providers.address_key(address)), ':', e)
+            result = -1
+    if result < 0:
+        return False
+    add_calendar(snapshot, row, days)
+    return True
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_snapshot(addresses, first_day, day_count, concurrency):
+    '''
+        fetch the calendars of the addresses, at most concurrency addresses at the same time
+        addresses : address key -> address dict, like aggregator.addresses
+        returns (snapshot, seconds)
+    '''
+    start = time.monotonic()
+    keys = list(addresses)
+    snapshot = new_snapshot(keys, first_day, day_count)
+    limit = asyncio.Semaphore(concurrency)
+    await asyncio.gather(*[fetch_row(snapshot, row, addresses[keys[row]], limit) for row in range(len(keys))])
+    http_client.close_all()
+    return snapshot, time.monotonic() - start
+
+
+
+#------------------------------------------------------------------------------
+def save_snapshot(snapshot, file_name):
+    np.savez_compressed(file_name, keys=snapshot['keys'], first_day=snapshot['first_day'],
+                        masks=snapshot['masks'], valid=snapshot['valid'])
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def read_snapshot(file_name):
+    with np.load(file_name) as data:
+        return {'keys'      : data['keys'],
+                'first_day' : int(data['first_day']),
+                'masks'     : data['masks'],
+                'valid'     : data['valid']}
+
+
+
+#------------------------------------------------------------------------------
+def pickups_per_day(snapshot):
+    '''
+        the number of addresses with a pickup of every color on every day
+        returns an int array day x color, the colors in the bit order of calendar_index.COLOR_NAMES
+    '''
+    masks = snapshot['masks'][snapshot['valid']]
+    counts = np.empty((masks.shape[1], COLOR_COUNT), dtype=np.int32)
+    for bit in range(COLOR_COUNT):
+        counts[:, bit] = np.count_nonzero(masks & (1 << bit), axis=0)
+    return counts
+
+
+
+#------------------------------------------------------------------------------
+def busiest_days(counts, first_day, top):
+    '''
+        the top day numbers with the most pickups of all colors together, busiest first
+        counts : result of pickups_per_day
+    '''
+    totals = counts.sum(axis=1)
+    columns = np.argsort(totals, kind='stable')[::-1][0:top]
+    return first_day + columns, totals[columns]
+
+
+
+#------------------------------------------------------------------------------
+def next_pickup(snapshot, day, color_mask=ALL_COLORS):
+    '''
+        the first pickup of one of the colors of color_mask from day number day on, for every address
+        returns (day numbers, color masks), NO_PICKUP and 0 for an address without one in the snapshot
+    '''
+    masks = snapshot['masks']
+    start = min(max(day - snapshot['first_day'], 0), masks.shape[1])
+    hits = (masks[:, start:] & color_mask) != 0
+    columns = hits.argmax(axis=1)
+    found = hits.any(axis=1) & snapshot['valid']
+    rows = np.arange(len(masks))
+    next_days = np.where(found, snapshot['first_day'] + start + columns, NO_PICKUP)
+    next_masks = np.where(found, masks[rows, np.minimum(start + columns, masks.shape[1] - 1)], 0).astype(np.uint8)
+    return next_days, next_masks
+
+
+
+#------------------------------------------------------------------------------
+def changes(old, new):
+    '''
+        the pickup days that differ between two snapshots, for the addresses that are valid in both
+        and the days that both cover
+        returns (address keys, day numbers, old color masks, new color masks), one entry per changed day
+    '''
+    keys, old_rows, new_rows = np.intersect1d(old['keys'], new['keys'], assume_unique=True, return_indices=True)
+    both = old['valid'][old_rows] & new['valid'][new_rows]
+    keys, old_rows, new_rows = keys[both], old_rows[both], new_rows[both]
+    first_day = max(old['first_day'], new['first_day'])
+    last_day  = min(old['first_day'] + old['masks'].shape[1], new['first_day'] + new['masks'].shape[1])
+    if last_day <= first_day:
+        empty = np.zeros(0, dtype=np.uint8)
+        return keys[0:0], np.zeros(0, dtype=np.int64), empty, empty
+    before = old['masks'][old_rows, first_day - old['first_day']:last_day - old['first_day']]
+    after  = new['masks'][new_rows, first_day - new['first_day']:last_day - new['first_day']]
+    rows, columns = np.nonzero(before != after)
+    return keys[rows], first_day + columns, before[rows, columns], after[rows, columns]
+
+
+
+#------------------------------------------------------------------------------
+def colors_text(mask):
+    return '+'.join(calendar_index.mask_to_colors(int(mask))) or '-'
+
+
+
+#------------------------------------------------------------------------------
+def report(snapshot, top, day_today):
+    '''
+        print the busiest days and the next pickups of the fleet
+    '''
+    counts = pickups_per_day(snapshot)
+    print('ANALYTICS : busiest days            ' + ' '.join(['%6s' % name for name in calendar_index.COLOR_NAMES]))
+    for day, total in zip(*busiest_days(counts, snapshot['first_day'], top)):
+        print('ANALYTICS : %s %6d pickups  ' % (dates.day_string(int(day)), total)
+              + ' '.join(['%6d' % count for count in counts[day - snapshot['first_day']]]))
+    next_days, next_masks = next_pickup(snapshot, day_today)
+    waiting = next_days[next_days != NO_PICKUP] - day_today
+    print('ANALYTICS : next pickup today', np.count_nonzero(waiting == 0), ', tomorrow', np.count_nonzero(waiting == 1),
+          ', within a week', np.count_nonzero(waiting < 7), ', none in the snapshot', np.count_nonzero(next_days == NO_PICKUP))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def report_changes(old, new, top):
+    '''
+        print the changes of new against an older snapshot
+    '''
+    keys, change_days, before, after = changes(old, new)
+    print('ANALYTICS :', len(keys), 'changed pickup days at', len(np.unique(keys)), 'addresses,',
+          len(np.setdiff1d(new['keys'], old['keys'])), 'new and', len(np.setdiff1d(old['keys'], new['keys'])),
+          'dropped addresses')
+    for position in range(min(top, len(keys))):
+        print('ANALYTICS : %08x %s %s -> %s' % (keys[position], dates.day_string(int(change_days[position])),
+                                                colors_text(before[position]), colors_text(after[position])))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def run(args):
+    with open(args.addresses) as f:
+        device_list = json.load(f)
+    addresses = {}
+    for entry in device_list:
+        address = dict(entry)
+        address.pop('device', '')
+        addresses[providers.address_key(address)] = address
+    day_today = dates.read_clock()[1]
+    first_day = dates.day_number_from_string(args.first_day) if args.first_day else day_today
+    snapshot, seconds = await fetch_snapshot(addresses, first_day, args.days, args.concurrency)
+    print('ANALYTICS :', np.count_nonzero(snapshot['valid']), 'of', len(addresses), 'addresses loaded in',
+          round(seconds, 2), 'seconds,', args.days, 'days from', dates.day_string(first_day))
+    report(snapshot, args.top, max(day_today, first_day))
+    if args.compare:
+        report_changes(read_snapshot(args.compare), snapshot, args.top)
+    if args.save:
+        save_snapshot(snapshot, args.save)
+        print('ANALYTICS : saved in', args.save)
+    return 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='pickup analytics over the addresses of the fleet')
+    parser.add_argument('addresses', help='json file with a list of {"device": name, "company": ..., address fields}')
+    parser.add_argument('--first-day', default='', help='first day YYYY-MM-DD, default today')
+    parser.add_argument('--days', type=int, default=366, help='days in the snapshot')
+    parser.add_argument('--concurrency', type=int, default=16, help='addresses fetched at the same time')
+    parser.add_argument('--top', type=int, default=10, help='busiest days and changes to print')
+    parser.add_argument('--save', default='', help='save the snapshot to this .npz file')
+    parser.add_argument('--compare', default='', help='print the changes against a saved snapshot')
+    parser.add_argument('--provider-url', action='append', default=[], metavar='NAME=URL',
+                        help='other server for a provider, like rd4=http://127.0.0.1:8081 for the mock provider')
+    args = parser.parse_args()
+    for setting in args.provider_url:
+        name, base_url = setting.split('=', 1)
+        providers.set_base_url(name, base_url)
+    config.http_max_parallel = args.concurrency
+    # one line per provider request is too much for a whole fleet
+    log.level = max(log.level, log.WARNING)
+    asyncio.run(run(args))
@@ -0,0 +1,206 @@
+###############################################################################
+#
+#   Benchmark of the fleet schedule analytics
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, a year of made up pickups of thousands of
+#             addresses parsed with the provider code, the NumPy queries of
+#             analytics.py against the same queries as Python loops
+###############################################################################
+#
+#   python fleet/analytics_benchmark.py [--addresses N] [--days N] [--changed FRACTION] [--repeat N]
+#
+import io
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+import mock_provider
+import analytics
+from benchmark import make_devices
+import json_stream
+import providers
+import dates
+
+
+
+#------------------------------------------------------------------------------
+def make_response(address, first_day, last_day):
+    '''
+        the mock provider answers of an address for the days, as bytes like they come from the network
+    '''
+    if address['company'] == 'twente':
+        form = {'companyCode' : [address['company_code']], 'uniqueAddressID' : [address['address_id']],
+                'startDate' : [dates.day_string(first_day)], 'endDate' : [dates.day_string(last_day)]}
+        return [json.dumps(mock_provider.twente_response(form)).encode()]
+    responses = []
+    for request in providers.requests_for(address, first_day, last_day):
+        year, month = request[0].split('-')
+        query = {'year' : [year], 'month' : [month], 'postal_code' : [address['postal_code']],
+                 'house_number' : [address['house_number']]}
+        responses.append(json.dumps(mock_provider.rd4_response(query)).encode())
+    return responses
+
+
+
+#------------------------------------------------------------------------------
+def parse_calendars(responses):
+    '''
+        address key -> dict day number -> color mask, with the streaming parser of the towers
+    '''
+    calendars = {}
+    for key, company, payloads in responses:
+        days = {}
+        for payload in payloads:
+            json_stream.parse(io.BytesIO(payload), providers.make_scanner(providers.PROVIDERS[company], days))
+        calendars[key] = days
+    return calendars
+
+
+
+#------------------------------------------------------------------------------
+def build_snapshot(calendars, first_day, day_count):
+    snapshot = analytics.new_snapshot(list(calendars), first_day, day_count)
+    for row, days in enumerate(calendars.values()):
+        analytics.add_calendar(snapshot, row, days)
+    return snapshot
+
+
+
+#------------------------------------------------------------------------------
+def change_some(snapshot, fraction):
+    '''
+        a copy of the snapshot where a part of the addresses moved all pickups one day later
+    '''
+    changed = dict(snapshot, masks=snapshot['masks'].copy())
+    rows = np.random.default_rng(1).choice(len(changed['keys']), int(len(changed['keys']) * fraction), replace=False)
+    changed['masks'][rows] = np.roll(changed['masks'][rows], 1, axis=1)
+    return changed
+
+
+
+#------------------------------------------------------------------------------
+def to_calendars(snapshot):
+    '''
+        the snapshot back as address key -> dict day number -> color mask, for the loops
+    '''
+    calendars = {}
+    for row in range(len(snapshot['keys'])):
+        columns = np.nonzero(snapshot['masks'][row])[0]
+        calendars[int(snapshot['keys'][row])] = dict(zip((snapshot['first_day'] + columns).tolist(),
+                                                         snapshot['masks'][row, columns].tolist()))
+    return calendars
+
+
+
+#------------------------------------------------------------------------------
+def loop_pickups_per_day(calendars, first_day, day_count):
+    counts = [[0] * analytics.COLOR_COUNT for column in range(day_count)]
+    for days in calendars.values():
+        for day, mask in days.items():
+            if 0 <= day - first_day < day_count:
+                for bit in range(analytics.COLOR_COUNT):
+                    if mask & (1 << bit):
+                        counts[day - first_day][bit] += 1
+    return counts
+
+
+
+#------------------------------------------------------------------------------
+def loop_next_pickup(calendars, day_today):
+    result = {}
+    for key, days in calendars.items():
+        result[key] = min([day for day in days if (day >= day_today) and days[day]], default=analytics.NO_PICKUP)
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def loop_changes(old, new):
+    result = []
+    for key in old:
+        if key in new:
+            for day in sorted(set(old[key]) | set(new[key])):
+                if old[key].get(day, 0) != new[key].get(day, 0):
+                    result.append((key, day, old[key].get(day, 0), new[key].get(day, 0)))
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def measure(function, args, repeat):
+    '''
+        best milliseconds over repeat calls
+    '''
+    best = None
+    for count in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if (best == None) or (seconds < best) else best
+    return best * 1000
+
+
+
+#------------------------------------------------------------------------------
+def run(args):
+    first_day = dates.day_number(2026, 1, 1)
+    last_day  = first_day + args.days - 1
+    addresses = {}
+    for entry in make_devices(args.addresses, 0):
+        entry.pop('device')
+        addresses[providers.address_key(entry)] = entry
+    responses = [(key, address['company'], make_response(address, first_day, last_day)) for key, address in addresses.items()]
+    print('BENCH :', len(addresses), 'addresses,', args.days, 'days,', sum([len(payload) for entry in responses for payload in entry[2]]),
+          'bytes of responses, numpy', np.__version__)
+
+    start = time.perf_counter()
+    calendars = parse_calendars(responses)
+    parse_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    snapshot = build_snapshot(calendars, first_day, args.days)
+    fill_ms = (time.perf_counter() - start) * 1000
+    print('BENCH : parse %.1f ms, fill the array %.1f ms, %d bytes of masks' % (parse_ms, fill_ms, snapshot['masks'].nbytes))
+
+    changed = change_some(snapshot, args.changed)
+    # the RD4 months go past the last day, the loops compare the days of the snapshot like the arrays
+    old_calendars = to_calendars(snapshot)
+    changed_calendars = to_calendars(changed)
+    day_today = first_day + args.days // 2
+    # the loops and the arrays have to agree before their times mean anything
+    counts = analytics.pickups_per_day(snapshot)
+    assert counts.tolist() == loop_pickups_per_day(calendars, first_day, args.days)
+    next_days = analytics.next_pickup(snapshot, day_today)[0]
+    assert dict(zip(snapshot['keys'].tolist(), next_days.tolist())) == loop_next_pickup(calendars, day_today)
+    assert len(analytics.changes(snapshot, changed)[0]) == len(loop_changes(old_calendars, changed_calendars))
+
+    print('BENCH : query                    numpy ms    loop ms   speedup')
+    for name, numpy_call, loop_call in (
+            ('pickups per day and color', (analytics.pickups_per_day, (snapshot,)),
+                                          (loop_pickups_per_day, (calendars, first_day, args.days))),
+            ('next pickup per address',   (analytics.next_pickup, (snapshot, day_today)),
+                                          (loop_next_pickup, (calendars, day_today))),
+            ('changes between snapshots', (analytics.changes, (snapshot, changed)),
+                                          (loop_changes, (old_calendars, changed_calendars)))):
+        numpy_ms = measure(numpy_call[0], numpy_call[1], args.repeat)
+        loop_ms  = measure(loop_call[0], loop_call[1], args.repeat)
+        print('BENCH : %-26s %9.2f %10.2f %8.1fx' % (name, numpy_ms, loop_ms, loop_ms / max(numpy_ms, 0.001)))
+    print('BENCH :', len(analytics.changes(snapshot, changed)[0]), 'changed pickup days')
+    return 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='fleet analytics with numpy against python loops')
+    parser.add_argument('--addresses', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=366)
+    parser.add_argument('--changed', type=float, default=0.01, help='part of the addresses with a changed schedule')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(run(args))
@@ -0,0 +1,76 @@
+###############################################################################
+#
+#   Throughput benchmark of the fleet service against the mock provider
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, refreshes a number of made up addresses and prints
+#             the addresses refreshed per second for several concurrency levels
+###############################################################################
+import io
+import sys
+import asyncio
+import argparse
+import contextlib
+
+import mock_provider
+import aggregator
+
+
+
+#------------------------------------------------------------------------------
+def make_devices(count, duplicates):
+    '''
+        made up devices, half Twente and half RD4, every duplicates-th device shares the address of the one before
+    '''
+    device_list = []
+    for number in range(count):
+        address_number = number - 1 if (duplicates and number % duplicates == duplicates - 1) else number
+        if address_number % 2 == 0:
+            device_list.append({'device' : 'tower' + str(number), 'company' : 'twente',
+                                'company_code' : 'mock', 'address_id' : str(100000 + address_number)})
+        else:
+            device_list.append({'device' : 'tower' + str(number), 'company' : 'rd4',
+                                'postal_code' : '6269NR', 'house_number' : str(address_number)})
+    return device_list
+
+
+
+#------------------------------------------------------------------------------
+async def run(args):
+    server = await mock_provider.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    mock_provider.latency = args.latency
+    for name in aggregator.providers.PROVIDERS:
+        aggregator.providers.set_base_url(name, 'http://127.0.0.1:' + str(port))
+    with contextlib.redirect_stdout(io.StringIO()):
+        unique = aggregator.load_addresses(make_devices(args.devices, args.duplicates))
+    print('BENCH :', args.devices, 'devices,', unique, 'different addresses, latency', args.latency, 's')
+    for concurrency in args.concurrency:
+        aggregator.cache.clear()
+        aggregator.config.http_max_parallel = concurrency
+        served = mock_provider.requests_served
+        # the provider code prints every request, that is not part of the measurement
+        with contextlib.redirect_stdout(io.StringIO()):
+            refreshed, failed, seconds = await aggregator.refresh(list(aggregator.addresses), concurrency)
+        print('BENCH : concurrency', concurrency, ':', refreshed, 'refreshed,', failed, 'failed,',
+              mock_provider.requests_served - served, 'provider requests,', round(seconds, 3), 's,',
+              round(refreshed / seconds, 1), 'addresses/s')
+    # let the mock see the closed keep-alive connections before it stops
+    await asyncio.sleep(0.1)
+    server.close()
+    await server.wait_closed()
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='throughput of the fleet service against the mock provider')
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--duplicates', type=int, default=4, help='every n-th device shares an address, 0 for none')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds before every mock answer')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    sys.exit(0)
@@ -0,0 +1,173 @@
+###############################################################################
+#
+#   Mock of the Twente and RD4 provider APIs for the fleet service
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, answers like twentemilieuapi.ximmio.com and
+#             data.rd4.nl with made up but stable pickup dates for every
+#             address, so the aggregator and the benchmark run offline
+#           - bytes served and a failure rate for the PC simulation
+#           - ETag on every answer and 304 for a matching If-None-Match
+###############################################################################
+import json
+import random
+import asyncio
+import argparse
+import binascii
+from urllib.parse import urlsplit, parse_qs
+
+# the device code is shared with the towers
+import pc_compat
+pc_compat.install()
+import dates
+
+# every container type is picked up every 14 days, on a day that depends on the address
+TWENTE_TYPES = (0, 1, 2, 10)
+RD4_TYPES    = ('residual_waste', 'gft', 'paper', 'pmd')
+
+# the answer takes this long, set from the command line
+latency      = 0.0
+# part of the requests that get a 503 answer
+failure_rate = 0.0
+requests_served = 0
+bytes_served    = 0
+not_modified    = 0
+
+
+
+#------------------------------------------------------------------------------
+def pickup_days(address_text, first_day, last_day, type_count):
+    '''
+        made up pickup days of an address between two day numbers
+        returns a list of (type position, day number)
+    '''
+    seed = binascii.crc32(address_text.encode())
+    pickups = []
+    for position in range(type_count):
+        offset = (seed + 3 * position) % 14
+        day = first_day - (first_day - offset) % 14
+        while day <= last_day:
+            if day >= first_day:
+                pickups.append((position, day))
+            day += 14
+    return pickups
+
+
+
+#------------------------------------------------------------------------------
+def twente_response(form):
+    '''
+        body of a GetCalendar answer for the form fields of the request
+    '''
+    address_text = form['companyCode'][0] + '/' + form['uniqueAddressID'][0]
+    first_day = dates.day_number_from_string(form['startDate'][0])
+    last_day  = dates.day_number_from_string(form['endDate'][0])
+    data_list = []
+    for position in range(len(TWENTE_TYPES)):
+        data_list.append({'pickupType' : TWENTE_TYPES[position], 'pickupDates' : []})
+    for position, day in pickup_days(address_text, first_day, last_day, len(TWENTE_TYPES)):
+        data_list[position]['pickupDates'].append(dates.day_string(day) + 'T00:00:00')
+    return {'dataList' : data_list, 'status' : True}
+
+
+
+#------------------------------------------------------------------------------
+def rd4_response(query):
+    '''
+        body of a waste-calendar answer for one month
+    '''
+    year  = int(query['year'][0])
+    month = int(query['month'][0])
+    address_text = query['postal_code'][0] + '/' + query['house_number'][0]
+    first_day = dates.day_number(year, month, 1)
+    last_day  = dates.day_number(year, month, dates.days_in_month(year, month))
+    items = []
+    for position, day in sorted(pickup_days(address_text, first_day, last_day, len(RD4_TYPES)), key=lambda pickup: pickup[1]):
+        items.append({'date' : dates.day_string(day), 'type' : RD4_TYPES[position]})
+    return {'success' : True, 'data' : {'items' : [items]}}
+
+
+
+#------------------------------------------------------------------------------
+async def handle(reader, writer):
+    '''
+        serve the requests of one connection, keep-alive like the real providers
+    '''
+    global requests_served, bytes_served, not_modified
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, version = request_line.decode().split()
+            length = 0
+            if_none_match = ''
+            while True:
+                line = await reader.readline()
+                if (not line) or (line == b'\r\n'):
+                    break
+                name, value = line.decode().split(':', 1)
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+                elif name.strip().lower() == 'if-none-match':
+                    if_none_match = value.strip()
+            body = await reader.readexactly(length) if length else b''
+            url = urlsplit(target)
+            if latency:
+                await asyncio.sleep(latency)
+            if random.random() < failure_rate:
+                status, answer = 503, {'error' : 'unavailable'}
+            elif (method == 'POST') and url.path.endswith('/GetCalendar'):
+                status, answer = 200, twente_response(parse_qs(body.decode()))
+            elif (method == 'GET') and url.path.rstrip('/').endswith('/waste-calendar'):
+                status, answer = 200, rd4_response(parse_qs(url.query))
+            else:
+                status, answer = 404, {'error' : 'not found'}
+            data = json.dumps(answer).encode()
+            etag = '"%08x"' % binascii.crc32(data)
+            if (status == 200) and (if_none_match == etag):
+                status, data = 304, b''
+                not_modified += 1
+            data = (b'HTTP/1.1 ' + str(status).encode() + b' OK\r\nContent-Type: application/json\r\n'
+                    + b'ETag: ' + etag.encode() + b'\r\n'
+                    + b'Content-Length: ' + str(len(data)).encode() + b'\r\n\r\n' + data)
+            writer.write(data)
+            await writer.drain()
+            requests_served += 1
+            bytes_served += len(request_line) + length + len(data)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+
+#------------------------------------------------------------------------------
+async def start(host, port):
+    '''
+        start the mock provider, returns the asyncio server
+    '''
+    return await asyncio.start_server(handle, host, port)
+
+
+
+#------------------------------------------------------------------------------
+async def serve(host, port):
+    server = await start(host, port)
+    print('MOCK : serving on', host, port)
+    async with server:
+        await server.serve_forever()
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='mock of the Twente and RD4 provider APIs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before every answer')
+    args = parser.parse_args()
+    latency = args.latency
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,56 @@
+###############################################################################
+#
+#   MicroPython functions for the device code when it runs on a PC
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the tick functions of time and asyncio.sleep_ms
+#             that the shared device modules use
+###############################################################################
+import os
+import sys
+import time
+import asyncio
+
+# folder with the device code that is shared with the towers
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source')
+
+
+
+#------------------------------------------------------------------------------
+def ticks_diff(end, start):
+    '''
+        like time.ticks_diff, the ticks on a PC do not wrap around
+    '''
+    return end - start
+
+
+
+#------------------------------------------------------------------------------
+async def sleep_ms(ms):
+    '''
+        like asyncio.sleep_ms of MicroPython
+    '''
+    await asyncio.sleep(ms / 1000)
+
+
+
+#------------------------------------------------------------------------------
+def install():
+    '''
+        add the missing MicroPython functions and put the device code on the path,
+        call before importing any device module
+    '''
+    if not hasattr(time, 'ticks_ms'):
+        time.ticks_ms   = lambda: time.monotonic_ns() // 1000000
+        time.ticks_us   = lambda: time.monotonic_ns() // 1000
+        time.ticks_diff = ticks_diff
+        time.sleep_ms   = lambda ms: time.sleep(ms / 1000)
+    if not hasattr(asyncio, 'sleep_ms'):
+        asyncio.sleep_ms = sleep_ms
+    if SOURCE_DIR not in sys.path:
+        sys.path.insert(0, SOURCE_DIR)
+    import config # import the config file
+    config.run_system = 'pc'
+    return 0
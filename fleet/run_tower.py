@@ -0,0 +1,41 @@
+###############################################################################
+#
+#   The signal tower on a PC
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, runs the unchanged main.py with CPython on the
+#             real clock, with run_system = 'pc' and the MicroPython functions
+#             of pc_compat, for trying the calendar and LED logic without a board
+###############################################################################
+#
+#   python fleet/run_tower.py [--provider-url NAME=URL]
+#
+import os
+import sys
+import time
+import runpy
+import argparse
+
+import pc_compat
+pc_compat.install()
+import config # import the config file
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='run main.py of the signal tower on a PC')
+    parser.add_argument('--provider-url', action='append', default=[], metavar='NAME=URL',
+                        help='other server for a provider, like rd4=http://127.0.0.1:8081 for the mock provider')
+    args = parser.parse_args()
+    for setting in args.provider_url:
+        name, base_url = setting.split('=', 1)
+        config.provider_urls[name] = base_url
+    # the RTC of MicroPython counts whole seconds, the snapshot and calendar files store them as integers
+    wall_clock = time.time
+    time.time = lambda: int(wall_clock())
+    # the files of the tower (calendar, snapshot, log) are written in the current folder
+    sys.argv = [os.path.join(pc_compat.SOURCE_DIR, 'main.py')]
+    runpy.run_path(sys.argv[0], run_name='__main__')
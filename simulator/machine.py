@@ -0,0 +1,141 @@
+###############################################################################
+#
+#   Fake machine module for the PC simulation of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, Pin, Timer and RTC on the virtual clock, the pin
+#             values and timers are kept so the simulation can check the LEDs
+#           - reset_cause, power on after a power cut, watchdog after a deepsleep
+#             or machine.reset() like the rp2 port
+###############################################################################
+import time
+import calendar
+
+import virtual_clock
+
+# pin id -> value of every pin the device set up
+pins   = {}
+# the timers the device started, the simulation calls their callbacks itself
+timers = []
+# made up id of the board, set by the simulation
+board_id = b'\xe6\x61\x41\x04\x03\x33\x22\x11'
+
+# values of machine.reset_cause(), the numbers of the rp2 port
+PWRON_RESET = 1
+WDT_RESET   = 3
+# cause of the last reboot, set by reset_board()
+last_reset  = PWRON_RESET
+
+
+
+#------------------------------------------------------------------------------
+def reset_board(cause=PWRON_RESET):
+    '''
+        forget the pins and timers and start the ticks again, at every reboot of the simulated device
+    '''
+    global last_reset
+    pins.clear()
+    del timers[:]
+    last_reset = cause
+    virtual_clock.restart_ticks()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+class Pin:
+    IN  = 0
+    OUT = 1
+
+    def __init__(self, pin_id, mode=-1, value=None):
+        self.pin_id = pin_id
+        pins[pin_id] = 0 if value == None else value
+
+
+    def value(self, value=None):
+        if value == None:
+            return pins[self.pin_id]
+        pins[self.pin_id] = 1 if value else 0
+
+
+    def on(self):
+        self.value(1)
+
+
+    def off(self):
+        self.value(0)
+
+
+
+#------------------------------------------------------------------------------
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, timer_id=-1, **settings):
+        self.callback = None
+        self.freq     = 0
+        timers.append(self)
+        if settings:
+            self.init(**settings)
+
+
+    def init(self, mode=PERIODIC, freq=-1, period=-1, callback=None):
+        self.freq     = freq if freq > 0 else 1000 // max(1, period)
+        self.callback = callback
+
+
+    def deinit(self):
+        self.callback = None
+
+
+
+#------------------------------------------------------------------------------
+class RTC:
+    def datetime(self, value=None):
+        '''
+            (year, month, day, weekday, hours, minutes, seconds, subseconds), weekday 0 is monday
+        '''
+        if value == None:
+            tm = time.gmtime(int(virtual_clock.rtc_time()))
+            return (tm[0], tm[1], tm[2], tm[6], tm[3], tm[4], tm[5], 0)
+        virtual_clock.set_rtc(calendar.timegm((value[0], value[1], value[2], value[4], value[5], value[6])))
+
+
+
+#------------------------------------------------------------------------------
+def lightsleep(ms=0):
+    virtual_clock.advance(ms / 1000, True)
+
+
+
+#------------------------------------------------------------------------------
+def deepsleep(ms=0):
+    # the board reboots at wake up, with a reset that puts the RTC back
+    raise virtual_clock.DeepSleep(ms)
+
+
+
+#------------------------------------------------------------------------------
+def reset():
+    raise virtual_clock.DeepSleep(0)
+
+
+
+#------------------------------------------------------------------------------
+def reset_cause():
+    return last_reset
+
+
+
+#------------------------------------------------------------------------------
+def unique_id():
+    return board_id
+
+
+
+#------------------------------------------------------------------------------
+def freq(hz=None):
+    return 125000000
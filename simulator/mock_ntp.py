@@ -0,0 +1,69 @@
+###############################################################################
+#
+#   Mock time server for the PC simulation of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, answers SNTP queries with the true time of the
+#             virtual clock
+###############################################################################
+import random
+import struct
+import asyncio
+
+import virtual_clock
+
+NTP_DELTA = 2208988800
+
+# set by the simulation
+latency      = 0.02     # seconds before the answer
+failure_rate = 0.0      # part of the queries that get no answer
+queries      = 0
+bytes_served = 0
+
+
+
+#------------------------------------------------------------------------------
+def ntp_time(seconds):
+    '''
+        unix seconds as NTP seconds and fraction
+    '''
+    whole = int(seconds)
+    return whole + NTP_DELTA, int((seconds - whole) * (1 << 32)) & 0xffffffff
+
+
+
+#------------------------------------------------------------------------------
+class Protocol(asyncio.DatagramProtocol):
+    def connection_made(self, transport):
+        self.transport = transport
+
+
+    def datagram_received(self, data, address):
+        global queries
+        queries += 1
+        if (len(data) < 48) or (random.random() < failure_rate):
+            return
+        asyncio.get_event_loop().call_later(latency, self.answer, address)
+
+
+    def answer(self, address):
+        global bytes_served
+        rx_seconds, rx_fraction = ntp_time(virtual_clock.true_time)
+        msg = bytearray(48)
+        msg[0] = 0x24   # version 4, server
+        msg[1] = 2      # stratum
+        struct.pack_into('!IIII', msg, 32, rx_seconds, rx_fraction, rx_seconds, rx_fraction)
+        self.transport.sendto(msg, address)
+        bytes_served += 96
+
+
+
+#------------------------------------------------------------------------------
+async def start(host, port):
+    '''
+        start the mock time server, returns its transport
+    '''
+    transport, protocol = await asyncio.get_event_loop().create_datagram_endpoint(Protocol, local_addr=(host, port))
+    return transport
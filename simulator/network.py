@@ -0,0 +1,122 @@
+###############################################################################
+#
+#   Fake network module for the PC simulation of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, a WLAN that connects after a few seconds of the
+#             virtual clock and fails a set part of the connects
+#           - faster connects to a known access point and with a static IP,
+#             scan and power management settings
+###############################################################################
+import random
+
+import virtual_clock
+
+STA_IF = 0
+AP_IF  = 1
+
+STAT_IDLE           = 0
+STAT_CONNECTING     = 1
+STAT_GOT_IP         = 3
+STAT_CONNECT_FAIL   = -1
+STAT_NO_AP_FOUND    = -2
+
+SSID    = b'simulation'
+BSSID   = b'\x02\x00\x00\x00\x00\x01'
+CHANNEL = 6
+
+# set by the simulation
+connect_seconds = 3.0   # scan, association and DHCP
+scan_seconds    = 1.5   # a scan of all channels, the board waits for it
+dhcp_seconds    = 1.0   # part of connect_seconds, not needed with a static IP
+known_seconds   = 1.0   # part of connect_seconds, not needed when the access point is given
+failure_rate    = 0.0   # part of the connects that fail
+rng             = random.Random(1)
+connects        = 0
+failures        = 0
+seconds_active  = 0.0   # time the radio was switched on
+
+
+
+#------------------------------------------------------------------------------
+class WLAN:
+    PM_NONE        = 0x00a11140
+    PM_PERFORMANCE = 0x00111022
+    PM_POWERSAVE   = 0x00a11142
+
+    def __init__(self, interface=STA_IF):
+        self.interface  = interface
+        self.is_active  = False
+        self.active_since = 0.0
+        self.state      = STAT_IDLE
+        self.ready_time = 0.0
+        self.will_fail  = False
+        self.settings   = {}
+
+
+    def active(self, value=None):
+        global seconds_active
+        if value == None:
+            return self.is_active
+        if value and not self.is_active:
+            self.active_since = virtual_clock.true_time
+        elif self.is_active and not value:
+            seconds_active += virtual_clock.true_time - self.active_since
+            self.state = STAT_IDLE
+        self.is_active = bool(value)
+
+
+    def connect(self, ssid=None, key=None, bssid=None):
+        global connects
+        connects += 1
+        seconds = connect_seconds
+        if bssid == BSSID:
+            seconds -= known_seconds
+        if 'ifconfig' in self.settings:
+            seconds -= dhcp_seconds
+        self.state      = STAT_CONNECTING
+        self.ready_time = virtual_clock.true_time + seconds
+        self.will_fail  = rng.random() < failure_rate
+
+
+    def scan(self):
+        virtual_clock.advance(scan_seconds, False)
+        return [(SSID, BSSID, CHANNEL, -60, 3, False)]
+
+
+    def disconnect(self):
+        self.state = STAT_IDLE
+
+
+    def status(self, param=None):
+        global failures
+        if param != None:
+            # 'rssi' and the like
+            return -60
+        if (self.state == STAT_CONNECTING) and (virtual_clock.true_time >= self.ready_time):
+            if self.will_fail:
+                failures += 1
+                self.state = STAT_CONNECT_FAIL
+            else:
+                self.state = STAT_GOT_IP
+        return self.state
+
+
+    def isconnected(self):
+        return self.status() == STAT_GOT_IP
+
+
+    def ifconfig(self, settings=None):
+        if settings != None:
+            self.settings['ifconfig'] = settings
+            return None
+        return self.settings.get('ifconfig', ('127.0.0.1', '255.0.0.0', '127.0.0.1', '127.0.0.1'))
+
+
+    def config(self, *names, **settings):
+        if settings:
+            self.settings.update(settings)
+            return None
+        return self.settings.get(names[0], 0)
@@ -0,0 +1,290 @@
+###############################################################################
+#
+#   PC simulation of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, runs the unchanged main.py on a fake machine and
+#             network with mock time and provider servers on a virtual clock,
+#             checks the LEDs twice a day against the mock calendar and
+#             reports the API use, the awake time and every wrong day
+#           - the RTC is reset at a deepsleep wake up like on the rp2 port
+###############################################################################
+import os
+import sys
+import math
+import time
+import argparse
+import tempfile
+import importlib
+import contextlib
+
+# the fleet folder has pc_compat and the mock provider
+sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fleet'))
+import pc_compat
+pc_compat.install()
+import virtual_clock
+virtual_clock.install()
+import machine
+import network
+import mock_ntp
+import mock_provider
+import config # import the config file
+import dates
+import leds
+import providers
+
+# LED checks at these seconds after the local midnight, just after the changeover and at noon
+CHECK_SECONDS = (60, 12*60*60)
+
+address_text = ''
+type_list    = ()
+checks       = 0
+wrong        = []       # (true time, expected masks, seen masks)
+boots        = {'start' : 0, 'deepsleep' : 0, 'power cut' : 0}
+
+
+
+#------------------------------------------------------------------------------
+def setup(args, provider_port, ntp_port):
+    '''
+        the config of the simulated tower
+    '''
+    global address_text, type_list
+    config.run_system           = 'pico'
+    config.wifi_ssid            = 'simulation'
+    config.time_hosts           = ['127.0.0.1']
+    config.ntp_port             = ntp_port
+    config.ntp_servers_per_sync = 1
+    config.telemetry_serial     = False
+    config.status_port          = 0
+    config.relay_mode           = 'off'
+    config.fleet_url            = ''
+    config.dual_core            = False
+    config.sleep_mode           = args.sleep_mode
+    config.led_show_day_after   = args.day_after
+    if args.sleep_mode != 'sleep':
+        # a blinking system LED keeps the board out of lightsleep
+        config.led_system_ok_freq = 0
+    config.trash_company        = args.company
+    config.provider_urls        = {args.company : 'http://127.0.0.1:' + str(provider_port)}
+    if args.company == 'twente':
+        config.trash_company_code = 'simulation'
+        config.trash_address_id   = '1300000000'
+        address_text = config.trash_company_code + '/' + config.trash_address_id
+        type_list    = mock_provider.TWENTE_TYPES
+    else:
+        config.trash_postal_code  = '6269NR'
+        config.trash_house_number = '10'
+        address_text = config.trash_postal_code + '/' + config.trash_house_number
+        type_list    = mock_provider.RD4_TYPES
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def true_mask(day):
+    '''
+        color mask of a day number in the mock calendar
+    '''
+    mask = 0
+    for position, pickup_day in mock_provider.pickup_days(address_text, day, day, len(type_list)):
+        mask |= providers.type_mask(providers.PROVIDERS[config.trash_company], type_list[position])
+    return mask
+
+
+
+#------------------------------------------------------------------------------
+def seen_masks():
+    '''
+        (solid, tomorrow pattern, day after pattern) masks of the container LEDs, from the pins
+        over one full cycle of the LED engine
+    '''
+    timer = None
+    for candidate in machine.timers:
+        if candidate.callback != None:
+            timer = candidate
+    periods = [on_ticks + off_ticks for on_ticks, off_ticks in leds.PATTERN_TICKS]
+    cycle = 1
+    for period in periods:
+        cycle = cycle * period // math.gcd(cycle, period)
+    on_counts = [0] * len(leds.LED_PINS)
+    if timer != None:
+        for tick in range(cycle):
+            timer.callback(timer)
+            for bit in range(len(leds.LED_PINS)):
+                on_counts[bit] += machine.pins.get(leds.LED_PINS[bit], 0)
+    masks = [0, 0, 0]
+    for bit in range(len(leds.LED_PINS)):
+        if on_counts[bit] == cycle:
+            masks[0] |= 1 << bit
+        for pattern in range(len(leds.PATTERN_TICKS)):
+            if on_counts[bit] and (on_counts[bit] == leds.PATTERN_TICKS[pattern][0] * cycle // periods[pattern]):
+                masks[1 + pattern] |= 1 << bit
+    return tuple(masks)
+
+
+
+#------------------------------------------------------------------------------
+def check_leds(now):
+    '''
+        compare the LEDs with the mock calendar at true time now
+    '''
+    global checks
+    if not virtual_clock.powered:
+        return 0
+    checks += 1
+    day = dates.local_day(int(now))
+    today     = true_mask(day)
+    tomorrow  = true_mask(day + 1) & ~today
+    day_after = 0
+    if config.led_show_day_after:
+        day_after = true_mask(day + 2) & ~(today | tomorrow)
+    seen = seen_masks()
+    if seen != (today, tomorrow, day_after):
+        wrong.append((now, (today, tomorrow, day_after), seen))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def next_check(now):
+    '''
+        the first LED check after true time now
+    '''
+    day = dates.local_day(int(now))
+    while True:
+        for seconds in CHECK_SECONDS:
+            if dates.day_start(day) + seconds > now:
+                return dates.day_start(day) + seconds
+        day += 1
+
+
+
+#------------------------------------------------------------------------------
+def purge_device():
+    '''
+        drop the device modules so the next import starts them fresh like a reboot,
+        the config stays as it is on the flash, the modules the simulation itself uses
+        keep working
+    '''
+    for name in list(sys.modules):
+        module_file = getattr(sys.modules[name], '__file__', None) or ''
+        if (name != 'config') and os.path.dirname(os.path.abspath(module_file)) == os.path.abspath(pc_compat.SOURCE_DIR):
+            del sys.modules[name]
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def run_device(args, log):
+    '''
+        boot the device until the end of the simulation, deepsleep and power cuts reboot it
+    '''
+    action, seconds = 'start', 0
+    while True:
+        try:
+            if action in ['deepsleep', 'power cut']:
+                virtual_clock.advance(seconds, True)
+                virtual_clock.powered = True
+            if action == 'deepsleep':
+                # the rp2 port ends a deepsleep with a reset, the RTC starts over like after a power cut
+                virtual_clock.reset_rtc()
+            boots[action] += 1
+            machine.reset_board(machine.WDT_RESET if action == 'deepsleep' else machine.PWRON_RESET)
+            purge_device()
+            with contextlib.redirect_stdout(log):
+                importlib.import_module('main')
+            # main.py only ends with an exception
+            return 0
+        except virtual_clock.DeepSleep as e:
+            # the wake up timer runs on the same crystal as the RTC, too fast by the same drift
+            action, seconds = 'deepsleep', e.ms / 1000 / (1 + virtual_clock.drift_ppm / 1000000)
+        except virtual_clock.PowerCut:
+            virtual_clock.powered = False
+            virtual_clock.reset_rtc()
+            machine.reset_board()
+            action, seconds = 'power cut', args.power_off_minutes * 60
+        except virtual_clock.SimulationEnd:
+            return 0
+
+
+
+#------------------------------------------------------------------------------
+def report(args, real_seconds):
+    total = virtual_clock.seconds_awake + virtual_clock.seconds_asleep + virtual_clock.seconds_off
+    print('SIM :', args.days, 'days of', args.company, 'in', round(real_seconds, 1), 's,', boots['start'], 'start,',
+          boots['deepsleep'], 'deepsleep wake ups,', boots['power cut'], 'power cuts')
+    print('SIM : provider requests', mock_provider.requests_served, ',', mock_provider.not_modified, 'not modified,',
+          mock_provider.bytes_served, 'bytes')
+    print('SIM : NTP queries', mock_ntp.queries, ',', mock_ntp.bytes_served, 'bytes')
+    print('SIM : wifi connects', network.connects, ',', network.failures, 'failed, radio on',
+          round(network.seconds_active / 3600, 2), 'h')
+    print('SIM : awake', round(virtual_clock.seconds_awake / 3600, 2), 'h,',
+          round(100 * virtual_clock.seconds_awake / max(1, total - virtual_clock.seconds_off), 3), '% of the powered time')
+    wrong_days = sorted(set(dates.day_string(dates.local_day(int(entry[0]))) for entry in wrong))
+    print('SIM : LED checks', checks, ',', len(wrong), 'wrong on', len(wrong_days), 'days')
+    for now, expected, seen in wrong[:args.show_wrong]:
+        day = dates.local_day(int(now))
+        day_seconds = int(now) - dates.day_start(day)
+        print('SIM : wrong', dates.day_string(day), '%02d:%02d' % (day_seconds // 3600, day_seconds // 60 % 60),
+              'expected', expected, 'seen', seen)
+    return len(wrong)
+
+
+
+#------------------------------------------------------------------------------
+def main(args):
+    loop = virtual_clock.loop
+    mock_provider.latency      = args.provider_latency
+    mock_provider.failure_rate = args.provider_failure_rate
+    mock_ntp.failure_rate      = args.ntp_failure_rate
+    network.failure_rate       = args.wifi_failure_rate
+    network.rng.seed(args.seed)
+    mock_provider.random.seed(args.seed)
+    provider_server = loop.run_until_complete(mock_provider.start('127.0.0.1', 0))
+    ntp_server = loop.run_until_complete(mock_ntp.start('127.0.0.1', 0))
+    setup(args, provider_server.sockets[0].getsockname()[1], ntp_server.get_extra_info('sockname')[1])
+
+    # the files of the device go to an empty flash
+    os.chdir(tempfile.mkdtemp(prefix='trash_sim_'))
+    year, month, day = [int(part) for part in args.start.split('-')]
+    start = dates.day_start(dates.day_number(year, month, day)) + 10*60*60
+    virtual_clock.start(start, args.drift_ppm)
+    virtual_clock.stop_at(start + args.days * 24*60*60, virtual_clock.SimulationEnd)
+    for cut_day in args.power_cut:
+        virtual_clock.stop_at(start + cut_day * 24*60*60, virtual_clock.PowerCut)
+    virtual_clock.set_check(check_leds, next_check)
+
+    real_start = time.perf_counter()
+    with open(args.log or os.devnull, 'w', buffering=1) as log:
+        run_device(args, log)
+    wrong_count = report(args, time.perf_counter() - real_start)
+    provider_server.close()
+    ntp_server.close()
+    loop.shutdown()
+    return 1 if wrong_count else 0
+
+
+
+###############################################################################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='simulation of the trash container signal tower on a virtual clock')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--start', default='2026-01-01', help='first day, the tower starts at 10:00')
+    parser.add_argument('--company', default='twente', choices=['twente', 'rd4'])
+    parser.add_argument('--sleep-mode', default='sleep', choices=['sleep', 'lightsleep', 'deepsleep'])
+    parser.add_argument('--day-after', action='store_true', help='also show the day after tomorrow')
+    parser.add_argument('--drift-ppm', type=float, default=20, help='the RTC runs this much too fast')
+    parser.add_argument('--wifi-failure-rate', type=float, default=0.0)
+    parser.add_argument('--ntp-failure-rate', type=float, default=0.0)
+    parser.add_argument('--provider-failure-rate', type=float, default=0.0)
+    parser.add_argument('--provider-latency', type=float, default=0.3, help='seconds before every provider answer')
+    parser.add_argument('--power-cut', type=float, action='append', default=[], metavar='DAY',
+                        help='power cut this many days after the start')
+    parser.add_argument('--power-off-minutes', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--log', default='', help='file for the output of the device')
+    parser.add_argument('--show-wrong', type=int, default=10, help='wrong LED checks to print')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,320 @@
+###############################################################################
+#
+#   Virtual clock for the PC simulation of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the time functions of the device code and an
+#             asyncio loop that jump ahead whenever nothing is left to do, so
+#             a year of the main loop runs in seconds
+#           - the ticks start at 0 at every reboot like on the board
+###############################################################################
+import sys
+import time
+import asyncio
+import calendar
+import selectors
+
+# time at which the RTC of the PI pico starts after a power cut and any other reset
+RTC_RESET_TIME = calendar.timegm((2021, 1, 1, 0, 0, 0))
+
+
+
+#------------------------------------------------------------------------------
+class DeepSleep(Exception):
+    '''
+        raised by machine.deepsleep, the simulation reboots the device after ms
+    '''
+    def __init__(self, ms):
+        Exception.__init__(self, ms)
+        self.ms = ms
+
+
+
+#------------------------------------------------------------------------------
+class PowerCut(Exception):
+    '''
+        raised when a power cut of the simulation starts
+    '''
+
+
+
+#------------------------------------------------------------------------------
+class SimulationEnd(Exception):
+    '''
+        raised when the simulated period is over
+    '''
+
+
+
+# the real world time in the simulation, unix seconds, follows elapsed which keeps
+# the precision for the small steps of asyncio
+true_time     = 0.0
+start_time    = 0.0
+elapsed       = 0.0
+# the RTC, rtc_base at true time rtc_true_base and running drift_ppm too fast
+rtc_base      = RTC_RESET_TIME
+rtc_true_base = 0.0
+drift_ppm     = 0
+# elapsed at the last reboot, the ticks of the device count from there
+ticks_base    = 0.0
+# sorted list of (true time, exception class), see advance()
+stops         = []
+# check(true time) is called at every time next_check(true time) returns
+check         = None
+next_check    = None
+check_time    = float('inf')
+# seconds of simulated time, awake is the time the main loop did not sleep
+seconds_awake  = 0.0
+seconds_asleep = 0.0
+seconds_off    = 0.0
+powered        = True
+loop           = None
+
+
+
+#------------------------------------------------------------------------------
+def start(unix_time, rtc_drift_ppm=0):
+    '''
+        start the clock, the RTC starts at its reset value like after a power cut
+    '''
+    global true_time, start_time, elapsed, drift_ppm
+    true_time  = float(unix_time)
+    start_time = true_time
+    elapsed    = 0.0
+    drift_ppm  = rtc_drift_ppm
+    reset_rtc()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def reset_rtc():
+    '''
+        the RTC after a power cut or the reset at the end of a deepsleep
+    '''
+    return set_rtc(RTC_RESET_TIME)
+
+
+
+#------------------------------------------------------------------------------
+def set_rtc(seconds):
+    '''
+        set the RTC, like machine.RTC().datetime()
+    '''
+    global rtc_base, rtc_true_base
+    rtc_base      = seconds
+    rtc_true_base = true_time
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def rtc_time():
+    '''
+        the RTC as float seconds, it runs drift_ppm too fast
+    '''
+    return rtc_base + (true_time - rtc_true_base) * (1 + drift_ppm / 1000000)
+
+
+
+#------------------------------------------------------------------------------
+def monotonic():
+    '''
+        seconds since the start of the simulation, the ticks of the device
+    '''
+    return elapsed
+
+
+
+#------------------------------------------------------------------------------
+def restart_ticks():
+    '''
+        the ticks start at 0 again, at every reboot of the device
+    '''
+    global ticks_base
+    ticks_base = elapsed
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def stop_at(when, exception):
+    '''
+        raise exception from advance() once the true time reaches when
+    '''
+    stops.append((when, exception))
+    stops.sort(key=lambda stop: stop[0])
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def set_check(callback, next_time):
+    '''
+        call callback(true time) at every time that next_time(true time) gives
+    '''
+    global check, next_check, check_time
+    check      = callback
+    next_check = next_time
+    check_time = next_time(true_time)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def account(seconds, asleep):
+    '''
+        add simulated time to the awake, asleep or power off total
+    '''
+    global seconds_awake, seconds_asleep, seconds_off
+    if not powered:
+        seconds_off += seconds
+    elif asleep:
+        seconds_asleep += seconds
+    else:
+        seconds_awake += seconds
+
+
+
+#------------------------------------------------------------------------------
+def advance(seconds, asleep=False):
+    '''
+        move the true time ahead, the checks and stops on the way are done in order
+    '''
+    global true_time, elapsed, check_time
+    # at least a microsecond, asyncio can ask for less than the float resolution
+    target = elapsed + max(0.000001, seconds)
+    while True:
+        stop_time = stops[0][0] - start_time if stops else float('inf')
+        step_time = min(stop_time, check_time - start_time)
+        if step_time > target:
+            break
+        if step_time > elapsed:
+            account(step_time - elapsed, asleep)
+            elapsed = step_time
+            true_time = start_time + elapsed
+        if stop_time <= check_time - start_time:
+            raise stops.pop(0)[1]()
+        check(true_time)
+        check_time = next_check(true_time)
+    account(target - elapsed, asleep)
+    elapsed = target
+    true_time = start_time + elapsed
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def device_asleep():
+    '''
+        True while the main loop of the device waits in scheduler.sleep_until
+    '''
+    scheduler = sys.modules.get('scheduler')
+    return (scheduler != None) and scheduler.asleep
+
+
+
+#------------------------------------------------------------------------------
+class VirtualSelector:
+    '''
+        selector that jumps the clock ahead instead of waiting, the mock servers run in
+        the same loop so nothing can arrive while the loop has nothing to do
+    '''
+    def __init__(self, selector):
+        self.selector = selector
+
+
+    def __getattr__(self, name):
+        return getattr(self.selector, name)
+
+
+    def select(self, timeout=None):
+        events = self.selector.select(0)
+        if events or (timeout == 0):
+            return events
+        if (timeout == None) or (timeout > 0.05):
+            # give the kernel a moment for data on the loopback before a longer jump
+            events = self.selector.select(0.001)
+            if events:
+                return events
+        if timeout == None:
+            return self.selector.select(None)
+        advance(timeout, device_asleep())
+        return []
+
+
+
+#------------------------------------------------------------------------------
+def exception_handler(loop, context):
+    '''
+        the connections of the mock servers are cancelled at every reboot of the device, only
+        report the other errors
+    '''
+    if not isinstance(context.get('exception'), asyncio.CancelledError):
+        loop.default_exception_handler(context)
+
+
+
+#------------------------------------------------------------------------------
+class VirtualLoop(asyncio.SelectorEventLoop):
+    '''
+        event loop on the virtual clock, it survives the asyncio.run calls of main.py
+    '''
+    def __init__(self):
+        asyncio.SelectorEventLoop.__init__(self, VirtualSelector(selectors.DefaultSelector()))
+        # a year of seconds in a float has no nanoseconds left, timers due now have to run
+        self._clock_resolution = 0.000001
+        self.set_exception_handler(exception_handler)
+
+
+    def time(self):
+        return monotonic()
+
+
+    def close(self):
+        # asyncio.run closes its loop, the mock servers have to keep running
+        pass
+
+
+    def shutdown(self):
+        asyncio.SelectorEventLoop.close(self)
+
+
+
+#------------------------------------------------------------------------------
+class VirtualPolicy(asyncio.DefaultEventLoopPolicy):
+    '''
+        every asyncio.run gets the one virtual loop
+    '''
+    def new_event_loop(self):
+        return loop
+
+
+
+#------------------------------------------------------------------------------
+def sleep(seconds):
+    '''
+        time.sleep of the device, the main loop is awake while it blocks
+    '''
+    advance(seconds)
+
+
+
+#------------------------------------------------------------------------------
+def install():
+    '''
+        replace the time functions the device code uses and put asyncio on the virtual loop,
+        call after pc_compat.install() and before importing any device module
+    '''
+    global loop
+    time.time       = lambda: int(rtc_time())
+    time.ticks_ms   = lambda: int((monotonic() - ticks_base) * 1000)
+    time.ticks_us   = lambda: int((monotonic() - ticks_base) * 1000000)
+    time.sleep      = sleep
+    time.sleep_ms   = lambda ms: sleep(ms / 1000)
+    loop = VirtualLoop()
+    asyncio.set_event_loop_policy(VirtualPolicy())
+    asyncio.set_event_loop(loop)
+    return 0
@@ -0,0 +1,135 @@
+###############################################################################
+#
+#   Day to color bitmask index for the trash container pickup dates
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the provider responses are turned in one pass into
+#             a sorted array of day number and color mask records
+#           - streaming variants that read the response without building the
+#             complete JSON object tree
+#           - scanners that can be fed chunk by chunk from the asyncio fetches
+#           - day number helpers moved to dates
+#           - one scanner for all providers, the type mappings moved to providers
+#           - days of an earlier index back in the dict for unchanged responses
+#           - nested objects inside a pickup entry do not drop the entry anymore
+#           - only the date helper the scanner uses is imported
+###############################################################################
+from array import array
+
+import json_stream
+# the day numbers of the index come from the date engine
+from dates import day_number_from_string
+
+# every container color has its own bit in the 5 bit color mask
+COLOR_MASKS = {
+    'GRAY'   : 0x01,
+    'GREEN'  : 0x02,
+    'BLUE'   : 0x04,
+    'ORANGE' : 0x08,
+    'RED'    : 0x10,
+}
+COLOR_NAMES = ('GRAY', 'GREEN', 'BLUE', 'ORANGE', 'RED')   # in bit order
+
+
+
+#------------------------------------------------------------------------------
+def mask_to_colors(mask):
+    '''
+        list of the container color names that are set in a color mask
+    '''
+    colors = []
+    for bit in range(len(COLOR_NAMES)):
+        if mask & (1 << bit):
+            colors.append(COLOR_NAMES[bit])
+    return colors
+
+
+
+#------------------------------------------------------------------------------
+def scanner_pickups(days, date_key, type_key, type_masks):
+    '''
+        json_stream scanner that adds a provider response to the dict day number -> color mask,
+        only the pickup dates and types are kept while reading
+        date_key    : key of the pickup dates, a single date or a list of dates
+        type_key    : key of the container type, in the same object as the dates
+        type_masks  : container type as text -> color mask, unknown types give mask 0
+    '''
+    pending = []            # day numbers of the current object
+    state   = [None, 0]     # the container type and the depth of the current object, 0 when none
+
+    def on_value(key, value):
+        depth = scanner.key_depth
+        if state[1] == 0:
+            state[1] = depth
+        elif depth != state[1]:
+            # the same keys in an object inside the entry
+            return
+        if key == type_key:
+            state[0] = value
+        elif len(value) >= 10:
+            pending.append(day_number_from_string(value))
+
+    def on_object_end(depth):
+        # only the object with the dates and type ends the entry, not an object inside it
+        if depth != state[1]:
+            return
+        if state[0] != None:
+            mask = type_masks.get(state[0], 0)
+            for day in pending:
+                days[day] = days.get(day, 0) | mask
+        del pending[:]
+        state[0] = None
+        state[1] = 0
+
+    scanner = json_stream.Scanner((date_key, type_key), on_value, on_object_end)
+    return scanner
+
+
+
+#------------------------------------------------------------------------------
+def build_index(days):
+    '''
+        turn the dict day number -> color mask into the sorted index array,
+        every record is packed as day number << 8 | color mask
+    '''
+    index = array('I')
+    for day in sorted(days):
+        if days[day]:
+            index.append((day << 8) | days[day])
+    return index
+
+
+
+#------------------------------------------------------------------------------
+def lookup(index, day):
+    '''
+        binary search of the color mask for a day number, 0 when nothing is picked up
+    '''
+    low  = 0
+    high = len(index) - 1
+    while low <= high:
+        middle = (low + high) >> 1
+        record_day = index[middle] >> 8
+        if record_day < day:
+            low = middle + 1
+        elif record_day > day:
+            high = middle - 1
+        else:
+            return index[middle] & 0xFF
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def add_range(index, first_day, last_day, days):
+    '''
+        add the records of index from first_day up to last_day to the dict day number -> color mask,
+        for a response that did not change since the index was made
+    '''
+    for record in index:
+        day = record >> 8
+        if (day >= first_day) and (day <= last_day):
+            days[day] = days.get(day, 0) | (record & 0xFF)
+    return 0
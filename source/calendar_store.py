@@ -0,0 +1,194 @@
+###############################################################################
+#
+#   Calendar store for the trash container pickup dates
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, keeps months of pickup dates on the flash so the
+#             main loop only needs the API when the known horizon gets short
+#           - version 2 of the file, binary day number / color mask index
+#           - refresh due time for the wake scheduler
+#           - refresh due time at the local midnight
+#           - time and result of the last fetch attempt for the status server
+#           - refresh also needed at exactly the maximum age, like refresh_due says
+#           - messages through log
+#           - an unchanged calendar only gets its fetch time rewritten
+###############################################################################
+import os
+import struct
+from array import array
+
+import config # import the config file
+import log
+import calendar_index
+import dates
+
+# version of the file layout, bump when the layout changes
+CALENDAR_VERSION = 2
+CALENDAR_MAGIC   = b'TRASHCAL'
+# magic, version, fetched time, horizon day number, number of records
+CALENDAR_HEADER  = '<8sBIII'
+
+# the calendar in memory, sorted array of day number << 8 | color mask
+calendar_index_data = array('I')
+# time.time() of the last successful refresh, 0 when nothing is known
+calendar_fetched    = 0
+# last day number that is covered by the calendar
+calendar_horizon    = 0
+# time.time() and result of the last fetch attempt, also when it failed
+last_attempt        = 0
+last_attempt_ok     = False
+
+
+
+#------------------------------------------------------------------------------
+def load():
+    '''
+        load the calendar from the flash, returns True when a valid calendar was found
+    '''
+    global calendar_index_data, calendar_fetched, calendar_horizon
+    header_size = struct.calcsize(CALENDAR_HEADER)
+    try:
+        with open(config.calendar_file, 'rb') as f:
+            header = f.read(header_size)
+            if len(header) != header_size:
+                log.warning('CALENDAR : stored calendar is truncated, ignoring', config.calendar_file)
+                return False
+            magic, version, fetched, horizon, count = struct.unpack(CALENDAR_HEADER, header)
+            if magic != CALENDAR_MAGIC or version != CALENDAR_VERSION:
+                log.warning('CALENDAR : unknown file version, ignoring', config.calendar_file)
+                return False
+            index = array('I', f.read(4 * count))
+            if len(index) != count:
+                log.warning('CALENDAR : stored calendar is truncated, ignoring', config.calendar_file)
+                return False
+    except OSError:
+        log.info('CALENDAR : no calendar stored yet')
+        return False
+    except:
+        log.warning('CALENDAR : error while reading', config.calendar_file)
+        return False
+    calendar_index_data = index
+    calendar_fetched    = fetched
+    calendar_horizon    = horizon
+    log.info('CALENDAR : loaded', count, 'pickup days up to day', horizon)
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def save():
+    '''
+        write the calendar to the flash, a temporary file is renamed so a power cut
+        during the write keeps the previous calendar intact
+    '''
+    temp_file = config.calendar_file + '.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(struct.pack(CALENDAR_HEADER, CALENDAR_MAGIC, CALENDAR_VERSION,
+                                calendar_fetched, calendar_horizon, len(calendar_index_data)))
+            f.write(calendar_index_data)
+        try:
+            os.remove(config.calendar_file)
+        except OSError:
+            pass
+        os.rename(temp_file, config.calendar_file)
+        return 0
+    except:
+        log.warning('CALENDAR : error while writing', config.calendar_file)
+        return -1
+
+
+
+#------------------------------------------------------------------------------
+def update(index, horizon, fetched):
+    '''
+        replace the calendar with a freshly fetched one and store it on the flash
+        index    : sorted array of day number << 8 | color mask, see calendar_index
+        horizon  : last day number covered by the fetch
+        fetched  : time.time() of the fetch
+    '''
+    global calendar_index_data, calendar_fetched, calendar_horizon
+    calendar_index_data = index
+    calendar_fetched    = fetched
+    calendar_horizon    = horizon
+    log.info('CALENDAR : updated with', len(index), 'pickup days up to day', horizon)
+    return save()
+
+
+
+#------------------------------------------------------------------------------
+def confirm(fetched):
+    '''
+        the fetch gave the calendar that is stored already, only the fetch time in the
+        header of the file is written again, in place
+    '''
+    global calendar_fetched
+    calendar_fetched = fetched
+    log.info('CALENDAR : unchanged,', len(calendar_index_data), 'pickup days up to day', calendar_horizon)
+    try:
+        with open(config.calendar_file, 'r+b') as f:
+            f.write(struct.pack(CALENDAR_HEADER, CALENDAR_MAGIC, CALENDAR_VERSION,
+                                calendar_fetched, calendar_horizon, len(calendar_index_data)))
+        return 0
+    except:
+        # no file yet or it could not be opened, write it completely
+        return save()
+
+
+
+#------------------------------------------------------------------------------
+def attempted(now, ok):
+    '''
+        note a fetch attempt, ok is True when it updated the calendar
+    '''
+    global last_attempt, last_attempt_ok
+    last_attempt    = now
+    last_attempt_ok = ok
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def needs_refresh(now, day_limit):
+    '''
+        check if the calendar has to be fetched again
+        now         : current time.time()
+        day_limit   : day number that must still be covered by the calendar
+    '''
+    if calendar_fetched == 0:
+        return True
+    # clock went back (RTC reset) or the data is simply too old
+    age = now - calendar_fetched
+    if (age < 0) or (age >= config.calendar_max_age_days * 60*60*24):
+        return True
+    # not enough days known ahead anymore
+    if calendar_horizon < day_limit:
+        return True
+    return False
+
+
+
+#------------------------------------------------------------------------------
+def refresh_due(now):
+    '''
+        time.time() value at which needs_refresh will start to return True
+        now         : current time.time()
+    '''
+    if calendar_fetched == 0:
+        return now
+    due_age = calendar_fetched + config.calendar_max_age_days * 60*60*24
+    # the day on which the horizon is no longer far enough ahead
+    day_short = calendar_horizon - config.calendar_min_horizon_days + 1
+    due_horizon = dates.day_start(day_short)
+    return max(now, min(due_age, due_horizon))
+
+
+
+#------------------------------------------------------------------------------
+def lights_for(day):
+    '''
+        return the color mask for a day number
+    '''
+    return calendar_index.lookup(calendar_index_data, day)
@@ -8,6 +8,26 @@
 #           - first version
 #   2025 - March - Henk-Johan
 #           - added RD4 support
+#   2026 - October
+#           - calendar store settings
+#           - LED engine settings
+#           - wake scheduler settings
+#           - streaming JSON buffer size
+#           - network timeouts
+#           - dual core mode
+#           - DNS cache
+#           - several time servers and drift based resync
+#           - last known state snapshot
+#           - time zone for the local day
+#           - LAN calendar relay
+#           - fleet service
+#           - telemetry
+#           - status server
+#           - NTP port and provider urls for the PC simulation
+#           - retry backoff and fleet spread
+#           - log level and output
+#           - wifi connection manager
+#           - status server off by default, limit on the forced refreshes
 ###############################################################################
 
 ''' Define if we are in debug mode or run mode '''
@@ -15,6 +35,16 @@
 run_debug = False
 
 
+''' Log, the messages go to a ring buffer that a background task writes out, so a serial port
+    that is not read never stops the tower, run_debug also gives the debug messages '''
+log_level                   = 'info'        # 'debug', 'info', 'warning' or 'error'
+log_output                  = 'serial'      # 'serial' or 'file'
+log_buffer_size             = 2048          # bytes in the ring buffer, messages are dropped when it is full
+log_file                    = 'trash.log'
+log_file_size               = 16384         # the file is moved to log_file + '.1' when it gets bigger
+log_drain_ms                = 50            # wait before trying again when the serial port is busy
+
+
 ''' Define on which system we are running the code '''
 #run_system          = 'pc'
 run_system          = 'pico'
@@ -23,16 +53,41 @@ run_system          = 'pico'
 ''' The wifi network to make the connection with '''
 wifi_ssid           = ''
 wifi_password       = ''
+# 'off'       : the radio is off between the network work, unless the relay or status server listens
+# 'powersave' : the radio stays on and dozes between the beacons of the access point
+# 'on'        : the radio stays on at full power
+wifi_power          = 'off'
+# (ip, netmask, gateway, dns) skips DHCP at every connect, () uses DHCP
+#wifi_static_ip      = ('192.168.1.50', '255.255.255.0', '192.168.1.1', '192.168.1.1')
+wifi_static_ip      = ()
+wifi_cache_file     = 'wifi.bin'    # access point of the last connection for a fast reconnect
+wifi_fast_timeout   = 4     # seconds for a reconnect to the last access point
+wifi_timeout        = 10    # seconds for a connect after a scan
+wifi_history_days   = 7     # days of connect times and radio on time kept for the status server
 
 
 ''' Time synchronization settings '''
 time_NTP_DELTA      = 2208988800
 time_host           = "pool.ntp.org"
+# servers that are asked in this order, the answer with the shortest round trip is used
+time_hosts          = ["0.pool.ntp.org", "1.pool.ntp.org", "2.pool.ntp.org"]
+ntp_port                = 123
+ntp_servers_per_sync    = 2     # number of servers asked at every sync
+ntp_error_threshold_ms  = 500   # resync when the predicted clock error gets larger
+ntp_min_interval_hours  = 6     # never resync more often, also used while the drift is unknown
+ntp_max_interval_hours  = 72    # always resync at least this often
+# the days start at the local midnight, the RTC itself runs in UTC
+time_zone_offset_minutes = 60   # CET
+time_zone_dst            = True # EU summer time, CEST from the last sunday of March to the last sunday of October
 
 
 ###############################################################################
 
 
+# other server for a provider, like the mock provider of the simulation, name -> 'http://host:port'
+provider_urls       = {}
+
+
 ''' In case of twente enable the next lines '''
 trash_company       = 'twente'
 trash_company_code  = ''
@@ -44,3 +99,85 @@ trash_address_id    = ''
 #trash_postal_code   = ''
 #trash_house_number  = ''
 
+
+###############################################################################
+
+
+''' Calendar store on the flash, the API is only used when the stored calendar gets short or old '''
+calendar_file               = 'calendar.dat'
+calendar_horizon_days       = 120   # Twente : number of days to fetch ahead, up to the end of that month
+calendar_horizon_months     = 4     # RD4 : number of months to fetch, including the current one
+calendar_min_horizon_days   = 14    # fetch again when less days are known ahead
+calendar_max_age_days       = 7     # fetch again when the stored calendar is older
+
+
+''' LED engine, show the pickups of the day after tomorrow with a short flash '''
+#led_show_day_after          = True
+led_show_day_after          = False
+
+# toggle frequency of the system LED once the time is set, 0 switches it off so lightsleep can be used
+led_system_ok_freq          = 1
+
+
+''' Wake scheduler, the board sleeps until the next event that can change something '''
+schedule_wifi_minutes       = 60    # check the wifi connection
+schedule_wifi_retry_minutes = 5     # try again this soon when the wifi is down
+schedule_retry_minutes      = 5     # first retry of a failed time sync or calendar fetch, doubles every failure
+schedule_retry_max_minutes  = 240   # longest time between two retries
+schedule_spread_minutes     = 120   # calendar refreshes are moved up to this much later, fixed per tower
+schedule_midnight_delay     = 5     # seconds after midnight to switch the LEDs to the new day
+schedule_max_sleep          = 3600  # longest single sleep in seconds
+# 'sleep'      : time.sleep, everything stays powered
+# 'lightsleep' : machine.lightsleep while no LED is blinking
+# 'deepsleep'  : machine.deepsleep while all LEDs are off, lightsleep otherwise
+sleep_mode                  = 'sleep'
+sleep_deep_min_seconds      = 600   # only use deepsleep for sleeps at least this long
+
+
+''' Streaming JSON parser, size of the preallocated read buffer in bytes '''
+stream_buffer_size          = 512
+
+
+''' Network timeouts and limits '''
+ntp_timeout                 = 5     # seconds to wait for the answer of the time server
+http_timeout                = 15    # seconds for a complete provider request, including TLS handshake
+http_max_parallel           = 2     # provider requests at the same time, every TLS connection costs RAM
+dns_cache_seconds           = 24*60*60  # keep resolved provider addresses this long
+
+
+''' Dual core mode, the calendar fetch and parsing run on core 1 so core 0 stays free for the LEDs '''
+#dual_core                   = True
+dual_core                   = False
+
+
+''' Last known state snapshot, restores the LEDs at boot before any network work '''
+snapshot_file               = 'snapshot.dat'
+
+
+''' LAN relay, one tower fetches the calendar and sends it over UDP multicast to the other towers
+    at the same address, they only go to the internet themselves when the relay stays silent '''
+#relay_mode                  = 'auto'
+relay_mode                  = 'off'
+relay_group                 = '239.255.77.77'   # multicast group and port of the frames
+relay_port                  = 5077
+relay_interval_minutes      = 15    # the relay sends the calendar this often
+relay_timeout_minutes       = 60    # fetch yourself when the relay was not heard this long
+relay_listen_seconds        = 60    # wait at least this long for a frame before the first own fetch
+
+
+''' Fleet service on a PC in the network, see the README, when set the calendar is taken from there
+    instead of from the provider, for instance 'http://192.168.1.10:8080' '''
+fleet_url                   = ''
+
+
+''' Telemetry, timings of the wifi, DNS, NTP, HTTP, parse and LED phases in a ring buffer '''
+telemetry_records           = 64    # records in the ring buffer, 18 bytes each
+telemetry_serial            = True  # answer the commands telemetry and dump on the serial port
+
+
+''' Status server, answers the state of the tower as JSON on GET /status and fetches the calendar
+    again on POST /refresh, 0 switches it off, while it runs the board does not lightsleep or deepsleep
+    and the radio stays on, so it costs power, 80 is the usual port '''
+status_port                 = 0
+status_timeout              = 5     # seconds a client gets to send its request
+status_refresh_minutes      = 10    # at least this long between two forced refreshes
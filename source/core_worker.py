@@ -0,0 +1,140 @@
+###############################################################################
+#
+#   Second core worker for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, runs blocking jobs like the calendar fetch and
+#             parsing on core 1, the results come back through a mailbox
+#           - messages through log
+#           - core 1 waits on a lock for the next job instead of checking the
+#             mailbox every 20 ms
+###############################################################################
+import time
+import _thread
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import log
+
+# the mailbox, only touched while holding the lock
+mailbox_lock   = _thread.allocate_lock()
+mailbox_job    = None       # (function, args) waiting for core 1
+mailbox_result = None       # (ok, value) waiting for core 0
+worker_started = False
+# held while there is no job, run() releases it to wake up core 1
+job_ready      = _thread.allocate_lock()
+job_ready.acquire()
+
+# busy time per core in microseconds since the last reset_busy()
+busy_us        = [0, 0]
+busy_start     = time.ticks_ms()
+
+
+
+#------------------------------------------------------------------------------
+def worker():
+    '''
+        the loop on core 1, waits for a job in the mailbox and puts the result back
+    '''
+    global mailbox_job, mailbox_result
+    while True:
+        # blocks until run() put a job in the mailbox
+        job_ready.acquire()
+        mailbox_lock.acquire()
+        job = mailbox_job
+        mailbox_job = None
+        mailbox_lock.release()
+        if job == None:
+            continue
+        start = time.ticks_us()
+        try:
+            result = (True, job[0](*job[1]))
+        except Exception as e:
+            result = (False, e)
+        busy_us[1] += time.ticks_diff(time.ticks_us(), start)
+        mailbox_lock.acquire()
+        mailbox_result = result
+        mailbox_lock.release()
+
+
+
+#------------------------------------------------------------------------------
+def start():
+    '''
+        start the worker on core 1, only once
+    '''
+    global worker_started
+    if not worker_started:
+        _thread.start_new_thread(worker, ())
+        worker_started = True
+        log.info('CORE : worker started on core 1')
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def run(function, *args):
+    '''
+        run function(*args) on core 1 and wait for the result without blocking core 0,
+        exceptions of the job are raised again on core 0
+    '''
+    global mailbox_job, mailbox_result
+    start()
+    mailbox_lock.acquire()
+    mailbox_result = None
+    mailbox_job = (function, args)
+    mailbox_lock.release()
+    job_ready.release()
+    wait_start = time.ticks_us()
+    while True:
+        await asyncio.sleep_ms(50)
+        mailbox_lock.acquire()
+        result = mailbox_result
+        mailbox_result = None
+        mailbox_lock.release()
+        if result != None:
+            break
+    # waiting for core 1 does not count as busy time for core 0
+    busy_us[0] -= time.ticks_diff(time.ticks_us(), wait_start)
+    if not result[0]:
+        raise result[1]
+    return result[1]
+
+
+
+#------------------------------------------------------------------------------
+def add_busy(core, start_us):
+    '''
+        add the time since start_us (time.ticks_us()) to the busy time of a core
+    '''
+    busy_us[core] += time.ticks_diff(time.ticks_us(), start_us)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def busy_report():
+    '''
+        print and return the busy percentage of both cores since the last reset_busy()
+    '''
+    window_ms = max(1, time.ticks_diff(time.ticks_ms(), busy_start))
+    load = [busy_us[0] // (10 * window_ms), busy_us[1] // (10 * window_ms)]
+    log.debug('CORE : busy core 0', busy_us[0] // 1000, 'ms (', load[0], '% ), core 1', busy_us[1] // 1000, 'ms (', load[1], '% ) over', window_ms, 'ms')
+    return load
+
+
+
+#------------------------------------------------------------------------------
+def reset_busy():
+    '''
+        start a new measurement window for the busy times
+    '''
+    global busy_start
+    busy_us[0] = 0
+    busy_us[1] = 0
+    busy_start = time.ticks_ms()
+    return 0
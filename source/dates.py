@@ -0,0 +1,202 @@
+###############################################################################
+#
+#   Integer date engine for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, dates are day numbers since 2000-01-01 in local
+#             Dutch time (CET / CEST), the clock is read once per cycle and
+#             days are compared as integers, strings are only made for the API
+###############################################################################
+import time
+
+import config # import the config file
+
+# days in the year before the first of every month, for a non leap year
+DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+DAYS_IN_MONTH     = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+SECONDS_PER_DAY   = 60*60*24
+# days from the time.time() epoch to day 0 (2000-01-01), NTP counts from 1900 which is
+# 36524 days before 2000, so this is 10957 for the 1970 epoch and 0 for the 2000 epoch
+EPOCH_DAYS        = 36524 - config.time_NTP_DELTA // SECONDS_PER_DAY
+
+# summer time of the year in dst_year, as time.time() values, see utc_offset()
+dst_year          = 0
+dst_start         = 0
+dst_end           = 0
+
+
+
+#------------------------------------------------------------------------------
+def is_leap_year(year):
+    '''
+        gregorian leap year check
+    '''
+    return (year % 4 == 0) and ((year % 100 != 0) or (year % 400 == 0))
+
+
+
+#------------------------------------------------------------------------------
+def days_in_month(year, month):
+    '''
+        number of days in a month, February has 29 in a leap year
+    '''
+    if (month == 2) and is_leap_year(year):
+        return 29
+    return DAYS_IN_MONTH[month - 1]
+
+
+
+#------------------------------------------------------------------------------
+def is_last_day_of_month(year, month, day):
+    '''
+        check if a date is the last day of its month
+    '''
+    return day == days_in_month(year, month)
+
+
+
+#------------------------------------------------------------------------------
+def add_months(year, month, count):
+    '''
+        (year, month) count months later, rolls over into the next years
+    '''
+    months = year * 12 + month - 1 + count
+    return months // 12, months % 12 + 1
+
+
+
+#------------------------------------------------------------------------------
+def day_number(year, month, day):
+    '''
+        number of days since 2000-01-01 for a date from the year 2000 onwards
+    '''
+    years = year - 2000
+    days = years * 365 + (years + 3) // 4 - (years + 99) // 100 + (years + 399) // 400
+    days += DAYS_BEFORE_MONTH[month - 1] + day - 1
+    if (month > 2) and is_leap_year(year):
+        days += 1
+    return days
+
+
+
+#------------------------------------------------------------------------------
+def day_number_from_string(date_string):
+    '''
+        day number for a date string that starts with YYYY-MM-DD
+    '''
+    return day_number(int(date_string[0:4]), int(date_string[5:7]), int(date_string[8:10]))
+
+
+
+#------------------------------------------------------------------------------
+def date_from_day_number(number):
+    '''
+        convert a day number back to a (year, month, day) tuple, without loops
+    '''
+    # count from 0000-03-01 so the leap day is the last day of the year
+    days = number + 730425
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_index = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = month_index + 3 if month_index < 10 else month_index - 9
+    year = era * 400 + year_of_era + (1 if month <= 2 else 0)
+    return (year, month, day)
+
+
+
+#------------------------------------------------------------------------------
+def weekday(number):
+    '''
+        day of the week of a day number, monday is 0 like time.localtime()
+    '''
+    # 2000-01-01 was a saturday
+    return (number + 5) % 7
+
+
+
+#------------------------------------------------------------------------------
+def last_sunday(year, month):
+    '''
+        day number of the last sunday of a month
+    '''
+    last = day_number(year, month, days_in_month(year, month))
+    return last - (weekday(last) + 1) % 7
+
+
+
+#------------------------------------------------------------------------------
+def utc_offset(now):
+    '''
+        offset of the local time to UTC in seconds at time.time() value now,
+        summer time runs from the last sunday of March to the last sunday of October
+        at 01:00 UTC, like everywhere in the EU
+    '''
+    global dst_year, dst_start, dst_end
+    offset = config.time_zone_offset_minutes * 60
+    if not config.time_zone_dst:
+        return offset
+    if (now < dst_start - 120*SECONDS_PER_DAY) or (now >= dst_end + 120*SECONDS_PER_DAY) or (dst_year == 0):
+        # only work the summer time out again in another year
+        dst_year = date_from_day_number(now // SECONDS_PER_DAY - EPOCH_DAYS)[0]
+        dst_start = (last_sunday(dst_year, 3) + EPOCH_DAYS) * SECONDS_PER_DAY + 60*60
+        dst_end   = (last_sunday(dst_year, 10) + EPOCH_DAYS) * SECONDS_PER_DAY + 60*60
+    if dst_start <= now < dst_end:
+        return offset + 60*60
+    return offset
+
+
+
+#------------------------------------------------------------------------------
+def local_day(now):
+    '''
+        local day number at time.time() value now
+    '''
+    return (now + utc_offset(now)) // SECONDS_PER_DAY - EPOCH_DAYS
+
+
+
+#------------------------------------------------------------------------------
+def read_clock():
+    '''
+        read the clock once for a complete cycle
+        returns (time.time(), local day number, local seconds since midnight)
+    '''
+    now = int(time.time())
+    local = now + utc_offset(now)
+    return now, local // SECONDS_PER_DAY - EPOCH_DAYS, local % SECONDS_PER_DAY
+
+
+
+#------------------------------------------------------------------------------
+def day_start(number):
+    '''
+        time.time() value of the local midnight at the start of a day number
+    '''
+    start = (number + EPOCH_DAYS) * SECONDS_PER_DAY
+    # summer time never changes around midnight, so the offset at the day start is found in one step
+    return start - utc_offset(start - utc_offset(start))
+
+
+
+#------------------------------------------------------------------------------
+def next_midnight(now):
+    '''
+        time.time() value of the next local midnight after now
+    '''
+    return day_start(local_day(now) + 1)
+
+
+
+#------------------------------------------------------------------------------
+def day_string(number):
+    '''
+        prepare formatted date string YYYY-MM-DD for the API and the log
+    '''
+    year, month, day = date_from_day_number(number)
+    return str(year) + ('-0' if month < 10 else '-') + str(month) + ('-0' if day < 10 else '-') + str(day)
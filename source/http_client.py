@@ -0,0 +1,275 @@
+###############################################################################
+#
+#   Small asyncio HTTP client for the provider fetches
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the response body is fed to a json_stream scanner
+#             while it comes in so several fetches can run at the same time
+#           - DNS cache, keep-alive connections within a refresh cycle and
+#             timings of every request
+#           - DNS cache moved to resolver
+#           - conditional requests, a 304 answer is not an error
+#           - messages through log
+#           - a new connection is closed too when the request fails or times out
+###############################################################################
+import time
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import resolver
+
+# idle keep-alive connections, (host, port) -> list of (reader, writer)
+pool        = {}
+# timings of the last requests, newest last, see record_timing()
+timings     = []
+MAX_TIMINGS = 8
+
+
+
+#------------------------------------------------------------------------------
+def split_url(url):
+    '''
+        split an url in (use_ssl, host, port, path)
+    '''
+    scheme, rest = url.split('://', 1)
+    if '/' in rest:
+        host, path = rest.split('/', 1)
+        path = '/' + path
+    else:
+        host = rest
+        path = '/'
+    use_ssl = scheme == 'https'
+    port = 443 if use_ssl else 80
+    if ':' in host:
+        host, port = host.split(':', 1)
+        port = int(port)
+    return use_ssl, host, port, path
+
+
+
+#------------------------------------------------------------------------------
+async def connect(use_ssl, host, port):
+    '''
+        open a new connection to the cached address of the host
+        returns (reader, writer)
+    '''
+    address = resolver.resolve(host, port)
+    if use_ssl:
+        # the certificate and SNI still need the host name, not the address
+        try:
+            return await asyncio.open_connection(address, port, ssl=True, server_hostname=host)
+        except TypeError:
+            # older asyncio without server_hostname, let it resolve the host itself
+            return await asyncio.open_connection(host, port, ssl=True)
+    return await asyncio.open_connection(address, port)
+
+
+
+#------------------------------------------------------------------------------
+def close_all():
+    '''
+        close all idle keep-alive connections, at the end of a refresh cycle
+    '''
+    for key in pool:
+        for reader, writer in pool[key]:
+            try:
+                writer.close()
+            except:
+                pass
+    pool.clear()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def record_timing(host, reused, connect_ms, first_byte_ms, transfer_ms, body_bytes):
+    '''
+        keep the timings of a request, connect_ms includes DNS and the TLS handshake
+        and is 0 for a reused connection
+    '''
+    timing = (host, reused, connect_ms, first_byte_ms, transfer_ms, body_bytes)
+    timings.append(timing)
+    if len(timings) > MAX_TIMINGS:
+        timings.pop(0)
+    log.debug('HTTP :', host, 'reused' if reused else 'new', 'connect', connect_ms, 'ms, first byte', first_byte_ms, 'ms, transfer', transfer_ms, 'ms,', body_bytes, 'bytes')
+    return timing
+
+
+
+#------------------------------------------------------------------------------
+async def send_request(reader, writer, method, host, path, headers, data):
+    '''
+        send the request and read the status line and headers of the response
+        returns (status, content length or -1, chunked, keep alive, etag, last modified)
+    '''
+    request = method + ' ' + path + ' HTTP/1.1\r\nHost: ' + host + '\r\n'
+    if headers:
+        for name in headers:
+            request += name + ': ' + headers[name] + '\r\n'
+    if data:
+        request += 'Content-Length: ' + str(len(data)) + '\r\n'
+    request += 'Connection: keep-alive\r\n\r\n'
+    writer.write(request.encode())
+    if data:
+        writer.write(data)
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise OSError('connection closed by server')
+    parts = status_line.split(None, 2)
+    status = int(parts[1])
+    keep_alive = parts[0] == b'HTTP/1.1'
+    length = -1
+    chunked = False
+    etag = ''
+    last_modified = ''
+    while True:
+        line = await reader.readline()
+        if (not line) or (line == b'\r\n'):
+            break
+        name, value = line.split(b':', 1)
+        name = name.strip().lower()
+        if name == b'etag':
+            etag = value.strip().decode()
+        elif name == b'last-modified':
+            last_modified = value.strip().decode()
+        value = value.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'transfer-encoding':
+            chunked = b'chunked' in value
+        elif name == b'connection':
+            keep_alive = value == b'keep-alive'
+    return status, length, chunked, keep_alive, etag, last_modified
+
+
+
+#------------------------------------------------------------------------------
+async def read_exactly_into_scanner(reader, length, buffer, scanner):
+    '''
+        feed exactly length bytes of the body to the scanner, or until the end when length is -1
+    '''
+    view = memoryview(buffer)
+    while length != 0:
+        size = len(buffer) if length < 0 else min(length, len(buffer))
+        if hasattr(reader, 'readinto'):
+            count = await reader.readinto(view[0:size])
+            chunk = buffer
+        else:
+            # CPython streams have no readinto
+            chunk = await reader.read(size)
+            count = len(chunk)
+        if not count:
+            if length > 0:
+                raise OSError('connection closed in the middle of the body')
+            break
+        scanner.feed(chunk, count)
+        if length > 0:
+            length -= count
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def read_body(reader, length, chunked, scanner):
+    '''
+        feed the body to a json_stream scanner, plain, with a content length or chunked
+    '''
+    buffer = bytearray(config.stream_buffer_size)
+    if chunked:
+        while True:
+            line = await reader.readline()
+            size = int(line.split(b';')[0].strip(), 16)
+            if size == 0:
+                # skip the trailers up to the empty line
+                while True:
+                    line = await reader.readline()
+                    if (not line) or (line == b'\r\n'):
+                        break
+                break
+            await read_exactly_into_scanner(reader, size, buffer, scanner)
+            await reader.readline()
+    else:
+        await read_exactly_into_scanner(reader, length, buffer, scanner)
+    return scanner.finish()
+
+
+
+#------------------------------------------------------------------------------
+async def fetch(method, url, scanner, headers=None, data=None, timeout=None, response_info=None):
+    '''
+        do the request and scan the JSON body with the scanner, everything within timeout seconds,
+        an idle keep-alive connection to the same host is reused when there is one
+        response_info : dict that gets the status, etag and last_modified of the response
+        returns the number of body bytes read, raises on errors or a status other than 200 and 304,
+        for a 304 the scanner is not used
+    '''
+    if timeout == None:
+        timeout = config.http_timeout
+    use_ssl, host, port, path = split_url(url)
+    key = (host, port)
+    if data:
+        data = data.encode()
+
+    async def run():
+        start = time.ticks_ms()
+        connection = None
+        writer = None
+        if pool.get(key):
+            connection = pool[key].pop()
+        reused = connection != None
+        try:
+            if reused:
+                reader, writer = connection
+                try:
+                    response = await send_request(reader, writer, method, host, path, headers, data)
+                except OSError:
+                    # the server closed the idle connection, open a new one
+                    writer.close()
+                    writer = None
+                    reused = False
+            if not reused:
+                reader, writer = await connect(use_ssl, host, port)
+                connected = time.ticks_ms()
+                response = await send_request(reader, writer, method, host, path, headers, data)
+            else:
+                connected = start
+        except:
+            # a new connection is closed as well, also when wait_for cancelled the request
+            if writer != None:
+                writer.close()
+            raise
+        status, length, chunked, keep_alive, etag, last_modified = response
+        if response_info != None:
+            response_info['status']        = status
+            response_info['etag']          = etag
+            response_info['last_modified'] = last_modified
+        first_byte = time.ticks_ms()
+        try:
+            if status == 304:
+                # not modified, there is no body
+                length = 0
+                body_bytes = 0
+            elif status != 200:
+                raise OSError('HTTP status ' + str(status))
+            else:
+                body_bytes = await read_body(reader, length, chunked, scanner)
+        except:
+            writer.close()
+            raise
+        record_timing(host, reused, time.ticks_diff(connected, start), time.ticks_diff(first_byte, connected),
+                      time.ticks_diff(time.ticks_ms(), first_byte), body_bytes)
+        # only a connection with a known body end can be used again
+        if keep_alive and (chunked or (length >= 0)) and (len(pool.get(key, [])) < config.http_max_parallel):
+            pool.setdefault(key, []).append((reader, writer))
+        else:
+            writer.close()
+        return body_bytes
+
+    return await asyncio.wait_for(run(), timeout)
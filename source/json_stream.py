@@ -0,0 +1,264 @@
+###############################################################################
+#
+#   Streaming JSON scanner for the provider responses
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, reads the response in a preallocated buffer and
+#             only keeps the values of the keys that are asked for, so the
+#             memory use does not grow with the size of the response
+#           - scanner state in an object so several responses can be read at
+#             the same time by the asyncio tasks
+#           - time spent scanning for the telemetry
+#           - checksum of the document for the change detection
+#           - only the keys and the wanted values are kept and decoded, a
+#             character cut off at MAX_TOKEN is dropped instead of failing
+#           - depth of the object that holds the key of a reported value
+###############################################################################
+import gc
+import time
+import binascii
+
+import config # import the config file
+
+# container types on the nesting stack
+OBJECT = 1
+ARRAY  = 2
+
+# deepest nesting that is supported
+MAX_DEPTH = 64
+# longest key or value that is kept, longer ones are cut off
+MAX_TOKEN = 64
+
+# statistics of the last parsed stream
+last_bytes_read = 0
+last_peak_heap  = 0
+
+
+
+#------------------------------------------------------------------------------
+def heap_free():
+    '''
+        free heap in bytes, 0 when the platform does not tell (CPython)
+    '''
+    if hasattr(gc, 'mem_free'):
+        return gc.mem_free()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def token_text(token, token_len):
+    '''
+        the first token_len bytes of token as str, a multi byte character that was cut off
+        at MAX_TOKEN is left out, a token that is no valid UTF-8 gives ''
+    '''
+    if token_len == MAX_TOKEN:
+        # back to the first byte of the last character
+        start = token_len - 1
+        while (start > 0) and ((token[start] & 0xC0) == 0x80):
+            start -= 1
+        lead = token[start]
+        if lead >= 0xC0:
+            size = 2 if lead < 0xE0 else (3 if lead < 0xF0 else 4)
+            if start + size > token_len:
+                token_len = start
+    try:
+        return bytes(token[0:token_len]).decode()
+    except UnicodeError:
+        return ''
+
+
+
+#------------------------------------------------------------------------------
+class Scanner:
+    '''
+        incremental JSON scanner, the document is fed in chunks and the scalar values are reported
+        keys            : the keys of which the values are reported
+        on_value        : on_value(key, value) with the value as str, also for numbers and
+                          for every element of an array that belongs to the key,
+                          key_depth is the depth of the object that holds the key during the call
+        on_object_end   : on_object_end(depth) after every closing } when given
+    '''
+    def __init__(self, keys, on_value, on_object_end=None):
+        self.keys          = keys
+        self.on_value      = on_value
+        self.on_object_end = on_object_end
+        self.token         = bytearray(MAX_TOKEN)
+        self.token_len     = 0
+        self.stack         = bytearray(MAX_DEPTH)   # container type per depth
+        self.key_stack     = [None] * MAX_DEPTH     # key that opened the container per depth
+        self.depth         = 0
+        self.key_depth     = 0                      # see on_value
+        self.key           = None                   # the key of the value that comes next
+        self.after_colon   = False                  # inside an object, between : and , or }
+        self.in_string     = False
+        self.in_literal    = False
+        self.escape        = False
+        self.keep          = False                  # the current string or literal is a key or a wanted value
+        self.bytes_read    = 0
+        self.heap_start    = heap_free()
+        self.heap_low      = self.heap_start
+        self.parse_us      = 0                      # time spent in feed()
+        self.crc           = 0                      # crc32 of everything fed so far
+
+
+    #--------------------------------------------------------------------------
+    def object_depth(self, depth):
+        '''
+            depth of the object around the arrays at depth, the one that holds their key
+        '''
+        while (depth > 0) and (self.stack[depth] == ARRAY):
+            depth -= 1
+        return depth
+
+
+    #--------------------------------------------------------------------------
+    def feed(self, buffer, count):
+        '''
+            scan the first count bytes of buffer
+        '''
+        start_us    = time.ticks_us()
+        # work on locals, attribute access is slow on the PI pico
+        keys        = self.keys
+        on_value    = self.on_value
+        token       = self.token
+        token_len   = self.token_len
+        stack       = self.stack
+        key_stack   = self.key_stack
+        depth       = self.depth
+        key         = self.key
+        after_colon = self.after_colon
+        in_string   = self.in_string
+        in_literal  = self.in_literal
+        escape      = self.escape
+        keep        = self.keep
+
+        for i in range(count):
+            c = buffer[i]
+            #------------------------------------------------------------------
+            # inside a string, only keep the characters when the key is wanted
+            if in_string:
+                if escape:
+                    escape = False
+                elif c == 0x5C:         # backslash
+                    escape = True
+                    continue
+                elif c == 0x22:         # closing quote
+                    in_string = False
+                    if not keep:
+                        continue
+                    value = token_text(token, token_len)
+                    if (stack[depth] == OBJECT) and not after_colon:
+                        key = value
+                    elif stack[depth] == OBJECT:
+                        self.key_depth = depth
+                        on_value(key, value)
+                    else:
+                        self.key_depth = self.object_depth(depth)
+                        on_value(key_stack[depth], value)
+                    continue
+                if keep and (token_len < MAX_TOKEN):
+                    token[token_len] = c
+                    token_len += 1
+                continue
+            #------------------------------------------------------------------
+            # numbers, true, false and null end at the first structural character
+            if in_literal:
+                if c in b' \t\r\n,}]':
+                    in_literal = False
+                    if keep and (stack[depth] == OBJECT):
+                        self.key_depth = depth
+                        on_value(key, token_text(token, token_len))
+                    elif keep:
+                        self.key_depth = self.object_depth(depth)
+                        on_value(key_stack[depth], token_text(token, token_len))
+                else:
+                    if keep and (token_len < MAX_TOKEN):
+                        token[token_len] = c
+                        token_len += 1
+                    continue
+            #------------------------------------------------------------------
+            # structural characters
+            if c == 0x22:               # opening quote
+                in_string = True
+                token_len = 0
+                # keys are always kept, values only when their key is asked for
+                if stack[depth] == OBJECT:
+                    keep = (not after_colon) or (key in keys)
+                else:
+                    keep = key_stack[depth] in keys
+            elif c == 0x7B or c == 0x5B:    # { or [
+                if depth == MAX_DEPTH - 1:
+                    raise ValueError('JSON nested too deep')
+                depth += 1
+                if c == 0x7B:
+                    stack[depth] = OBJECT
+                else:
+                    stack[depth] = ARRAY
+                # an array inside an array keeps the key of the outer one
+                if stack[depth - 1] == OBJECT:
+                    key_stack[depth] = key
+                else:
+                    key_stack[depth] = key_stack[depth - 1]
+                key = None
+                after_colon = False
+            elif c == 0x7D or c == 0x5D:    # } or ]
+                closing = stack[depth]
+                depth -= 1
+                key = key_stack[depth + 1]
+                after_colon = stack[depth] == OBJECT
+                if (closing == OBJECT) and (self.on_object_end != None):
+                    self.on_object_end(depth + 1)
+            elif c == 0x3A:             # :
+                after_colon = True
+            elif c == 0x2C:             # ,
+                after_colon = False
+            elif c not in b' \t\r\n':
+                in_literal = True
+                keep = (key if stack[depth] == OBJECT else key_stack[depth]) in keys
+                token[0] = c
+                token_len = 1
+
+        self.token_len   = token_len
+        self.depth       = depth
+        self.key         = key
+        self.after_colon = after_colon
+        self.in_string   = in_string
+        self.in_literal  = in_literal
+        self.escape      = escape
+        self.keep        = keep
+        self.bytes_read += count
+        self.crc = binascii.crc32(memoryview(buffer)[0:count], self.crc)
+        heap_now = heap_free()
+        if heap_now < self.heap_low:
+            self.heap_low = heap_now
+        self.parse_us += time.ticks_diff(time.ticks_us(), start_us)
+
+
+    #--------------------------------------------------------------------------
+    def finish(self):
+        '''
+            end of the document, returns the number of bytes read and keeps the statistics
+        '''
+        global last_bytes_read, last_peak_heap
+        last_bytes_read = self.bytes_read
+        last_peak_heap  = self.heap_start - self.heap_low
+        return self.bytes_read
+
+
+
+#------------------------------------------------------------------------------
+def parse(stream, scanner):
+    '''
+        scan a JSON document from a stream with readinto(), like the raw socket of a response
+        returns the number of bytes read
+    '''
+    buffer = bytearray(config.stream_buffer_size)
+    while True:
+        count = stream.readinto(buffer)
+        if not count:
+            break
+        scanner.feed(buffer, count)
+    return scanner.finish()
@@ -0,0 +1,190 @@
+###############################################################################
+#
+#   LED engine for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, one timer drives all container LEDs and the system
+#             LED from bitmasks so the blinking LEDs stay in phase
+#           - show with all container masks at once, nothing is touched when
+#             they did not change
+###############################################################################
+import config # import the config file
+
+if config.run_system == 'pico':
+    from machine import Pin, Timer
+
+# container LED pins in the bit order of calendar_index.COLOR_NAMES
+# GRAY GP20, GREEN GP19, BLUE GP18, ORANGE GP17, RED GP16
+LED_PINS    = (20, 19, 18, 17, 16)
+# the system LED on the PI pico board uses the bit after the containers
+SYSTEM_BIT  = 5
+SYSTEM_MASK = 1 << SYSTEM_BIT
+
+# all blinking is derived from one timer running at this frequency
+TICK_FREQ   = 10
+
+# blink patterns, the number of ticks the LED stays on and stays off
+PATTERN_TOMORROW  = 0   # 1 second on, 1 second off
+PATTERN_DAY_AFTER = 1   # short flash every 3 seconds
+PATTERN_TICKS     = ((10, 10), (2, 28))
+
+# state of the engine, only changed through the functions below
+solid_mask   = 0
+blink_masks  = [0, 0]
+system_ticks = 0        # half period of the system LED in ticks, 0 is solid off
+tick_count   = 0
+output_mask  = 0
+shown        = -1       # today, tomorrow and day after masks of the last show packed in one int
+led_pins     = []
+led_timer    = None
+
+
+
+#------------------------------------------------------------------------------
+def init():
+    '''
+        prepare the LED pins and start the engine timer
+    '''
+    global led_pins, led_timer
+    if config.run_system == 'pico':
+        led_pins = [Pin(pin, Pin.OUT) for pin in LED_PINS]
+        led_pins.append(Pin("LED", Pin.OUT))
+        for pin in led_pins:
+            pin.value(0)
+        led_timer = Timer()
+        led_timer.init(freq=TICK_FREQ, mode=Timer.PERIODIC, callback=tick)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def tick(timer):
+    '''
+        timer callback, works out the wanted LED state and only touches the pins that changed
+    '''
+    global tick_count, output_mask
+    tick_count += 1
+    value = solid_mask
+    for pattern in range(len(PATTERN_TICKS)):
+        if blink_masks[pattern]:
+            on_ticks, off_ticks = PATTERN_TICKS[pattern]
+            if tick_count % (on_ticks + off_ticks) < on_ticks:
+                value |= blink_masks[pattern]
+    if system_ticks and (tick_count // system_ticks) & 1:
+        value |= SYSTEM_MASK
+    changed = value ^ output_mask
+    if changed:
+        output_mask = value
+        bit = 0
+        while changed:
+            if changed & 1:
+                led_pins[bit].value((value >> bit) & 1)
+            changed >>= 1
+            bit += 1
+
+
+
+#------------------------------------------------------------------------------
+def set_solid(mask):
+    '''
+        container LEDs that are on solid, color mask as in calendar_index
+    '''
+    global solid_mask, shown
+    solid_mask = mask & ~SYSTEM_MASK
+    shown      = -1
+    # a solid LED wins over a blinking one
+    for pattern in range(len(blink_masks)):
+        blink_masks[pattern] &= ~solid_mask
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def set_blink(pattern, mask):
+    '''
+        container LEDs that are blinking with one of the PATTERN_ blink patterns
+    '''
+    global shown
+    shown = -1
+    mask &= ~(solid_mask | SYSTEM_MASK)
+    # an earlier pattern (tomorrow) wins over a later one (day after)
+    for earlier in range(pattern):
+        mask &= ~blink_masks[earlier]
+    blink_masks[pattern] = mask
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def show(today, tomorrow, day_after):
+    '''
+        all container LEDs at once: solid for today, blinking for tomorrow and a short flash
+        for the day after, color masks as in calendar_index
+        returns False when the masks are the same as the last time and nothing was touched
+    '''
+    global solid_mask, shown
+    key = (today & 0xFF) | (tomorrow & 0xFF) << 8 | (day_after & 0xFF) << 16
+    if key == shown:
+        return False
+    shown = key
+    # solid wins over blinking, tomorrow wins over the day after
+    today     &= ~SYSTEM_MASK
+    tomorrow  &= ~(today | SYSTEM_MASK)
+    day_after &= ~(today | tomorrow | SYSTEM_MASK)
+    solid_mask = today
+    blink_masks[PATTERN_TOMORROW]  = tomorrow
+    blink_masks[PATTERN_DAY_AFTER] = day_after
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def set_system(freq):
+    '''
+        let the system LED toggle with freq per second, 0 switches it off
+    '''
+    global system_ticks
+    if freq > 0:
+        system_ticks = max(1, TICK_FREQ // freq)
+    else:
+        system_ticks = 0
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def clear():
+    '''
+        switch off all solid and blinking container LEDs, the system LED is kept
+    '''
+    global solid_mask, shown
+    solid_mask = 0
+    shown      = -1
+    for pattern in range(len(blink_masks)):
+        blink_masks[pattern] = 0
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def is_blinking():
+    '''
+        True when the engine needs its timer running for blinking LEDs
+    '''
+    if system_ticks:
+        return True
+    for mask in blink_masks:
+        if mask:
+            return True
+    return False
+
+
+
+#------------------------------------------------------------------------------
+def is_dark():
+    '''
+        True when no LED at all is on or blinking, including the system LED
+    '''
+    return (solid_mask == 0) and not is_blinking()
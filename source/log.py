@@ -0,0 +1,258 @@
+###############################################################################
+#
+#   Log for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, leveled messages in a preallocated ring buffer
+#             that a background task writes to the serial port or to a
+#             rotating file on the flash, so a serial port that is not read
+#             never stops the tower
+###############################################################################
+import os
+import sys
+import select
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+try:
+    import _thread
+except ImportError:
+    _thread = None
+
+import config # import the config file
+
+DEBUG   = 0
+INFO    = 1
+WARNING = 2
+ERROR   = 3
+LEVEL_NAMES = ('debug', 'info', 'warning', 'error')
+
+# messages below this level are dropped right away
+level = DEBUG if config.run_debug else LEVEL_NAMES.index(config.log_level)
+# for debug messages with arguments that cost something to build: if log.debugging: log.debug(...)
+debugging = level == DEBUG
+# on a PC the output never stalls, so the messages are printed right away
+direct = config.run_system != 'pico'
+
+# the ring buffer, preallocated so a message is only copied in
+ring       = bytearray(config.log_buffer_size)
+ring_start = 0          # oldest byte that was not written out yet
+ring_used  = 0          # bytes that were not written out yet
+dropped    = 0          # messages lost because the ring buffer was full or busy
+# core 1 logs as well, a message that finds the lock taken is dropped instead of waiting
+lock = _thread.allocate_lock() if _thread else None
+# wakes up the drain task, safe to set from the other core and from callbacks
+wake = asyncio.ThreadSafeFlag() if hasattr(asyncio, 'ThreadSafeFlag') else asyncio.Event()
+poller = None
+
+
+
+#------------------------------------------------------------------------------
+def write(message_level, args):
+    '''
+        put a message in the ring buffer, the arguments are joined like print does,
+        never waits for the output
+    '''
+    global ring_used, dropped
+    if message_level < level:
+        return 0
+    if direct:
+        print(*args)
+        return 0
+    data = (' '.join([str(arg) for arg in args]) + '\n').encode()
+    if lock and not lock.acquire(0):
+        dropped += 1
+        return 0
+    size = len(ring)
+    if ring_used + len(data) > size:
+        dropped += 1
+    else:
+        end = (ring_start + ring_used) % size
+        first = min(len(data), size - end)
+        ring[end:end + first] = data[0:first]
+        if first < len(data):
+            ring[0:len(data) - first] = data[first:]
+        ring_used += len(data)
+    if lock:
+        lock.release()
+    wake.set()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def debug(*args):
+    if level <= DEBUG:
+        write(DEBUG, args)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def info(*args):
+    if level <= INFO:
+        write(INFO, args)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def warning(*args):
+    if level <= WARNING:
+        write(WARNING, args)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def error(*args):
+    write(ERROR, args)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def pending(limit, whole_lines):
+    '''
+        the oldest bytes of the ring buffer that were not written out, up to limit bytes,
+        with whole_lines ending at a line end when there is one, call release() after writing them
+    '''
+    count = min(ring_used, len(ring) - ring_start, limit)
+    chunk = memoryview(ring)[ring_start:ring_start + count]
+    if not whole_lines:
+        return chunk
+    for position in range(count - 1, -1, -1):
+        if chunk[position] == 10:
+            return chunk[0:position + 1]
+    return chunk
+
+
+
+#------------------------------------------------------------------------------
+def release(count):
+    '''
+        the count oldest bytes were written out
+    '''
+    global ring_start, ring_used
+    if lock:
+        lock.acquire()
+    ring_start = (ring_start + count) % len(ring)
+    ring_used -= count
+    if lock:
+        lock.release()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def serial_ready():
+    '''
+        True when the serial port takes more output without waiting
+    '''
+    global poller
+    if config.run_system != 'pico':
+        return True
+    if poller == None:
+        poller = select.poll()
+        poller.register(sys.stdout, select.POLLOUT)
+    return len(poller.poll(0)) > 0
+
+
+
+#------------------------------------------------------------------------------
+def drain_serial():
+    '''
+        write to the serial port what it takes now, in pieces of the USB packet size
+        returns True when the ring buffer is empty
+    '''
+    while ring_used and serial_ready():
+        chunk = pending(64, True)
+        if hasattr(sys.stdout, 'buffer'):
+            sys.stdout.buffer.write(chunk)
+        else:
+            sys.stdout.write(bytes(chunk).decode())
+        release(len(chunk))
+    return ring_used == 0
+
+
+
+#------------------------------------------------------------------------------
+def drain_file():
+    '''
+        append the ring buffer to the log file, the full file is moved to log_file + '.1' first
+    '''
+    if ring_used == 0:
+        return 0
+    try:
+        size = os.stat(config.log_file)[6]
+    except OSError:
+        size = 0
+    try:
+        if size + ring_used > config.log_file_size:
+            try:
+                os.remove(config.log_file + '.1')
+            except OSError:
+                pass
+            os.rename(config.log_file, config.log_file + '.1')
+        with open(config.log_file, 'ab') as f:
+            while ring_used:
+                chunk = pending(len(ring), False)
+                f.write(chunk)
+                release(len(chunk))
+        return 0
+    except:
+        # the messages stay in the ring buffer for the next try
+        return -1
+
+
+
+#------------------------------------------------------------------------------
+def report_dropped():
+    '''
+        one message about the messages that were lost, once there is room again
+    '''
+    global dropped
+    if dropped and (ring_used == 0):
+        count = dropped
+        dropped = 0
+        write(WARNING, ('LOG :', count, 'messages dropped'))
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def flush():
+    '''
+        write out what can be written without waiting, before a sleep that stops the tasks,
+        the file is always written completely
+    '''
+    if config.log_output == 'file':
+        drain_file()
+    else:
+        drain_serial()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def drain_task():
+    '''
+        write the ring buffer out in the background, the serial port in small pieces as
+        the host reads them, the file only when the ring buffer is half full or at flush()
+    '''
+    while True:
+        await wake.wait()
+        if not hasattr(asyncio, 'ThreadSafeFlag'):
+            wake.clear()
+        while ring_used:
+            if config.log_output == 'file':
+                if ring_used < len(ring) // 2:
+                    break
+                drain_file()
+            elif drain_serial():
+                break
+            await asyncio.sleep_ms(config.log_drain_ms)
+        report_dropped()
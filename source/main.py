@@ -9,547 +9,425 @@
 #   2025 - March - Henk-Johan
 #           - added RD4 support
 #           - code cleanup
+#   2026 - October
+#           - calendar store on the flash with long horizon prefetch
+#           - day number / color mask index, table lookups for the colors
+#           - single timer LED engine driven by color masks
+#           - event driven wake scheduler with lightsleep / deepsleep
+#           - streaming JSON parsing of the provider responses
+#           - asyncio runtime, non blocking NTP and overlapping provider fetches
+#           - optional dual core mode, calendar fetch and parsing on core 1
+#           - keep-alive connections and DNS cache for the provider fetches
+#           - NTP with several servers, delay compensation and drift estimation
+#           - instant boot from the last known state snapshot, no stop on wifi failure
+#           - integer day numbers in local Dutch time, one clock read per cycle
+#           - optional LAN relay of the calendar between towers
+#           - provider fetches moved to providers for the PC fleet service
+#           - provider engine, no provider specific code in the main loop anymore
+#           - telemetry of the wifi, NTP and LED phases, commands on the serial port
+#           - status server with the state as JSON and a forced calendar refresh
+#           - conditional calendar requests, LEDs only touched when the lights changed
+#           - backoff on failed fetches, fetch right after a wifi reconnect, fleet spread
+#           - network modules imported after the LEDs are restored, heap after import
+#           - log with a background task instead of print, debug messages cost nothing when off
+#           - wifi connection manager, the radio is only on for the network work
+#           - an unchanged calendar is not indexed and stored again
+#           - time sync state kept in the snapshot over a reboot, no time sync at
+#             a reboot with a running RTC before the next sync is due
+#           - clock set from the wake up time in the snapshot after a deepsleep
+#           - busy time of the cores measured per cycle
+#           - relay and status server only imported when they are turned on
 ###############################################################################
+import gc
 import time
-import socket
-import struct
-import requests
-
-import os 
-
+# ticks at the start of the script, for the boot to first correct LED time
+boot_ticks = time.ticks_ms()
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+# only the modules needed to restore the LEDs are imported here, the network
+# modules follow in the main script once the LEDs show the last known state
 import config # import the config file
-
-print('\n')
-print('#'*80)
-print('PI pico trash container signal tower')
-print('Assuming we run on   : ', config.run_system)
-print('Trash company to use : ', config.trash_company)
-print('#'*80)
+import log
+import calendar_store
+import calendar_index
+import leds
+import scheduler
+import snapshot
+import dates
+import telemetry
+
+log.info('\n')
+log.info('#'*80)
+log.info('PI pico trash container signal tower')
+log.info('Assuming we run on   : ', config.run_system)
+log.info('Trash company to use : ', config.trash_company)
+log.info('#'*80)
 
 # check if we are running on a computer for debug or on the real hardware
 platform = config.run_system
 
-if platform == 'pico':
-    from machine import Pin, Timer
-    import network
 
 
 
 #------------------------------------------------------------------------------
-def set_time():
+async def set_time():
     '''
-        Function to get the time from ntp.org and to set the sytem timer correct on the PI pico
+        Function to get the time from the time servers and to set the sytem timer correct on the PI pico,
+        see ntp.sync for the delay compensation and drift estimation
     '''
-    last_status = ''
+    mark = telemetry.begin()
     try:
-        NTP_QUERY = bytearray(48)
-        NTP_QUERY[0] = 0x1B
-        last_status = 'NTP : get address'
-        addr = socket.getaddrinfo(config.time_host, 123)[0][-1]
-        last_status = 'NTP : get socket'
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            s.settimeout(5)
-            last_status = 'NTP : waiting for response after query'
-            res = s.sendto(NTP_QUERY, addr)
-            last_status = 'NTP : receiving message'
-            msg = s.recv(48)
-        finally:
-            s.close()
-        last_status = 'NTP : unpacking message'
-        val = struct.unpack("!I", msg[40:44])[0]
-        last_status = 'NTP : calculating time delta'
-        t = val - config.time_NTP_DELTA
-        last_status = 'NTP : building time tuples'
-        tm = time.gmtime(t)
-        last_status = 'NTP : setting machine time'
-        machine.RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
-        last_status = 'NTP : system time updated OK'
-        return 0
+        result = await ntp.sync()
     except:
-        print('NTP : error :', last_status)
-        return -1
+        log.warning('NTP : error :', ntp.last_status)
+        result = -1
+    telemetry.end(telemetry.PHASE_NTP, mark, result == 0)
+    return result
 
 
 #------------------------------------------------------------------------------
-def get_pickup_dates_twente(company_code, address_id, start_date, end_date):
-    '''
-        Function to get the pickup dates for the containers for a certain time period in Twente
-        company_code : unique code for the company picking up containers in the region
-        address_id   : generated unique id for a certain address
-        start_date   : string YYYY-MM-DD
-        end_date     : string YYYY-MM-DD
-    '''
+async def refresh_calendar(day_today):
+    '''
+        fetch the pickup dates for the complete horizon in one go and put them in the calendar store
+        returns 0 when the store was updated, -1 when the fetch failed and the old calendar is kept
+    '''
+    now = time.time()
+    if config.fleet_url:
+        # the fleet service already fetched the calendar for this address
+        result = await relay.fetch_fleet(providers.config_address())
+        http_client.close_all()
+        if result == None:
+            return -1
+        index, horizon, fetched = result
+        return calendar_store.update(index, horizon, fetched)
     try:
-        data = f"companyCode={company_code}&uniqueAddressID={address_id}&startDate={start_date}&endDate={end_date}"
-        url = "https://twentemilieuapi.ximmio.com/api/GetCalendar"
-        headers = {"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"}
-        res = requests.post(url, headers=headers, data=data, timeout=5)
-        return res.json()["dataList"]
+        if config.dual_core:
+            days, horizon = await core_worker.run(providers.fetch_calendar_blocking, providers.config_address(), day_today,
+                                                  calendar_store.calendar_index_data)
+        else:
+            days, horizon = await providers.fetch_calendar(providers.config_address(), day_today,
+                                                           calendar_store.calendar_index_data)
     except:
-        return []
+        log.warning('CALENDAR : error while decoding response message')
+        days = {}
+    # the keep-alive connections are only used within one refresh
+    http_client.close_all()
+    providers.report()
+
+    if len(days) == 0:
+        log.warning('CALENDAR : fetch failed, keeping the calendar up to day', calendar_store.calendar_horizon)
+        return -1
+    if providers.last_unchanged and (horizon == calendar_store.calendar_horizon):
+        # every response matched the stored calendar
+        return calendar_store.confirm(now)
+    return calendar_store.update(calendar_index.build_index(days), horizon, now)
 
 
-#------------------------------------------------------------------------------
-def get_pickup_dates_rd4(year, month, postal_code, house_number):
-    '''
-        Function to get the pickup dates for the containers for a certain time period in RD4 covered region
-        year            : the year for which to get the dates
-        month           : the month for which to get the dates
-        postal_code     : the postal code of the address
-        house_number    : the house number of the address
-        https://data.rd4.nl/api/v1/waste-calendar/?year=2025&postal_code=6269NR&house_number=10&month=4
-    '''
-    try:
-        url = f"https://data.rd4.nl/api/v1/waste-calendar/?year={year}&postal_code={postal_code}&house_number={house_number}&month={month}"
-        res = requests.get(url, timeout=5)
-        return res.json()["data"]
-    except:
-        return []
-
 
 
 #------------------------------------------------------------------------------
-def get_bin_color_twente(type_number):
+def show_lights(mask_today, mask_tomorrow, mask_day_after):
     '''
-        mapping of the trash type number to container and LED color
+        the led for today will be solid, for tomorrow flashing and for the day after tomorrow
+        a short flash, masks as in calendar_index, the LEDs are not touched when nothing changed
     '''
-    bin_color = 'unkown'
-    if type_number == 0:    # gray bin
-        bin_color = 'GRAY'
-    if type_number == 1:    # green bin
-        bin_color = 'GREEN'
-    if type_number == 2:    # blue bin
-        bin_color = 'BLUE'
-    if type_number == 6:    # christmas tree
-        bin_color = 'RED'
-    if type_number == 10:   # orange bin
-        bin_color = 'ORANGE'
-    return bin_color
+    if not leds.show(mask_today, mask_tomorrow, mask_day_after):
+        return 0
+    if mask_today:
+        log.info(calendar_index.mask_to_colors(mask_today), 'will be on solid for pickup today')
+    if mask_tomorrow:
+        log.info(calendar_index.mask_to_colors(mask_tomorrow), 'will be flashing for pickup tomorrow')
+    if mask_day_after:
+        log.info(calendar_index.mask_to_colors(mask_day_after), 'will be flashing short for pickup the day after tomorrow')
+    return 0
 
 
 
 #------------------------------------------------------------------------------
-def get_bin_color_rd4(type_name):
+async def network_up(now):
     '''
-        mapping of type name to container and LED color
+        bring the wifi up for network work, the other tasks keep running while connecting
+        returns True when connected
     '''
-    bin_color = 'unkown'
-    if type_name == 'residual_waste':   # gray bin
-        bin_color = 'GRAY'
-    if type_name == 'gft':              # green bin
-        bin_color = 'GREEN'
-    if type_name == 'paper':            # blue bin
-        bin_color = 'BLUE'
-    # if type_name == 'pruning_waste':    # spring and autumn cuttings of trees and shrubs
-        # bin_color = 'RED'
-    if type_name == 'best_bag':         # books / electronics / recycle materials
-        bin_color = 'RED'
-    if type_name == 'pmd':              # orange bin
-        bin_color = 'ORANGE'
-    return bin_color
-
+    global wifi_status
+    if wifi.is_connected():
+        wifi_status = True
+        return True
+    was_connected = wifi_status
+    mark = telemetry.begin()
+    wifi_status = await wifi.connect()
+    telemetry.end(telemetry.PHASE_WIFI, mark, wifi_status)
+    if wifi_status and not was_connected:
+        # the failed time sync and fetch go first now the wifi is back
+        for name in ['ntp', 'calendar']:
+            if scheduler.retry_now(name, now):
+                log.info('WIFI : reconnected,', name, 'retry moved to now')
+    return wifi_status
 
 
-#------------------------------------------------------------------------------
-def tick_system(timer):
-    '''
-        the system LED on the PI pico board
-    '''
-    global systemled
-    systemled.toggle()
-
-#------------------------------------------------------------------------------
-def tick_gray(timer):
-    '''
-        the LED for the gray container
-    '''
-    global container_gray
-    container_gray.toggle()
 
 #------------------------------------------------------------------------------
-def tick_green(timer):
-    '''
-        the LED for the green container
-    '''
-    global container_green
-    container_green.toggle()
+def update_display(day_today):
+    '''
+        set the container LEDs for today, tomorrow and the day after from the stored calendar
+    '''
+    global lights_today, lights_tomorrow, lights_day_after, boot_first_led_ms
+    mark = telemetry.begin()
+    lights_today    = calendar_store.lights_for(day_today)
+    lights_tomorrow = calendar_store.lights_for(day_today + 1)
+    lights_day_after = 0
+    if config.led_show_day_after:
+        lights_day_after = calendar_store.lights_for(day_today + 2)
+    show_lights(lights_today, lights_tomorrow, lights_day_after)
+    snapshot.save(time.time(), day_today, lights_today, lights_tomorrow, lights_day_after, calendar_store.calendar_horizon)
+    telemetry.end(telemetry.PHASE_LED, mark)
+    # the first time the LEDs are set with a valid clock and calendar
+    if (boot_first_led_ms < 0) and time_valid and (calendar_store.calendar_fetched != 0):
+        boot_first_led_ms = time.ticks_diff(time.ticks_ms(), boot_ticks)
+        log.info('BOOT : first correct LEDs after', boot_first_led_ms, 'ms')
+    return 0
 
-#------------------------------------------------------------------------------
-def tick_blue(timer):
-    '''
-        the LED for the blue container
-    '''
-    global container_blue
-    container_blue.toggle()
 
-#------------------------------------------------------------------------------
-def tick_orange(timer):
-    '''
-        the LED for the orange container
-    '''
-    global container_orange
-    container_orange.toggle()
 
 #------------------------------------------------------------------------------
-def tick_red(timer):
-    '''
-        the LED for the christmas tree / best_bag
-    '''
-    global container_red
-    container_red.toggle()
+def restore_display():
+    '''
+        put the LEDs back right at boot, before any network work
+        returns True when the clock can be trusted
+    '''
+    global lights_today, lights_tomorrow, lights_day_after, time_valid
+    if not snapshot.load():
+        return False
+    now = time.time()
+    if (not snapshot.clock_plausible(now)) and scheduler.clock_after_deepsleep(snapshot.wake_time):
+        now = time.time()
+        log.info('BOOT : clock set to the end of the deepsleep')
+    if snapshot.wake_time:
+        # only the first boot after the deepsleep may use it
+        snapshot.save_wake(0)
+    if snapshot.clock_plausible(now):
+        # the RTC kept running (soft reset) or was set after a deepsleep, the stored calendar knows the lights
+        time_valid = True
+        update_display(dates.local_day(now))
+        log.info('BOOT : display restored from the calendar after', time.ticks_diff(time.ticks_ms(), boot_ticks), 'ms')
+        return True
+    # the RTC was reset, show the last known lights until the time server answers
+    lights_today     = snapshot.lights_today
+    lights_tomorrow  = snapshot.lights_tomorrow
+    lights_day_after = snapshot.lights_day_after
+    show_lights(lights_today, lights_tomorrow, lights_day_after)
+    log.info('BOOT : display restored from the snapshot of day', snapshot.last_day, 'after', time.ticks_diff(time.ticks_ms(), boot_ticks), 'ms')
+    return False
 
 
 
 #------------------------------------------------------------------------------
-def make_date_string(timedata):
-    '''
-        prepare formatted date string for the API YYYY-MM-DD
-    '''
-    date_string = str(timedata[0])
-    date_string += '-'
-    if len(str(timedata[1])) == 1:
-        date_string += '0' + str(timedata[1])
-    else:
-        date_string += str(timedata[1])
-    date_string += '-'
-    if len(str(timedata[2])) == 1:
-        date_string += '0' + str(timedata[2])
-    else:
-        date_string += str(timedata[2])
-    return date_string    
-
+async def main():
+    '''
+        the main task, runs what the scheduler has due and sleeps until the next event
+    '''
+    global wifi_status, time_valid, first_start
+    # writes the log out in the background, also the messages of the boot
+    asyncio.create_task(log.drain_task())
+    if config.telemetry_serial:
+        # type telemetry or dump on the serial port for the timings of the phases
+        asyncio.create_task(telemetry.serial_task())
+    if config.status_port:
+        # the server has to answer at any time, so no lightsleep or deepsleep
+        if await status_server.start() != None:
+            scheduler.stay_awake = True
+    while True:
+        log.debug('-'*80)
+        loop_start = time.ticks_us()
 
+        #----------------------------------------------------------------------
+        # read the clock once for the complete cycle, days are local day numbers
+        now, day_today, day_seconds = dates.read_clock()
+        #----------------------------------------------------------------------
+        #day_today       = dates.day_number(2025, 11, 5)    # for debug
+        #----------------------------------------------------------------------
+        #day_today       = dates.day_number(2025, 6, 30)    # for debug
+        #----------------------------------------------------------------------
+        log.debug('day today', day_today, '| hour', day_seconds // 3600, 'minute', day_seconds // 60 % 60)
+        if log.debugging:
+            log.debug('date today', dates.day_string(day_today))
+        display_needed = first_start
+        if config.status_port:
+            # keeps the uptime right over the wrap of the ticks
+            status_server.uptime_seconds()
+        if time_valid:
+            wifi.new_day(day_today)
 
-#------------------------------------------------------------------------------
-def trash_types_to_day_colors_twente(trash_types, date_today, date_tomorrow, debug=False):
-    '''
-        take the trash type list and break it down into a container color for today and tomorrow
-    '''
-    lights_today     = []
-    lights_tomorrow  = []
-    try:
-        if len(trash_types) > 0:    
-            for type in trash_types:
-                if debug == True:
-                    print('-'*80)
-                type_number = type["pickupType"]
-                # type_text = type["_pickupTypeText"]
-                datelist = type["pickupDates"]
-                # print(type_text, type_number, get_bin_color_twente(type_number) )
-                if len(datelist) > 0:
-                    for dateitem in datelist:
-                        if len(dateitem) < 10:
-                            continue
-                        rawdate = dateitem.split('T')[0]
-                        if debug == True:
-                            print('Twente : ', dateitem, rawdate, type_number, get_bin_color_twente(type_number))
-                        if str(rawdate) == str(date_today):
-                            lights_today.append(get_bin_color_twente(type_number))
-                            print('Found for today', type_number, 'light color', get_bin_color_twente(type_number))
-                        if str(rawdate) == str(date_tomorrow):
-                            lights_tomorrow.append(get_bin_color_twente(type_number))
-                            print('Found for tomorrow', type_number, 'light color', get_bin_color_twente(type_number))
-    except:
-        print('Twente : error while decoding response message')
-    return [lights_today, lights_tomorrow]
+        #----------------------------------------------------------------------
+        # check the wifi status and reconnect if needed, only when the radio stays on,
+        # otherwise the network work brings it up itself
+        if (platform == 'pico') and (config.wifi_power != 'off' or scheduler.stay_awake) and scheduler.is_due('wifi', now):
+            if await network_up(now):
+                scheduler.schedule('wifi', now + 60*config.schedule_wifi_minutes)
+            else:
+                scheduler.schedule('wifi', now + 60*config.schedule_wifi_retry_minutes)
 
+        #----------------------------------------------------------------------
+        # set the system time when the resync is due and with working wifi
+        if scheduler.is_due('ntp', now):
+            if (platform == 'pico') and not await network_up(now):
+                scheduler.retry('ntp', now)
+            elif platform == 'pico':
+                if first_start:
+                    log.info('NTP : first start set time, going to contact time server')
+                else:
+                    log.info('NTP : resync is due, so going to update time')
+                if await set_time() < 0:
+                    # fast blinking system led indicates that the time could not be updated
+                    leds.set_system(5)
+                    log.warning('NTP : something did not go well when updating the system time')
+                    scheduler.retry('ntp', time.time())
+                else:
+                    scheduler.succeeded('ntp')
+                    snapshot.save_clock(ntp.last_sync_time, ntp.drift_ppm)
+                    # slow blinking indicates that the time was set correctly
+                    leds.set_system(config.led_system_ok_freq)
+                    log.info('NTP : system time updated correctly from time server')
+                    scheduler.schedule('ntp', ntp.next_sync_due(time.time()))
+                    log.info('NTP : next sync in', ntp.next_sync_due(time.time()) - time.time(), 'seconds')
+                    if not time_valid:
+                        # the clock jumped from the reset value, reconcile the display now
+                        display_needed = True
+                    time_valid = True
+                    # the clock may have jumped, so read it again
+                    now, day_today, day_seconds = dates.read_clock()
+            else:
+                scheduler.schedule('ntp', now + 60*60*config.ntp_max_interval_hours)
 
-#------------------------------------------------------------------------------
-def trash_types_to_day_colors_rd4(trash_json, date_today, date_tomorrow, debug=False):
-    '''
-        take the json from rd4 and check if we have bin for today or tomorrow
-    '''
-    lights_today     = []
-    lights_tomorrow  = []    
-    try:
-        # split the items section out of the json return
-        items = trash_json['items'][0]
-        #print(items)
-        if len(items) > 0:    
-            for item in items:
-                if debug == True:
-                    print('RD4 : ', item)
-                if str(item['date']) == str(date_today):
-                    lights_today.append(get_bin_color_rd4(item['type']))
-                    print('RD4 : Found for today', item, 'light color', get_bin_color_rd4(item['type']))
-                if str(item['date']) == str(date_tomorrow):
-                    lights_tomorrow.append(get_bin_color_rd4(item['type']))
-                    print('RD4 : Found for tomorrow', item, 'light color', get_bin_color_rd4(item['type']))
-    except:
-        print('RD4 : error while decoding response message')
-    return [lights_today, lights_tomorrow]
+        #----------------------------------------------------------------------
+        # the relay needs the right time, so it starts after the first time sync
+        if (config.relay_mode != 'off') and time_valid and wifi.is_connected() and (relay.listen_until == 0):
+            relay.init(now)
+            scheduler.stay_awake = True
+            asyncio.create_task(relay.run(wifi.ip()))
+        if (config.relay_mode != 'off') and relay.calendar_updated:
+            # another tower sent a newer calendar, show it and plan the next check on it
+            relay.calendar_updated = False
+            display_needed = True
+            scheduler.schedule('calendar', now)
 
+        #----------------------------------------------------------------------
+        # only go to the API when the stored calendar gets short or stale
+        # or when a refresh was forced on the status server
+        day_limit = day_today + config.calendar_min_horizon_days
+        # without a valid clock the forced refresh stays waiting
+        force_refresh = time_valid and (config.status_port != 0) and status_server.take_refresh(now)
+        if time_valid and (scheduler.is_due('calendar', now) or force_refresh):
+            if force_refresh or calendar_store.needs_refresh(now, day_limit):
+                if (not force_refresh) and (config.relay_mode != 'off') and (not relay.should_fetch(now)):
+                    # the relay tower fetches, wait for its frame
+                    log.info('RELAY : waiting for the calendar of the relay tower')
+                    scheduler.schedule('calendar', relay.fetch_due(now))
+                elif (await network_up(now)) and (await refresh_calendar(day_today) == 0):
+                    calendar_store.attempted(now, True)
+                    scheduler.succeeded('calendar')
+                    if config.relay_mode != 'off':
+                        relay.became_relay()
+                    display_needed = True
+                else:
+                    # the stored calendar stays in use, try again after the backoff
+                    # or as soon as the wifi is back
+                    calendar_store.attempted(now, False)
+                    scheduler.retry('calendar', now)
+            # the next moment the stored calendar gets short or stale, at a moment of
+            # its own for this tower so a fleet of towers does not fetch at the same time
+            if not calendar_store.needs_refresh(now, day_limit):
+                log.info('CALENDAR : stored calendar is valid up to day', calendar_store.calendar_horizon)
+                scheduler.schedule('calendar', scheduler.spread(calendar_store.refresh_due(now)))
 
+        #----------------------------------------------------------------------
+        # on a new day or on the first startup take the lights from the stored calendar,
+        # this also works without wifi as long as the calendar still covers the dates,
+        # without a valid clock the LEDs restored from the snapshot are kept
+        if time_valid and (scheduler.is_due('midnight', now) or display_needed):
+            scheduler.schedule('midnight', scheduler.next_midnight(now))
+            update_display(day_today)
 
+        #----------------------------------------------------------------------
+        # disable the first start
+        first_start = False
 
-#------------------------------------------------------------------------------
-def disable_all_leds():
-    '''
-        diable all solid and flashing container leds
-    '''
-    if platform == 'pico':
-        container_gray.value(0)
-        container_green.value(0)
-        container_blue.value(0)
-        container_orange.value(0)
-        container_red.value(0)
-        tim_gray.deinit()
-        tim_green.deinit()
-        tim_blue.deinit()
-        tim_orange.deinit()
-        tim_red.deinit()
-    return 0    
+        if config.dual_core:
+            core_worker.add_busy(0, loop_start)
+            core_worker.busy_report()
+            # one window per cycle, a window of the whole uptime would pass the wrap of the ticks
+            core_worker.reset_busy()
 
+        # the radio is only on for the network work, unless a server has to keep listening
+        wifi.idle(scheduler.stay_awake)
 
+        # sleep until the next event that can change something
+        event_name, event_due = scheduler.next_event()
+        log.info('SCHEDULER : next event is', event_name, ', going to sleep', event_due - time.time(), 'seconds')
+        await scheduler.sleep_until(event_due)
 
-#------------------------------------------------------------------------------
-def set_led_today(lights_today):
-    '''
-        the led for today will be solid
-    '''
-    if len(lights_today) > 0:
-        print(lights_today, 'will be on solid for pickup today')
-        if platform == 'pico':
-            if 'GRAY' in lights_today:
-                container_gray.value(1)
-            if 'GREEN' in lights_today:
-                container_green.value(1)
-            if 'BLUE' in lights_today:
-                container_blue.value(1)
-            if 'ORANGE' in lights_today:
-                container_orange.value(1)
-            if 'RED' in lights_today:
-                container_red.value(1)
-    return 0
 
+###############################################################################
+###############################################################################
+###############################################################################
 
+# MAIN SCRIPT
 
 #------------------------------------------------------------------------------
-def set_led_tomorrow(lights_tomorrow):
-    '''
-        the led for tomorrow will be flashing
-    '''
-    if len(lights_tomorrow) > 0:
-        print(lights_tomorrow, 'will be flashing for pickup tomorrow')
-        if platform == 'pico':
-            if 'GRAY' in lights_tomorrow:
-                tim_gray.init(freq=1, mode=Timer.PERIODIC, callback=tick_gray)
-            if 'GREEN' in lights_tomorrow:
-                tim_green.init(freq=1, mode=Timer.PERIODIC, callback=tick_green)
-            if 'BLUE' in lights_tomorrow:
-                tim_blue.init(freq=1, mode=Timer.PERIODIC, callback=tick_blue)
-            if 'ORANGE' in lights_tomorrow:
-                tim_orange.init(freq=1, mode=Timer.PERIODIC, callback=tick_orange)
-            if 'RED' in lights_tomorrow:
-                tim_red.init(freq=1, mode=Timer.PERIODIC, callback=tick_red)
-    return 0    
+# prepare LEDs, indicate fast blinking as booting
+leds.init()
+leds.set_system(10)
 
 
 #------------------------------------------------------------------------------
-def is_last_day_of_month(month, day):
-    '''
-        function to check if a certain month, day combination is the last of the month
-    '''
-    result = False
-    # check months with 31 days
-    if (day == 31) and (month in [1,3,5,7,8,10,12]):
-        result = True
-    # check months with 30 days
-    if (day == 30) and (month in [4,6,9,11]):
-        result = True
-    # check February
-    if (day in [28,29]) and (month == 2):
-        result = True
-    return result
+# load the calendar that was stored on the flash during an earlier run
+# and restore the LEDs from the last known state before any network work
+lights_today      = 0
+lights_tomorrow   = 0
+lights_day_after  = 0
+boot_first_led_ms = -1
+time_valid        = platform != 'pico'  # the RTC of the PI pico is only right after NTP
+calendar_store.load()
+restore_display()
 
 
-###############################################################################
-###############################################################################
-###############################################################################
-
-# MAIN SCRIPT
-
 #------------------------------------------------------------------------------
-# prepare LEDs
-if platform == 'pico':
-    systemled        = Pin("LED", Pin.OUT)
-    container_gray   = Pin(20, Pin.OUT)
-    container_green  = Pin(19, Pin.OUT)
-    container_blue   = Pin(18, Pin.OUT)
-    container_orange = Pin(17, Pin.OUT)
-    container_red    = Pin(16, Pin.OUT)
-    # prepare timers
-    tim_system = Timer()
-    tim_gray   = Timer()
-    tim_green  = Timer()
-    tim_blue   = Timer()
-    tim_orange = Timer()
-    tim_red    = Timer()
+# the network modules are only needed from here on
+import http_client
+import providers
+import ntp
+import wifi
+# the relay and the status server are off by default, so they are only imported when used
+if (config.relay_mode != 'off') or config.fleet_url:
+    import relay
+if config.status_port:
+    import status_server
+if config.dual_core:
+    import core_worker
+gc.collect()
+boot_heap_free = gc.mem_free() if hasattr(gc, 'mem_free') else 0
+log.info('BOOT : all modules imported after', time.ticks_diff(time.ticks_ms(), boot_ticks), 'ms,', boot_heap_free, 'bytes heap free')
 
 
 #------------------------------------------------------------------------------
-# indicate fast blinking as booting
-if platform == 'pico':
-    tim_system.init(freq=10, mode=Timer.PERIODIC, callback=tick_system)
+# the drift estimate survives any reboot, the time of the last sync only when the RTC kept running
+ntp.restore(snapshot.sync_time if time_valid and (snapshot.sync_time <= time.time()) else 0, snapshot.drift_ppm)
+if (platform == 'pico') and ntp.last_sync_time:
+    # a deepsleep wake up or soft reset, the clock is still good until the next sync is due
+    scheduler.schedule('ntp', ntp.next_sync_due(time.time()))
+    leds.set_system(config.led_system_ok_freq)
 
 
 #------------------------------------------------------------------------------
-# connect wifi
-wifi_status = True
-if platform == 'pico':
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    wlan.connect(config.wifi_ssid, config.wifi_password)
-    # Wait for connect or fail
-    max_wait = 10
-    while max_wait > 0:
-        if wlan.status() < 0 or wlan.status() >= 3:
-            break
-        max_wait -= 1
-        print('WIFI : waiting for connection...')
-        time.sleep(1)
-    # Handle connection error
-    if wlan.status() != 3:
-        tim_system.init(freq=10, mode=Timer.PERIODIC, callback=tick_system)
-        wifi_status = False
-        raise RuntimeError('WIFI : network connection failed')
-    else:
-        print('WIFI : connected')
-        status = wlan.ifconfig()
-        print( 'WIFI : ip = ' + status[0] )
-
+# the wifi is connected by the main loop when the first network work is due
+wifi_status = platform != 'pico'
+wifi.init()
 
 
 ###############################################################################
-light_today     = ''
-light_tomorrow  = ''
-first_start     = True
-# main script    
-while True:    
-    print('-'*80)
-
-    print(machine.RTC().datetime())
-
-    #--------------------------------------------------------------------------
-    # build date strings for today and tomorrow
-    if platform == 'pico':
-        date_today      = make_date_string(machine.RTC().datetime()) # localtime is in tuples
-        date_tomorrow   = make_date_string(time.gmtime(time.time() + 60*60*24)) # timetime needed as number convert with gmtime to tuples
-        date_year       = machine.RTC().datetime()[0]
-        date_month      = machine.RTC().datetime()[1]
-        date_day        = machine.RTC().datetime()[2]
-        date_hour       = machine.RTC().datetime()[4]
-        date_minute     = machine.RTC().datetime()[5]
-    else:
-        date_today      = make_date_string(time.localtime()) # localtime is in tuples
-        date_tomorrow   = make_date_string(time.gmtime(time.time() + 60*60*24)) # timetime needed as number convert with gmtime to tuples
-        date_year       = time.localtime()[0]
-        date_month      = time.localtime()[1]
-        date_day        = time.localtime()[2]
-        date_hour       = time.localtime()[3]
-        date_minute     = time.localtime()[4]
-    #--------------------------------------------------------------------------
-    #date_today      = '2025-11-05'  # for debug
-    #date_tomorrow   = '2025-11-06'  # for debug
-    #date_year       = 2025          # for debug
-    #date_month      = 11            # for debug
-    #date_day        = 5             # for debug
-    #--------------------------------------------------------------------------
-    #date_today      = '2025-06-30'  # for debug
-    #date_tomorrow   = '2025-07-01'  # for debug
-    #date_year       = 2025          # for debug
-    #date_month      = 6             # for debug
-    #date_day        = 30            # for debug
-    #--------------------------------------------------------------------------
-    print('date today', date_today, '| date tomorrow', date_tomorrow, '| hour', date_hour, 'minute', date_minute)
-
-
-    #--------------------------------------------------------------------------
-    # check the wifi status every hour and reconnect if needed
-    if platform == 'pico':
-        if wlan.status() != 3:
-            print('WIFI : trying to reconnect...')
-            wlan.disconnect()
-            wlan.connect(config.wifi_ssid, config.wifi_password)
-            # Wait for connect or fail
-            max_wait = 10
-            while max_wait > 0:
-                if wlan.status() < 0 or wlan.status() >= 3:
-                    break
-                max_wait -= 1
-                print('WIFI : waiting for connection...')
-                time.sleep(1)
-            # report back reconnect status
-            if wlan.status() == 3:
-                print('WIFI : wifi reconnected')
-                wifi_status = True
-            else:
-                print('WIFI : wifi reconnect failed')
-                wifi_status = False
-
-    #--------------------------------------------------------------------------
-    # only on the 0 hour or on the first startup and with working wifi
-    if ((date_hour == 0) or (first_start == True)) and (wifi_status == True):
-        # set the system time
-        if platform == 'pico':
-            if first_start:
-                print('NTP : first start set time, going to contact time server')
-            else:
-                print('NTP : hour is 0, so going to update time')
-            if set_time() < 0:
-                # fast blinking system led indicates that the time could not be updated
-                tim_system.init(freq=5, mode=Timer.PERIODIC, callback=tick_system)
-                print('NTP : something did not go well when updating the system time')
-            else:        
-                # slow blinking indicates that the time was set correctly
-                tim_system.init(freq=1, mode=Timer.PERIODIC, callback=tick_system)
-                print('NTP : system time updated correctly from time server')
-
-        # get the light codes for Twente
-        if config.trash_company == 'twente':
-            # get the trash_types from the API for this timeframe
-            trash_types = get_pickup_dates_twente(config.trash_company_code, config.trash_address_id, date_today, date_tomorrow)
-            if trash_types != None:
-                [lights_today, lights_tomorrow] = trash_types_to_day_colors_twente(trash_types, date_today, date_tomorrow, config.run_debug)
-
-        # get the light codes for RD4
-        if config.trash_company == 'rd4':
-            # get the pickups for the current month
-            trash_types = get_pickup_dates_rd4(date_year, date_month, config.trash_postal_code, config.trash_house_number)
-            if trash_types != None:
-                [lights_today, lights_tomorrow] = trash_types_to_day_colors_rd4(trash_types, date_today, date_tomorrow, config.run_debug)
-            # check if we are on the last day of the month            
-            if is_last_day_of_month(date_month, date_day):                
-                # check if we are in the last month
-                if date_month == 12:
-                    date_month = 1    # reset to month 1
-                    date_year += 1    # then also up the year
-                else:
-                    date_month += 1   # in case of normal, just up the month
-                print('RD4 : last day of month detected, checking also for', date_month, date_year)
-                # now get the pickups for the next month, but only for the tomorrow light
-                time.sleep(1)
-                trash_types = get_pickup_dates_rd4(date_year, date_month, config.trash_postal_code, config.trash_house_number)
-                if trash_types != None:
-                    [lights_fake, lights_tomorrow] = trash_types_to_day_colors_rd4(trash_types, date_today, date_tomorrow, config.run_debug)
-                
-
-        #----------------------------------------------------------------------
-        # disable all leds, then set them for today and tomorrow
-        disable_all_leds()
-        set_led_today(lights_today)
-        set_led_tomorrow(lights_tomorrow)
-    
-    #--------------------------------------------------------------------------
-    # disable the first start
-    first_start = False
-    
-    # smart sleep so we are awake at minute 2 past the hour
-    date_minute = time.localtime()[4]
-    sleep_time = 60 - (date_minute - 2) 
-    if sleep_time < 1:
-        sleep_time = 2
-    print('current date minute is', date_minute, ', going to sleep', sleep_time, 'minutes to get back to 2 past the hour')
-    time.sleep(60*sleep_time)
-    
+first_start       = True
+# main script
+asyncio.run(main())
@@ -0,0 +1,208 @@
+###############################################################################
+#
+#   Time synchronization for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, queries several NTP servers, compensates for the
+#             network delay, learns the drift of the RTC and only resyncs when
+#             the predicted error gets too large
+#           - port of the time servers from the config
+#           - messages through log
+#           - time of the last sync and drift estimate restored after a reboot
+###############################################################################
+import time
+import socket
+import struct
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import resolver
+
+if config.run_system == 'pico':
+    import machine
+
+# state of the time synchronization
+last_sync_time  = 0     # time.time() of the last sync, 0 when the clock was never synced
+last_error_ms   = 0     # how far the clock was off at the last sync
+last_delay_ms   = 0     # network round trip of the best server at the last sync
+last_server     = ''
+last_status     = ''
+drift_ppm       = 0     # estimated drift of the RTC, positive is running fast, 0 is unknown
+
+
+
+#------------------------------------------------------------------------------
+def time_hosts():
+    '''
+        the list of time servers, falls back to the single time_host of older configs
+    '''
+    if hasattr(config, 'time_hosts'):
+        return config.time_hosts
+    return [config.time_host]
+
+
+
+#------------------------------------------------------------------------------
+async def query(host):
+    '''
+        send one SNTP query to a host
+        returns (server time in ms at receive_ticks, receive_ticks as time.ticks_ms(), round trip delay in ms)
+    '''
+    global last_status
+    NTP_QUERY = bytearray(48)
+    NTP_QUERY[0] = 0x1B
+    last_status = 'NTP : get address of ' + host
+    addr = (resolver.resolve(host, config.ntp_port), config.ntp_port)
+    last_status = 'NTP : get socket'
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.setblocking(False)
+        last_status = 'NTP : waiting for response after query to ' + host
+        send_ticks = time.ticks_ms()
+        s.sendto(NTP_QUERY, addr)
+        msg = None
+        while msg == None:
+            try:
+                msg = s.recv(48)
+            except OSError:
+                if time.ticks_diff(time.ticks_ms(), send_ticks) > 1000 * config.ntp_timeout:
+                    raise
+                await asyncio.sleep_ms(5)
+        receive_ticks = time.ticks_ms()
+    finally:
+        s.close()
+    last_status = 'NTP : unpacking message from ' + host
+    if (len(msg) < 48) or (msg[1] == 0):
+        # stratum 0 is a kiss of death, the server does not want to be asked
+        raise OSError('NTP : no usable answer from ' + host)
+    rx_seconds, rx_fraction, tx_seconds, tx_fraction = struct.unpack("!IIII", msg[32:48])
+    # time the server needed between receiving the query and sending the answer
+    server_ms = (tx_seconds - rx_seconds) * 1000 + ((tx_fraction * 1000) >> 32) - ((rx_fraction * 1000) >> 32)
+    delay_ms = max(0, time.ticks_diff(receive_ticks, send_ticks) - server_ms)
+    # the answer took half of the round trip to get back
+    server_time_ms = (tx_seconds - config.time_NTP_DELTA) * 1000 + ((tx_fraction * 1000) >> 32) + delay_ms // 2
+    return server_time_ms, receive_ticks, delay_ms
+
+
+
+#------------------------------------------------------------------------------
+async def rtc_second_edge():
+    '''
+        wait for the RTC to tick to the next second
+        returns (time.ticks_ms() at the tick, time.time() after the tick)
+    '''
+    start = time.time()
+    limit = time.ticks_ms()
+    while time.ticks_diff(time.ticks_ms(), limit) < 1100:
+        now = time.time()
+        if now != start:
+            return time.ticks_ms(), now
+        await asyncio.sleep_ms(2)
+    return time.ticks_ms(), time.time()
+
+
+
+#------------------------------------------------------------------------------
+async def sync():
+    '''
+        ask the time servers, take the answer with the shortest round trip,
+        learn the drift of the RTC and set it on a second boundary
+        returns 0 when the time was set, -1 when no server answered
+    '''
+    global last_sync_time, last_error_ms, last_delay_ms, last_server, last_status, drift_ppm
+    best = None
+    best_host = ''
+    for host in time_hosts()[0:config.ntp_servers_per_sync]:
+        try:
+            sample = await query(host)
+            log.debug('NTP :', host, 'round trip', sample[2], 'ms')
+            if (best == None) or (sample[2] < best[2]):
+                best = sample
+                best_host = host
+        except:
+            log.warning('NTP : error :', last_status)
+            # the address may have changed, resolve it again next time
+            resolver.forget(host)
+    if best == None:
+        return -1
+    server_time_ms, receive_ticks, delay_ms = best
+
+    # how far the clock is off, measured at the moment the RTC ticks
+    edge_ticks, edge_seconds = await rtc_second_edge()
+    server_at_edge_ms = server_time_ms + time.ticks_diff(edge_ticks, receive_ticks)
+    error_ms = edge_seconds * 1000 - server_at_edge_ms
+    elapsed = edge_seconds - last_sync_time
+    if (last_sync_time != 0) and (elapsed > 60*60) and (abs(error_ms) < 60*1000):
+        # drift in parts per million since the last sync, averaged with the earlier estimate
+        measured_ppm = error_ms * 1000 // elapsed
+        if drift_ppm == 0:
+            drift_ppm = measured_ppm
+        else:
+            drift_ppm = (drift_ppm + measured_ppm) // 2
+    log.info('NTP : clock was off', error_ms, 'ms, drift estimate', drift_ppm, 'ppm')
+
+    # set the RTC exactly when the server passes a second boundary
+    last_status = 'NTP : setting machine time'
+    server_now_ms = server_time_ms + time.ticks_diff(time.ticks_ms(), receive_ticks)
+    await asyncio.sleep_ms(1000 - server_now_ms % 1000)
+    seconds = (server_time_ms + time.ticks_diff(time.ticks_ms(), receive_ticks) + 500) // 1000
+    if config.run_system == 'pico':
+        tm = time.gmtime(seconds)
+        machine.RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
+
+    last_sync_time = seconds
+    last_error_ms  = error_ms
+    last_delay_ms  = delay_ms
+    last_server    = best_host
+    last_status    = 'NTP : system time updated OK from ' + best_host
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def predicted_error_ms(now):
+    '''
+        how far the clock is expected to be off by now, based on the drift estimate
+    '''
+    if last_sync_time == 0:
+        return -1
+    return abs(drift_ppm) * (now - last_sync_time) // 1000
+
+
+
+#------------------------------------------------------------------------------
+def next_sync_due(now):
+    '''
+        time.time() value at which the predicted error passes ntp_error_threshold_ms,
+        within the minimum and maximum interval
+    '''
+    if last_sync_time == 0:
+        return now
+    interval = config.ntp_min_interval_hours * 60*60
+    if drift_ppm != 0:
+        # error_ms = drift_ppm * seconds / 1000
+        interval = config.ntp_error_threshold_ms * 1000 // abs(drift_ppm)
+    interval = max(config.ntp_min_interval_hours * 60*60, min(config.ntp_max_interval_hours * 60*60, interval))
+    return last_sync_time + interval
+
+
+
+#------------------------------------------------------------------------------
+def restore(sync_time, saved_drift_ppm):
+    '''
+        take the sync state back from before a reboot, see snapshot.save_clock,
+        sync_time only when the RTC kept running, the drift belongs to the crystal and
+        is kept also after a power cut
+    '''
+    global last_sync_time, drift_ppm
+    last_sync_time = sync_time
+    drift_ppm      = saved_drift_ppm
+    if sync_time:
+        log.info('NTP : last sync', time.time() - sync_time, 'seconds ago, drift estimate', drift_ppm, 'ppm')
+    return 0
@@ -0,0 +1,462 @@
+###############################################################################
+#
+#   Provider fetches for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the fetch and color mapping functions of main.py
+#             moved here so the PC fleet service can use them as well, the
+#             address is passed in instead of taken from the config
+#           - provider engine, every provider is an entry in the PROVIDERS
+#             table, the requests for a date range are made from it and the
+#             months of the providers that page by month are fetched in one
+#             batched pass
+#           - HTTP and parse phases and the request counts in the telemetry
+#           - other provider servers from the config
+#           - conditional requests and a checksum per response, a 304 answer takes
+#             the days from the stored calendar instead of parsing them again
+#           - requests only imported by the worker on core 1
+#           - messages through log
+#           - range requests cover whole months so their validators match the next
+#             refresh, a refresh that gave the same responses as the one before is reported
+###############################################################################
+import time
+import binascii
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import calendar_index
+import json_stream
+import http_client
+import dates
+import telemetry
+
+# the providers, a new municipality is a new entry here
+#   fields      : address fields, in the config they are trash_<field>
+#   paging      : 'range' for one request for the complete date range, 'month' for one request per month
+#   method, url : the request, url is formatted with the address fields and start / end (YYYY-MM-DD)
+#                 for range paging or year / month for month paging
+#   body        : formatted like url for a POST, None for a GET
+#   date_key    : key of the pickup dates in the response, a single date or a list of dates
+#   type_key    : key of the container type, in the same object as the dates
+#   types       : container type as text -> container and LED color
+PROVIDERS = {
+    'twente' : {
+        'name'      : 'Twente',
+        'fields'    : ('company_code', 'address_id'),
+        'paging'    : 'range',
+        'method'    : 'POST',
+        'url'       : 'https://twentemilieuapi.ximmio.com/api/GetCalendar',
+        'body'      : 'companyCode={company_code}&uniqueAddressID={address_id}&startDate={start}&endDate={end}',
+        'headers'   : {'Content-Type' : 'application/x-www-form-urlencoded; charset=UTF-8'},
+        'date_key'  : 'pickupDates',
+        'type_key'  : 'pickupType',
+        'types'     : {
+            '0'  : 'GRAY',      # gray bin
+            '1'  : 'GREEN',     # green bin
+            '2'  : 'BLUE',      # blue bin
+            '6'  : 'RED',       # christmas tree
+            '10' : 'ORANGE',    # orange bin
+        },
+    },
+    'rd4' : {
+        'name'      : 'RD4',
+        'fields'    : ('postal_code', 'house_number'),
+        'paging'    : 'month',
+        'method'    : 'GET',
+        'url'       : 'https://data.rd4.nl/api/v1/waste-calendar/?year={year}&postal_code={postal_code}&house_number={house_number}&month={month}',
+        'body'      : None,
+        'headers'   : None,
+        'date_key'  : 'date',
+        'type_key'  : 'type',
+        'types'     : {
+            'residual_waste' : 'GRAY',      # gray bin
+            'gft'            : 'GREEN',     # green bin
+            'paper'          : 'BLUE',      # blue bin
+            # 'pruning_waste'  : 'RED',       # spring and autumn cuttings of trees and shrubs
+            'best_bag'       : 'RED',       # books / electronics / recycle materials
+            'pmd'            : 'ORANGE',    # orange bin
+        },
+    },
+}
+
+# requests, failures, unchanged responses, body bytes and milliseconds per provider since the start
+stats = {}
+# url and body of a request -> (etag, last modified, crc32 of the body) of the last refresh,
+# only replaced after a complete refresh so a 304 always matches the stored calendar
+validators = {}
+# True when every response of the last fetch_calendar was the same as the one before
+last_unchanged = False
+
+
+
+#------------------------------------------------------------------------------
+def set_base_url(name, base_url):
+    '''
+        point a provider to another server, for instance the mock provider of the fleet service
+        base_url : scheme and host like 'http://127.0.0.1:8081'
+    '''
+    url = PROVIDERS[name]['url']
+    PROVIDERS[name]['url'] = base_url + url[url.index('/', url.index('://') + 3):]
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def prepare():
+    '''
+        work out the color masks and start the statistics of every provider in the table,
+        call again after adding a provider at run time
+    '''
+    for name in PROVIDERS:
+        provider = PROVIDERS[name]
+        if name in config.provider_urls:
+            set_base_url(name, config.provider_urls[name])
+        provider['key'] = name
+        provider['masks'] = dict((type_name, calendar_index.COLOR_MASKS[color]) for type_name, color in provider['types'].items())
+        if name not in stats:
+            stats[name] = {'requests' : 0, 'failures' : 0, 'unchanged' : 0, 'bytes' : 0, 'ms' : 0}
+    return 0
+
+prepare()
+
+
+
+#------------------------------------------------------------------------------
+def config_address():
+    '''
+        the address of this tower from the config, as used by fetch_calendar
+    '''
+    address = {'company' : config.trash_company}
+    for field in PROVIDERS[config.trash_company]['fields']:
+        address[field] = getattr(config, 'trash_' + field)
+    return address
+
+
+
+#------------------------------------------------------------------------------
+def address_key(address):
+    '''
+        checksum of the provider and address, the same address always gives the same key
+    '''
+    text = address['company']
+    for field in PROVIDERS[address['company']]['fields']:
+        text += '/' + str(address[field]).replace(' ', '').upper()
+    return binascii.crc32(text.encode()) & 0xffffffff
+
+
+
+#------------------------------------------------------------------------------
+def type_mask(provider, type_name):
+    '''
+        color mask of a container type of a provider, 0 for unknown types
+    '''
+    return provider['masks'].get(str(type_name), 0)
+
+
+
+#------------------------------------------------------------------------------
+def requests_for(address, first_day, last_day):
+    '''
+        the requests that cover the day numbers first_day up to last_day for an address
+        returns a list of (label, method, url, headers, body, first day, last day of the request)
+    '''
+    provider = PROVIDERS[address['company']]
+    fields = {}
+    for field in provider['fields']:
+        fields[field] = address[field]
+    periods = []
+    if provider['paging'] == 'month':
+        year, month, day = dates.date_from_day_number(first_day)
+        last_year, last_month, last_date = dates.date_from_day_number(last_day)
+        while year * 12 + month <= last_year * 12 + last_month:
+            month_first = dates.day_number(year, month, 1)
+            month_last  = month_first + dates.days_in_month(year, month) - 1
+            periods.append((str(year) + '-' + str(month), {'year' : year, 'month' : month},
+                            max(first_day, month_first), min(last_day, month_last)))
+            year, month = dates.add_months(year, month, 1)
+    else:
+        # whole months, so the request and its validators stay the same for a month
+        year, month, day = dates.date_from_day_number(first_day)
+        first_day = dates.day_number(year, month, 1)
+        # the API wants date strings, they are only made here
+        start = dates.day_string(first_day)
+        end   = dates.day_string(last_day)
+        periods.append((start + '..' + end, {'start' : start, 'end' : end}, first_day, last_day))
+    result = []
+    for label, period, period_first, period_last in periods:
+        period.update(fields)
+        body = provider['body'].format(**period) if provider['body'] else None
+        result.append((label, provider['method'], provider['url'].format(**period), provider['headers'], body,
+                       period_first, period_last))
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def conditional_headers(headers, known):
+    '''
+        the headers of a request with the validators of the last response added
+        known : (etag, last modified, crc32) from validators
+    '''
+    result = dict(headers) if headers else {}
+    if known[0]:
+        result['If-None-Match'] = known[0]
+    if known[1]:
+        result['If-Modified-Since'] = known[1]
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def check_unchanged(provider, request, days, previous, known, status, crc):
+    '''
+        after a response: a 304 takes the days of the request from the previous index,
+        for a 200 the checksum tells whether the response changed
+        returns True when the response did not change
+    '''
+    label, method, url, headers, body, first_day, last_day = request
+    if status == 304:
+        calendar_index.add_range(previous, first_day, last_day, days)
+        log.info(provider['name'], ': not modified for', label, ', days taken from the stored calendar')
+        return True
+    if (known != None) and (known[2] == crc):
+        log.info(provider['name'], ': same response as the last refresh for', label)
+        return True
+    return False
+
+
+
+#------------------------------------------------------------------------------
+def make_scanner(provider, days):
+    '''
+        json_stream scanner that adds the pickups of a response of the provider to days
+    '''
+    return calendar_index.scanner_pickups(days, provider['date_key'], provider['type_key'], provider['masks'])
+
+
+
+#------------------------------------------------------------------------------
+def record_stats(name, start, body_bytes):
+    '''
+        count a request of a provider, body_bytes is -1 for a failed request
+    '''
+    entry = stats[name]
+    entry['requests'] += 1
+    entry['ms'] += time.ticks_diff(time.ticks_ms(), start)
+    if body_bytes < 0:
+        entry['failures'] += 1
+    else:
+        entry['bytes'] += body_bytes
+    telemetry.count_provider(name, body_bytes >= 0)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_one(provider, request, days, previous=None, seen=None):
+    '''
+        do one request of a provider and add the pickups of the response to days
+        previous : index of the stored calendar, the request is conditional when it is given
+        seen     : dict that gets the validators of the response, see validators
+        returns the number of bytes read, -1 on error
+    '''
+    label, method, url, headers, body, first_day, last_day = request
+    name = provider['name']
+    start = time.ticks_ms()
+    mark = telemetry.begin()
+    body_bytes = -1
+    scanner = make_scanner(provider, days)
+    key = url + (body or '')
+    known = validators.get(key) if previous != None else None
+    if known != None:
+        headers = conditional_headers(headers, known)
+    info = {}
+    try:
+        await http_client.fetch(method, url, scanner, headers=headers, data=body, response_info=info)
+        if info['status'] == 200:
+            log.debug(name, ': read', scanner.bytes_read, 'bytes for', label, ', peak heap', scanner.heap_start - scanner.heap_low, 'bytes')
+        crc = known[2] if info['status'] == 304 else scanner.crc
+        if check_unchanged(provider, request, days, previous, known, info['status'], crc):
+            stats[provider['key']]['unchanged'] += 1
+        if seen != None:
+            seen[key] = (info['etag'], info['last_modified'], crc)
+        body_bytes = scanner.bytes_read
+    except MemoryError:
+        log.warning(name, ': out of memory while reading the response')
+    except asyncio.TimeoutError:
+        log.warning(name, ': no complete response within', config.http_timeout, 'seconds')
+    except:
+        log.warning(name, ': error while reading the response')
+    telemetry.end(telemetry.PHASE_HTTP, mark, body_bytes >= 0)
+    telemetry.record(telemetry.PHASE_PARSE, scanner.parse_us, body_bytes >= 0)
+    record_stats(provider['key'], start, body_bytes)
+    return body_bytes
+
+
+
+#------------------------------------------------------------------------------
+def fetch_one_blocking(provider, request, days, previous=None, seen=None):
+    '''
+        blocking variant of fetch_one for the worker on core 1
+        returns the number of bytes read, -1 on error
+    '''
+    label, method, url, headers, body, first_day, last_day = request
+    name = provider['name']
+    start = time.ticks_ms()
+    body_bytes = -1
+    res = None
+    key = url + (body or '')
+    known = validators.get(key) if previous != None else None
+    if known != None:
+        headers = conditional_headers(headers, known)
+    try:
+        # only the dual core mode uses requests, so the others do not pay for its import
+        import requests
+        if method == 'POST':
+            res = requests.post(url, headers=headers, data=body, timeout=config.http_timeout, stream=True)
+        else:
+            res = requests.get(url, headers=headers, timeout=config.http_timeout, stream=True)
+        response_headers = getattr(res, 'headers', None) or {}
+        if res.status_code == 304:
+            crc = known[2]
+            body_bytes = 0
+        elif res.status_code != 200:
+            raise OSError('HTTP status ' + str(res.status_code))
+        else:
+            scanner = make_scanner(provider, days)
+            json_stream.parse(res.raw, scanner)
+            log.debug(name, ': read', json_stream.last_bytes_read, 'bytes for', label, ', peak heap', json_stream.last_peak_heap, 'bytes')
+            crc = scanner.crc
+            body_bytes = json_stream.last_bytes_read
+        if check_unchanged(provider, request, days, previous, known, res.status_code, crc):
+            stats[provider['key']]['unchanged'] += 1
+        if seen != None:
+            seen[key] = (response_headers.get('ETag', ''), response_headers.get('Last-Modified', ''), crc)
+    except MemoryError:
+        log.warning(name, ': out of memory while reading the response')
+    except:
+        log.warning(name, ': error while reading the response')
+    finally:
+        if res != None:
+            res.close()
+    record_stats(provider['key'], start, body_bytes)
+    return body_bytes
+
+
+
+#------------------------------------------------------------------------------
+def calendar_horizon(address, day_today):
+    '''
+        last day number to fetch for the calendar horizon starting at day number day_today,
+        providers that page by month are fetched up to the end of the last month
+    '''
+    if PROVIDERS[address['company']]['paging'] != 'month':
+        # up to the end of the month, like the start of the request this keeps it the same for a month
+        date_year, date_month, date_day = dates.date_from_day_number(day_today + config.calendar_horizon_days)
+        return dates.day_number(date_year, date_month, dates.days_in_month(date_year, date_month))
+    date_year, date_month, date_day = dates.date_from_day_number(day_today)
+    # the horizon is the day before the first of the month after the last one
+    date_year, date_month = dates.add_months(date_year, date_month, config.calendar_horizon_months)
+    return dates.day_number(date_year, date_month, 1) - 1
+
+
+
+#------------------------------------------------------------------------------
+def same_as_before(seen):
+    '''
+        True when the responses of a refresh are the same requests with the same checksums
+        as the refresh before, see validators
+    '''
+    if len(seen) != len(validators):
+        return False
+    for key in seen:
+        if (key not in validators) or (validators[key][2] != seen[key][2]):
+            return False
+    return True
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_range(address, first_day, last_day, days, previous=None, seen=None):
+    '''
+        add the pickups of an address from first_day up to last_day to days, all requests of the range
+        are done in one batched pass with at most http_max_parallel requests at the same time,
+        previous and seen as for fetch_one
+        returns 0 when every request succeeded, -1 otherwise
+    '''
+    provider = PROVIDERS[address['company']]
+    pending = requests_for(address, first_day, last_day)
+    for first in range(0, len(pending), config.http_max_parallel):
+        batch = pending[first:first + config.http_max_parallel]
+        if log.debugging:
+            log.debug('CALENDAR : fetching', provider['name'], 'for', [request[0] for request in batch])
+        results = await asyncio.gather(*[fetch_one(provider, request, days, previous, seen) for request in batch])
+        if min(results) < 0:
+            # a missing month would leave a hole in the calendar, so keep the old one
+            return -1
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_calendar(address, day_today, previous=None):
+    '''
+        fetch the pickup dates of an address for the complete horizon with the asyncio fetches
+        address  : dict with the company and its address fields, see config_address
+        previous : index of the stored calendar of this address, for the conditional requests
+        returns (dict day number -> color mask, horizon day number), the dict is empty on failure
+    '''
+    global validators, last_unchanged
+    horizon = calendar_horizon(address, day_today)
+    last_unchanged = False
+    days = {}
+    seen = {}
+    if await fetch_range(address, day_today, horizon, days, previous, seen) < 0:
+        return {}, horizon
+    last_unchanged = (previous != None) and same_as_before(seen)
+    if previous != None:
+        validators = seen
+    return days, horizon
+
+
+
+#------------------------------------------------------------------------------
+def fetch_calendar_blocking(address, day_today, previous=None):
+    '''
+        fetch_calendar for the worker on core 1, with blocking requests one after the other
+        returns (dict day number -> color mask, horizon day number), the dict is empty on failure
+    '''
+    global validators, last_unchanged
+    provider = PROVIDERS[address['company']]
+    horizon = calendar_horizon(address, day_today)
+    last_unchanged = False
+    days = {}
+    seen = {}
+    for request in requests_for(address, day_today, horizon):
+        log.debug('CALENDAR : core 1 fetching', provider['name'], 'for', request[0])
+        if fetch_one_blocking(provider, request, days, previous, seen) < 0:
+            return {}, horizon
+    last_unchanged = (previous != None) and same_as_before(seen)
+    if previous != None:
+        validators = seen
+    return days, horizon
+
+
+
+#------------------------------------------------------------------------------
+def report():
+    '''
+        print the statistics of the providers that were used
+    '''
+    for name in stats:
+        entry = stats[name]
+        if entry['requests']:
+            log.info('PROVIDER :', name, entry['requests'], 'requests,', entry['failures'], 'failed,', entry['unchanged'], 'unchanged,',
+                  entry['bytes'], 'bytes,', entry['ms'] // entry['requests'], 'ms per request')
+    return 0
@@ -0,0 +1,278 @@
+###############################################################################
+#
+#   LAN calendar relay for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, one tower fetches the calendar and sends it as a
+#             checksummed UDP multicast frame, the other towers on the same
+#             network take it over without going to the internet
+#           - frame helpers shared with the PC fleet service, calendar fetch
+#             from a fleet service
+#           - device id from the scheduler
+#           - messages through log
+#           - horizon of a frame cut off at MAX_RECORDS ends before the first record left out
+###############################################################################
+import time
+import socket
+import struct
+import binascii
+from array import array
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import calendar_store
+import scheduler
+import providers
+import http_client
+
+# version of the frame layout, bump when the layout changes
+RELAY_VERSION = 1
+RELAY_MAGIC   = b'TRASHREL'
+# magic, version, address key, sender id, fetched time, horizon day number, number of records
+RELAY_HEADER  = '<8sBIIIIH'
+# more records than this do not fit in a single UDP frame
+MAX_RECORDS   = 300
+
+# state of the relay
+device_id       = 0     # random per device unless the board has a unique id, lowest id wins the election
+is_relay        = False # this tower fetched the calendar and sends it to the others
+last_frame_time = 0     # time.time() of the last valid frame of another tower, 0 when none was heard
+last_sender     = 0
+listen_until    = 0     # time.time() until which a tower without calendar waits for a frame
+frames_sent     = 0
+frames_received = 0
+frames_rejected = 0
+calendar_updated = False    # a frame updated the stored calendar, cleared by the main loop
+
+
+
+#------------------------------------------------------------------------------
+def init(now):
+    '''
+        pick the device id and start the listen period before a tower fetches itself,
+        relay_listen_seconds plus a part of it that depends on the device id, so the
+        towers do not all go to the API at the same moment at boot
+    '''
+    global device_id, listen_until
+    device_id = scheduler.device_id()
+    listen_until = now + config.relay_listen_seconds + device_id % config.relay_listen_seconds
+    log.info('RELAY : device id', hex(device_id), ', listening up to', listen_until - now, 'seconds before fetching')
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def should_fetch(now):
+    '''
+        check if this tower has to go to the API itself, which is when relaying is off,
+        when this tower is the relay or when the relay has not been heard for too long
+    '''
+    if config.relay_mode == 'off' or is_relay:
+        return True
+    if now < listen_until:
+        return False
+    return (last_frame_time == 0) or (now - last_frame_time > 60*config.relay_timeout_minutes)
+
+
+
+#------------------------------------------------------------------------------
+def fetch_due(now):
+    '''
+        time.time() value at which should_fetch starts to return True
+    '''
+    if last_frame_time == 0:
+        return max(now, listen_until)
+    return max(now, listen_until, last_frame_time + 60*config.relay_timeout_minutes + 1)
+
+
+
+#------------------------------------------------------------------------------
+def pack_frame(key, sender, fetched, horizon, index):
+    '''
+        build a calendar frame, the crc32 of everything before it is appended
+        key     : providers.address_key of the address
+        sender  : device id of the sender, 0 for the fleet service
+        index   : sorted array of day number << 8 | color mask, see calendar_index
+    '''
+    count = min(len(index), MAX_RECORDS)
+    if count < len(index):
+        # the receivers only know the days up to the first record that is left out
+        horizon = min(horizon, (index[count] >> 8) - 1)
+    frame = struct.pack(RELAY_HEADER, RELAY_MAGIC, RELAY_VERSION, key, sender, fetched, horizon, count)
+    frame += bytes(index[0:count])
+    return frame + struct.pack('<I', binascii.crc32(frame) & 0xffffffff)
+
+
+
+#------------------------------------------------------------------------------
+def make_frame():
+    '''
+        build the frame of the stored calendar
+    '''
+    return pack_frame(providers.address_key(providers.config_address()), device_id, calendar_store.calendar_fetched,
+                      calendar_store.calendar_horizon, calendar_store.calendar_index_data)
+
+
+
+#------------------------------------------------------------------------------
+def read_frame(frame, key=None):
+    '''
+        check a received frame, frames for another address key than our own are not usable
+        returns (sender id, fetched time, horizon, index) or None when the frame is not usable
+    '''
+    if key == None:
+        key = providers.address_key(providers.config_address())
+    header_size = struct.calcsize(RELAY_HEADER)
+    if len(frame) < header_size + 4:
+        return None
+    magic, version, frame_key, sender, fetched, horizon, count = struct.unpack(RELAY_HEADER, frame[0:header_size])
+    if (magic != RELAY_MAGIC) or (version != RELAY_VERSION) or (len(frame) != header_size + 4*count + 4):
+        return None
+    if struct.unpack('<I', frame[-4:])[0] != binascii.crc32(frame[0:-4]) & 0xffffffff:
+        return None
+    if frame_key != key:
+        return None
+    return sender, fetched, horizon, array('I', frame[header_size:-4])
+
+
+
+#------------------------------------------------------------------------------
+def became_relay():
+    '''
+        call after this tower fetched the calendar itself, it sends it to the others from now on
+    '''
+    global is_relay
+    if (config.relay_mode != 'off') and not is_relay:
+        is_relay = True
+        log.info('RELAY : this tower is the relay now')
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def open_socket(local_ip):
+    '''
+        non blocking UDP socket that is a member of the relay multicast group
+    '''
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.bind(('0.0.0.0', config.relay_port))
+    group = bytes([int(part) for part in config.relay_group.split('.')])
+    interface = bytes([int(part) for part in local_ip.split('.')])
+    # lwIP and linux use another number for the option, not every port has the constant
+    s.setsockopt(getattr(socket, 'IPPROTO_IP', 0), getattr(socket, 'IP_ADD_MEMBERSHIP', 3), group + interface)
+    s.setblocking(False)
+    return s
+
+
+
+#------------------------------------------------------------------------------
+def receive(frame, now):
+    '''
+        take over the calendar of a frame from another tower when it is newer than ours
+        returns True when the stored calendar was updated
+    '''
+    global is_relay, last_frame_time, last_sender, frames_received, frames_rejected, calendar_updated
+    result = read_frame(frame)
+    if result == None:
+        frames_rejected += 1
+        return False
+    sender, fetched, horizon, index = result
+    if sender == device_id:
+        # our own frame comes back over the multicast loopback
+        return False
+    frames_received += 1
+    if is_relay and (sender < device_id):
+        # two relays, the lowest id wins
+        is_relay = False
+        log.info('RELAY : tower', hex(sender), 'takes over as relay')
+    if is_relay:
+        return False
+    last_frame_time = now
+    last_sender     = sender
+    if (fetched <= calendar_store.calendar_fetched) and (horizon <= calendar_store.calendar_horizon):
+        return False
+    log.info('RELAY : calendar received from tower', hex(sender))
+    calendar_store.update(index, horizon, fetched)
+    calendar_updated = True
+    return True
+
+
+
+#------------------------------------------------------------------------------
+async def run(local_ip):
+    '''
+        relay task, sends the calendar every relay_interval_minutes while this tower is the relay
+        and takes over the calendar from the frames of the other towers
+    '''
+    global frames_sent
+    s = None
+    next_send = 0
+    while True:
+        try:
+            if s == None:
+                s = open_socket(local_ip)
+            now = time.time()
+            if is_relay and (now >= next_send) and (calendar_store.calendar_fetched != 0):
+                s.sendto(make_frame(), (config.relay_group, config.relay_port))
+                frames_sent += 1
+                next_send = now + 60*config.relay_interval_minutes
+            try:
+                frame, sender_address = s.recvfrom(struct.calcsize(RELAY_HEADER) + 4*MAX_RECORDS + 4)
+                if receive(frame, now):
+                    # let the main loop show the new calendar right away
+                    scheduler.wake()
+            except OSError:
+                await asyncio.sleep_ms(200)
+        except Exception as e:
+            log.warning('RELAY : error :', e)
+            if s != None:
+                s.close()
+                s = None
+            await asyncio.sleep(30)
+
+
+
+#------------------------------------------------------------------------------
+class FrameReader:
+    '''
+        collects a frame from an HTTP body, can be passed to http_client.fetch like a json_stream scanner
+    '''
+    def __init__(self):
+        self.frame = bytearray()
+
+    def feed(self, buffer, count):
+        self.frame.extend(buffer[0:count])
+        return count
+
+    def finish(self):
+        return len(self.frame)
+
+
+
+#------------------------------------------------------------------------------
+async def fetch_fleet(address):
+    '''
+        get the calendar of an address from the fleet service at config.fleet_url
+        returns (index, horizon, fetched time) or None when there is no usable calendar
+    '''
+    key = providers.address_key(address)
+    reader = FrameReader()
+    try:
+        await http_client.fetch('GET', config.fleet_url + '/calendar/' + hex(key)[2:], reader)
+    except Exception as e:
+        log.warning('FLEET : error :', e)
+        return None
+    result = read_frame(bytes(reader.frame), key)
+    if result == None:
+        log.warning('FLEET : unusable calendar frame')
+        return None
+    sender, fetched, horizon, index = result
+    log.info('FLEET : calendar with', len(index), 'pickup days up to day', horizon)
+    return index, horizon, fetched
@@ -0,0 +1,55 @@
+###############################################################################
+#
+#   DNS cache for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, moved out of http_client so the NTP servers use
+#             the same cache as the providers
+#           - lookups in the telemetry
+###############################################################################
+import time
+import socket
+
+import config # import the config file
+import telemetry
+
+# resolved addresses, host -> (ip address, time.time() until which it is valid)
+dns_cache = {}
+
+
+
+#------------------------------------------------------------------------------
+def resolve(host, port):
+    '''
+        ip address of a host, from the cache as long as it is valid
+    '''
+    now = time.time()
+    if host in dns_cache:
+        address, valid_until = dns_cache[host]
+        if now < valid_until:
+            return address
+    mark = telemetry.begin()
+    try:
+        address = socket.getaddrinfo(host, port)[0][-1][0]
+    except:
+        telemetry.end(telemetry.PHASE_DNS, mark, False)
+        raise
+    telemetry.end(telemetry.PHASE_DNS, mark)
+    if not isinstance(address, str):
+        # MicroPython gives the address as bytes on some ports
+        address = socket.inet_ntop(socket.AF_INET, address)
+    dns_cache[host] = (address, now + config.dns_cache_seconds)
+    return address
+
+
+
+#------------------------------------------------------------------------------
+def forget(host):
+    '''
+        drop a host from the cache, for instance after it did not answer
+    '''
+    if host in dns_cache:
+        del dns_cache[host]
+    return 0
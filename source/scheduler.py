@@ -0,0 +1,236 @@
+###############################################################################
+#
+#   Wake scheduler for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, sleep until the next meaningful event instead of
+#             waking up every hour
+#           - asyncio sleep so the other tasks keep running
+#           - midnight in local Dutch time
+#           - wake up from another task, stay awake for the relay
+#           - asleep flag for the awake time of the PC simulation
+#           - retries with jittered exponential backoff, device id to spread the
+#             requests of a fleet of towers over time
+#           - messages through log, log written out before a lightsleep or deepsleep
+#           - deepsleep all the way to the next event instead of at most schedule_max_sleep
+#           - deepsleep at most schedule_max_sleep again, the rp2 port does not take
+#             much more than an hour, the wake up time is kept in the snapshot and
+#             sets the RTC after the reset that ends the deepsleep
+###############################################################################
+import os
+import time
+import random
+import struct
+import binascii
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import leds
+import dates
+import snapshot
+
+if config.run_system == 'pico':
+    import machine
+
+# events by name -> time.time() at which they are due
+events = {}
+# set by wake() to end the sleep early, see sleep_until()
+wake_event = asyncio.Event()
+# no lightsleep or deepsleep while another task has to keep listening
+stay_awake = False
+# True while sleep_until() waits, the main loop is awake otherwise
+asleep = False
+# events by name -> number of failures in a row, see retry()
+failures = {}
+# unique per board, 0 until device_id() picked it
+board_id = 0
+
+
+
+#------------------------------------------------------------------------------
+def schedule(name, due):
+    '''
+        (re)schedule an event at time.time() value due
+    '''
+    events[name] = due
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def is_due(name, now):
+    '''
+        check if an event is due, events that were never scheduled are due right away
+    '''
+    return events.get(name, 0) <= now
+
+
+
+#------------------------------------------------------------------------------
+def device_id():
+    '''
+        a number that differs between towers, from the unique id of the board when there is one
+    '''
+    global board_id
+    if board_id == 0:
+        if config.run_system == 'pico':
+            board_id = binascii.crc32(machine.unique_id()) & 0xffffffff
+        else:
+            board_id = struct.unpack('<I', os.urandom(4))[0]
+    return board_id
+
+
+
+#------------------------------------------------------------------------------
+def retry(name, now):
+    '''
+        the event failed, schedule it again after a backoff that doubles with every failure
+        in a row, from schedule_retry_minutes up to schedule_retry_max_minutes, with a random
+        part so towers that failed at the same moment do not retry at the same moment
+        returns the time.time() value of the retry
+    '''
+    count = failures.get(name, 0) + 1
+    failures[name] = count
+    delay = 60 * min(config.schedule_retry_max_minutes, config.schedule_retry_minutes << min(count - 1, 16))
+    # the first half of the delay is fixed, the second half random
+    delay = delay // 2 + (random.getrandbits(16) * (delay - delay // 2) >> 16)
+    log.info('SCHEDULER :', name, 'failed', count, 'times in a row, retry in', delay, 'seconds')
+    events[name] = now + delay
+    return now + delay
+
+
+
+#------------------------------------------------------------------------------
+def succeeded(name):
+    '''
+        the event worked, the next failure starts at the shortest backoff again
+    '''
+    if name in failures:
+        del failures[name]
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def retry_now(name, now):
+    '''
+        make an event that is waiting for a retry due right away, for when the reason
+        of the failure is gone like after a wifi reconnect
+        returns True when the event was waiting for a retry
+    '''
+    if failures.get(name, 0) == 0:
+        return False
+    events[name] = now
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def spread(due):
+    '''
+        move a request to the provider a fixed time per tower later within schedule_spread_minutes,
+        so a fleet of towers does not go to the provider at the same moment
+    '''
+    return due + device_id() % (60*config.schedule_spread_minutes + 1)
+
+
+
+#------------------------------------------------------------------------------
+def next_event():
+    '''
+        return the name and due time of the first upcoming event
+    '''
+    first_name = ''
+    first_due  = 0
+    for name in events:
+        if (first_name == '') or (events[name] < first_due):
+            first_name = name
+            first_due  = events[name]
+    return first_name, first_due
+
+
+
+#------------------------------------------------------------------------------
+def next_midnight(now):
+    '''
+        time.time() value just after the next local day rollover
+    '''
+    return dates.next_midnight(now) + config.schedule_midnight_delay
+
+
+
+#------------------------------------------------------------------------------
+def wake():
+    '''
+        end the sleep of sleep_until() early, for tasks that change something for the main loop
+    '''
+    wake_event.set()
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def clock_after_deepsleep(wake_time):
+    '''
+        the reset that ends a deepsleep puts the RTC back to its reset value, set it to
+        wake_time, the end of the deepsleep, plus the ticks since the reset
+        returns True when the clock was set
+    '''
+    if (config.run_system != 'pico') or (wake_time == 0) or (machine.reset_cause() == machine.PWRON_RESET):
+        return False
+    # the ticks start at the reset, set the RTC when they pass a whole second
+    time.sleep_ms(1000 - time.ticks_ms() % 1000)
+    tm = time.gmtime(wake_time + (time.ticks_ms() + 500) // 1000)
+    machine.RTC().datetime((tm[0], tm[1], tm[2], tm[6] + 1, tm[3], tm[4], tm[5], 0))
+    return True
+
+
+
+#------------------------------------------------------------------------------
+async def sleep_until(due):
+    '''
+        sleep until time.time() reaches due, using the deepest sleep mode the LEDs allow,
+        during a lightsleep or deepsleep the other asyncio tasks are paused as well,
+        a plain sleep ends early when wake() is called
+    '''
+    global asleep
+    asleep = True
+    while True:
+        remaining = due - time.time()
+        if remaining <= 0:
+            asleep = False
+            return 0
+        # never sleep longer than the maximum, so a clock jump is picked up, the rp2 port
+        # also refuses a deepsleep or lightsleep of much more than an hour
+        remaining = min(remaining, config.schedule_max_sleep)
+        # the log task does not run during a lightsleep and the ring buffer is gone after a deepsleep
+        log.flush()
+        if (config.run_system == 'pico') and (config.sleep_mode == 'deepsleep') and leds.is_dark() and (remaining >= config.sleep_deep_min_seconds) and not stay_awake:
+            # all LEDs are off, the board reboots at wake up and the calendar comes from the flash,
+            # the reset puts the RTC back so the boot takes the time from the snapshot
+            log.info('SCHEDULER : deepsleep for', remaining, 'seconds')
+            log.flush()
+            # start at a tick of the RTC, so the wake up time in whole seconds is exact
+            second = time.time()
+            while time.time() == second:
+                time.sleep_ms(1)
+            edge_ticks = time.ticks_ms()
+            snapshot.save_wake(second + 1 + remaining)
+            machine.deepsleep(remaining * 1000 - time.ticks_diff(time.ticks_ms(), edge_ticks))
+        if (config.run_system == 'pico') and (config.sleep_mode in ['lightsleep', 'deepsleep']) and not leds.is_blinking() and not stay_awake:
+            # solid LEDs keep their pin state, blinking needs the engine timer so no lightsleep then
+            machine.lightsleep(remaining * 1000)
+        else:
+            try:
+                await asyncio.wait_for(wake_event.wait(), remaining)
+                wake_event.clear()
+                asleep = False
+                return 0
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,155 @@
+###############################################################################
+#
+#   Last known state snapshot for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the lights, the calendar horizon and the time are
+#             kept on the flash so the LEDs are back right after a power cut
+#           - messages through log
+#           - time of the last time sync and the drift of the RTC, so a reboot
+#             keeps the drift estimate and does not need a resync
+#           - wake up time of a deepsleep, the reset at the wake up puts the RTC
+#             back to its reset value
+###############################################################################
+import os
+import struct
+
+import config # import the config file
+import log
+
+# version of the file layout, bump when the layout changes
+SNAPSHOT_VERSION = 3
+SNAPSHOT_MAGIC   = b'TRASHSNP'
+# magic, version, time, day number, lights today, tomorrow, day after, calendar horizon,
+# time of the last time sync, drift of the RTC in ppm, wake up time of a deepsleep
+SNAPSHOT_FORMAT  = '<8sBIIBBBIIiI'
+# layouts of the older versions that are still read, the missing fields stay 0
+OLD_FORMATS      = {1 : '<8sBIIBBBI', 2 : '<8sBIIBBBIIi'}
+
+# the snapshot in memory, last_time 0 means there is no snapshot
+last_time        = 0    # time.time() when the snapshot was written
+last_day         = 0    # day number the lights belong to
+lights_today     = 0
+lights_tomorrow  = 0
+lights_day_after = 0
+horizon          = 0    # day number up to which the calendar was known
+sync_time        = 0    # time.time() of the last time sync, 0 when unknown
+drift_ppm        = 0    # drift estimate of the RTC, see ntp.drift_ppm
+wake_time        = 0    # time.time() a deepsleep ends, 0 when the tower did not go into deepsleep
+
+
+
+#------------------------------------------------------------------------------
+def load():
+    '''
+        load the snapshot from the flash, returns True when a valid snapshot was found
+    '''
+    global last_time, last_day, lights_today, lights_tomorrow, lights_day_after, horizon, sync_time, drift_ppm, wake_time
+    try:
+        with open(config.snapshot_file, 'rb') as f:
+            data = f.read(struct.calcsize(SNAPSHOT_FORMAT))
+        magic, version = struct.unpack('<8sB', data[0:9])
+        if magic != SNAPSHOT_MAGIC or ((version != SNAPSHOT_VERSION) and (version not in OLD_FORMATS)):
+            log.warning('SNAPSHOT : unknown file version, ignoring', config.snapshot_file)
+            return False
+        layout = OLD_FORMATS.get(version, SNAPSHOT_FORMAT)
+        fields = struct.unpack(layout, data[0:struct.calcsize(layout)]) + (0, 0, 0)
+        data_time, data_day, data_today, data_tomorrow, data_day_after, data_horizon, data_sync, data_drift, data_wake = fields[2:11]
+    except OSError:
+        log.info('SNAPSHOT : no snapshot stored yet')
+        return False
+    except:
+        log.warning('SNAPSHOT : error while reading', config.snapshot_file)
+        return False
+    last_time        = data_time
+    last_day         = data_day
+    lights_today     = data_today
+    lights_tomorrow  = data_tomorrow
+    lights_day_after = data_day_after
+    horizon          = data_horizon
+    sync_time        = data_sync
+    drift_ppm        = data_drift
+    wake_time        = data_wake
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def write():
+    '''
+        write the snapshot in memory to the flash, through a temporary file so a power cut
+        during the write keeps the previous snapshot intact
+    '''
+    temp_file = config.snapshot_file + '.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(struct.pack(SNAPSHOT_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, last_time, last_day,
+                                lights_today, lights_tomorrow, lights_day_after, horizon, sync_time, drift_ppm, wake_time))
+        try:
+            os.remove(config.snapshot_file)
+        except OSError:
+            pass
+        os.rename(temp_file, config.snapshot_file)
+        return 0
+    except:
+        log.warning('SNAPSHOT : error while writing', config.snapshot_file)
+        return -1
+
+
+
+#------------------------------------------------------------------------------
+def save(now, day, today, tomorrow, day_after, calendar_horizon):
+    '''
+        write the snapshot to the flash when something changed
+    '''
+    global last_time, last_day, lights_today, lights_tomorrow, lights_day_after, horizon
+    if (day == last_day) and (today == lights_today) and (tomorrow == lights_tomorrow) and \
+       (day_after == lights_day_after) and (calendar_horizon == horizon) and (last_time != 0):
+        return 0
+    last_time        = now
+    last_day         = day
+    lights_today     = today
+    lights_tomorrow  = tomorrow
+    lights_day_after = day_after
+    horizon          = calendar_horizon
+    return write()
+
+
+
+#------------------------------------------------------------------------------
+def save_clock(new_sync_time, new_drift_ppm):
+    '''
+        keep the time sync state on the flash after a sync, only written when the
+        snapshot of the lights is there as well
+    '''
+    global sync_time, drift_ppm
+    sync_time = new_sync_time
+    drift_ppm = new_drift_ppm
+    if last_time == 0:
+        return 0
+    return write()
+
+
+
+#------------------------------------------------------------------------------
+def save_wake(new_wake_time):
+    '''
+        keep the time a deepsleep ends on the flash, 0 once the clock was set from it
+    '''
+    global wake_time
+    wake_time = new_wake_time
+    if last_time == 0:
+        return 0
+    return write()
+
+
+
+#------------------------------------------------------------------------------
+def clock_plausible(now):
+    '''
+        True when the clock did not go back before the snapshot, which is what the
+        RTC of the PI pico does after a power cut
+    '''
+    return (last_time != 0) and (now >= last_time)
@@ -0,0 +1,224 @@
+###############################################################################
+#
+#   Status server for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, a small HTTP server that answers the state of the
+#             tower as JSON on /status and plans a forced calendar refresh on
+#             /refresh, one client at a time with a fixed size request buffer
+#           - calendar retries
+#           - wifi connect times and radio on time
+#           - messages through log
+#           - forced refreshes at most every status_refresh_minutes, the request
+#             waits until the main loop can run it
+###############################################################################
+import gc
+import time
+import json
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+import calendar_index
+import calendar_store
+import providers
+import snapshot
+import ntp
+import scheduler
+import telemetry
+import wifi
+
+# longest request that is read, the rest of a larger request is ignored
+REQUEST_MAX   = 512
+
+# set by /refresh, the main loop takes it with take_refresh()
+refresh_requested = False
+refresh_taken     = 0   # time.time() when the main loop took the last forced refresh
+# one client at a time keeps the memory use fixed, others get a 503
+busy          = False
+# uptime in ms, added up from ticks_ms so it survives the wrap of the ticks
+uptime_ms     = 0
+uptime_ticks  = time.ticks_ms()
+requests_served = 0
+
+
+
+#------------------------------------------------------------------------------
+def uptime_seconds():
+    '''
+        seconds since the start, call at least every few days so the ticks do not wrap in between
+    '''
+    global uptime_ms, uptime_ticks
+    ticks = time.ticks_ms()
+    uptime_ms += time.ticks_diff(ticks, uptime_ticks)
+    uptime_ticks = ticks
+    return uptime_ms // 1000
+
+
+
+#------------------------------------------------------------------------------
+def take_refresh(now):
+    '''
+        True once after a forced refresh was asked for on /refresh, only call it when
+        the refresh can run (valid clock), otherwise the request stays waiting
+    '''
+    global refresh_requested, refresh_taken
+    if not refresh_requested:
+        return False
+    refresh_requested = False
+    refresh_taken = now
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def status():
+    '''
+        the state of the tower as a dict for the JSON answer
+    '''
+    provider_stats = providers.stats.get(config.trash_company, {})
+    return {
+        'time'      : int(time.time()),
+        'uptime'    : uptime_seconds(),
+        'lights'    : {
+            'day'       : snapshot.last_day,
+            'today'     : calendar_index.mask_to_colors(snapshot.lights_today),
+            'tomorrow'  : calendar_index.mask_to_colors(snapshot.lights_tomorrow),
+            'day_after' : calendar_index.mask_to_colors(snapshot.lights_day_after),
+        },
+        'calendar'  : {
+            'company'   : config.trash_company,
+            'horizon'   : calendar_store.calendar_horizon,
+            'fetched'   : calendar_store.calendar_fetched,
+            'days'      : len(calendar_store.calendar_index_data),
+            'attempt'   : calendar_store.last_attempt,
+            'ok'        : calendar_store.last_attempt_ok,
+            'retries'   : scheduler.failures.get('calendar', 0),
+            'retry'     : scheduler.events.get('calendar', 0) if scheduler.failures.get('calendar', 0) else 0,
+            'requests'  : provider_stats.get('requests', 0),
+            'failures'  : provider_stats.get('failures', 0),
+            'refresh'   : refresh_requested,
+        },
+        'ntp'       : {
+            'synced'    : ntp.last_sync_time,
+            'server'    : ntp.last_server,
+            'error_ms'  : ntp.last_error_ms,
+            'delay_ms'  : ntp.last_delay_ms,
+            'drift_ppm' : ntp.drift_ppm,
+            'failures'  : telemetry.phase_failures[telemetry.PHASE_NTP],
+        },
+        'wifi'      : {
+            'connected'     : wifi.is_connected(),
+            'last_ms'       : wifi.last_connect_ms,
+            'today'         : [wifi.day, wifi.day_connects, wifi.day_fast, wifi.day_failures,
+                               wifi.day_connect_ms, wifi.radio_ms_today()],
+            # (day, connects, fast, failed, connect ms, radio on ms) per day
+            'days'          : wifi.history,
+        },
+        'memory'    : {
+            'free'      : gc.mem_free() if hasattr(gc, 'mem_free') else 0,
+            'alloc'     : gc.mem_alloc() if hasattr(gc, 'mem_alloc') else 0,
+        },
+    }
+
+
+
+#------------------------------------------------------------------------------
+def answer(method, path):
+    '''
+        status code and JSON body for a request
+    '''
+    global refresh_requested
+    path = path.split('?', 1)[0]
+    if (method == 'GET') and (path in ['/', '/status']):
+        return 200, status()
+    if (method == 'POST') and (path == '/refresh'):
+        if refresh_requested:
+            return 202, {'refresh' : True}
+        # every forced refresh goes to the provider, past the backoff of failed fetches
+        wait = refresh_taken + 60*config.status_refresh_minutes - int(time.time())
+        if refresh_taken and (wait > 0):
+            return 429, {'error' : 'refreshed recently', 'retry_after' : wait}
+        # the main loop does the fetch, the client does not wait for it
+        log.info('STATUS : forced calendar refresh asked for')
+        refresh_requested = True
+        scheduler.wake()
+        return 202, {'refresh' : True}
+    if path in ['/', '/status', '/refresh']:
+        return 405, {'error' : 'use GET /status or POST /refresh'}
+    return 404, {'error' : 'not found'}
+
+
+
+#------------------------------------------------------------------------------
+async def read_request(reader):
+    '''
+        read up to the end of the headers, at most REQUEST_MAX bytes
+        returns the request line as text
+    '''
+    data = b''
+    while (b'\r\n\r\n' not in data) and (len(data) < REQUEST_MAX):
+        chunk = await reader.read(REQUEST_MAX - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data.split(b'\r\n', 1)[0].decode()
+
+
+
+#------------------------------------------------------------------------------
+async def handle(reader, writer):
+    '''
+        serve one request and close the connection
+    '''
+    global busy, requests_served
+    try:
+        if busy:
+            status_code, body = 503, {'error' : 'busy'}
+        else:
+            busy = True
+            try:
+                request_line = await asyncio.wait_for(read_request(reader), config.status_timeout)
+                method, path, version = request_line.split()
+                status_code, body = answer(method, path)
+            except asyncio.TimeoutError:
+                status_code, body = 408, {'error' : 'timeout'}
+            except ValueError:
+                status_code, body = 400, {'error' : 'bad request'}
+            finally:
+                busy = False
+        data = json.dumps(body).encode()
+        writer.write(b'HTTP/1.0 ' + str(status_code).encode() + b' ' + (b'OK' if status_code < 300 else b'Error')
+                     + b'\r\nContent-Type: application/json\r\nContent-Length: ' + str(len(data)).encode()
+                     + b'\r\nConnection: close\r\n\r\n' + data)
+        await writer.drain()
+        requests_served += 1
+    except:
+        log.warning('STATUS : error while answering a request')
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except:
+            pass
+
+
+
+#------------------------------------------------------------------------------
+async def start():
+    '''
+        start listening on status_port, the clients are served by their own asyncio tasks
+        returns the server, None when it could not be started
+    '''
+    try:
+        server = await asyncio.start_server(handle, '0.0.0.0', config.status_port)
+    except:
+        log.warning('STATUS : could not listen on port', config.status_port)
+        return None
+    log.info('STATUS : serving on port', config.status_port)
+    return server
@@ -0,0 +1,199 @@
+###############################################################################
+#
+#   Telemetry for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, timings of the phases of the awake time and the
+#             heap around them in a fixed size ring buffer, a report on the
+#             serial port on demand and a compact binary dump
+###############################################################################
+import sys
+import time
+import struct
+import select
+import binascii
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import json_stream
+
+# the phases of the awake time
+PHASE_WIFI  = 0
+PHASE_DNS   = 1
+PHASE_NTP   = 2
+PHASE_HTTP  = 3     # connect, request and body, including the parse time
+PHASE_PARSE = 4     # scanning of the JSON body, part of the HTTP phase
+PHASE_LED   = 5
+PHASE_NAMES = ('wifi', 'dns', 'ntp', 'http', 'parse', 'led')
+
+# version of the dump layout, bump when the layout changes
+TELEMETRY_VERSION = 1
+TELEMETRY_MAGIC   = b'TRASHTEL'
+# magic, version, number of phases, number of records, number of providers
+DUMP_HEADER       = '<8sBBHB'
+# per phase: count, failures, total microseconds
+PHASE_FORMAT      = '<HHI'
+# time.time(), phase, ok, duration in microseconds, heap before, heap after
+RECORD_FORMAT     = '<IBBIII'
+RECORD_SIZE       = struct.calcsize(RECORD_FORMAT)
+# per provider after the length and the name: succeeded and failed requests
+PROVIDER_FORMAT   = '<HH'
+
+# the ring buffer, preallocated so recording does not allocate
+ring        = bytearray(RECORD_SIZE * config.telemetry_records)
+ring_next   = 0         # record that is written next
+ring_count  = 0         # records in the ring, up to telemetry_records
+# totals per phase since the start
+phase_count    = [0] * len(PHASE_NAMES)
+phase_failures = [0] * len(PHASE_NAMES)
+phase_us       = [0] * len(PHASE_NAMES)
+# provider name -> [succeeded, failed] requests
+provider_counts = {}
+
+
+
+#------------------------------------------------------------------------------
+def begin():
+    '''
+        start of a phase, pass the result to end()
+    '''
+    return time.ticks_us(), json_stream.heap_free()
+
+
+
+#------------------------------------------------------------------------------
+def end(phase, mark, ok=True):
+    '''
+        end of a phase that started with mark = begin()
+    '''
+    return record(phase, time.ticks_diff(time.ticks_us(), mark[0]), ok, mark[1])
+
+
+
+#------------------------------------------------------------------------------
+def record(phase, duration_us, ok=True, heap_before=None):
+    '''
+        put a phase in the ring buffer and add it to the totals
+    '''
+    global ring_next, ring_count
+    heap_after = json_stream.heap_free()
+    if heap_before == None:
+        heap_before = heap_after
+    duration_us = max(0, duration_us)
+    phase_count[phase] += 1
+    phase_us[phase] += duration_us
+    if not ok:
+        phase_failures[phase] += 1
+    struct.pack_into(RECORD_FORMAT, ring, ring_next * RECORD_SIZE, int(time.time()) & 0xffffffff, phase,
+                     1 if ok else 0, duration_us & 0xffffffff, heap_before, heap_after)
+    ring_next = (ring_next + 1) % config.telemetry_records
+    ring_count = min(ring_count + 1, config.telemetry_records)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def count_provider(name, ok):
+    '''
+        count a succeeded or failed request of a provider
+    '''
+    if name not in provider_counts:
+        provider_counts[name] = [0, 0]
+    provider_counts[name][0 if ok else 1] += 1
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def records():
+    '''
+        the records in the ring buffer, oldest first, as tuples like RECORD_FORMAT
+    '''
+    first = (ring_next - ring_count) % config.telemetry_records
+    result = []
+    for number in range(ring_count):
+        result.append(struct.unpack_from(RECORD_FORMAT, ring, ((first + number) % config.telemetry_records) * RECORD_SIZE))
+    return result
+
+
+
+#------------------------------------------------------------------------------
+def report(last=8):
+    '''
+        print the totals per phase, the provider counts and the last records on the serial port
+    '''
+    print('TELEMETRY : phase   count  failed  total ms  average us')
+    for phase in range(len(PHASE_NAMES)):
+        if phase_count[phase]:
+            print('TELEMETRY :', PHASE_NAMES[phase], phase_count[phase], phase_failures[phase],
+                  phase_us[phase] // 1000, phase_us[phase] // phase_count[phase])
+    for name in provider_counts:
+        print('TELEMETRY : provider', name, provider_counts[name][0], 'ok,', provider_counts[name][1], 'failed')
+    for record_time, phase, ok, duration_us, heap_before, heap_after in records()[-last:]:
+        print('TELEMETRY :', record_time, PHASE_NAMES[phase], 'ok' if ok else 'FAILED', duration_us, 'us, heap',
+              heap_before, '->', heap_after)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def dump():
+    '''
+        everything in a compact binary form, see DUMP_HEADER, PHASE_FORMAT, RECORD_FORMAT and PROVIDER_FORMAT
+    '''
+    names = [name for name in provider_counts]
+    data = bytearray(struct.pack(DUMP_HEADER, TELEMETRY_MAGIC, TELEMETRY_VERSION, len(PHASE_NAMES), ring_count, len(names)))
+    for phase in range(len(PHASE_NAMES)):
+        data += struct.pack(PHASE_FORMAT, phase_count[phase] & 0xffff, phase_failures[phase] & 0xffff, phase_us[phase] & 0xffffffff)
+    first = (ring_next - ring_count) % config.telemetry_records
+    for number in range(ring_count):
+        offset = ((first + number) % config.telemetry_records) * RECORD_SIZE
+        data += ring[offset:offset + RECORD_SIZE]
+    for name in names:
+        data += bytes([len(name)]) + name.encode()
+        data += struct.pack(PROVIDER_FORMAT, provider_counts[name][0] & 0xffff, provider_counts[name][1] & 0xffff)
+    return bytes(data)
+
+
+
+#------------------------------------------------------------------------------
+def command(line):
+    '''
+        handle a command from the serial port
+    '''
+    line = line.strip()
+    if line == 'telemetry':
+        report(config.telemetry_records)
+    elif line == 'dump':
+        # hex so the dump survives the serial terminal
+        print('TELEMETRY DUMP :', binascii.hexlify(dump()).decode())
+    elif line:
+        print('TELEMETRY : commands are telemetry and dump')
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+async def serial_task():
+    '''
+        read commands from the serial port without blocking the other tasks
+    '''
+    poller = select.poll()
+    poller.register(sys.stdin, select.POLLIN)
+    line = ''
+    while True:
+        while poller.poll(0):
+            character = sys.stdin.read(1)
+            if not character:
+                break
+            if character in '\r\n':
+                command(line)
+                line = ''
+            else:
+                line += character
+        await asyncio.sleep_ms(200)
@@ -0,0 +1,265 @@
+###############################################################################
+#
+#   Wifi connection manager for the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, fast reconnect to the access point of the last
+#             connection with an optional static IP, the radio is switched off
+#             or put in power save between the network work, connect times and
+#             radio on time per day
+###############################################################################
+import time
+import struct
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+import config # import the config file
+import log
+
+if config.run_system == 'pico':
+    import network
+
+STAT_GOT_IP = 3
+# BSSID and channel of the access point of the last connection
+CACHE_FORMAT = '<6sB'
+
+wlan    = None
+bssid   = b''       # access point of the last connection, empty when unknown
+channel = 0
+radio_on       = False
+radio_on_ticks = 0  # ticks_ms when the radio was switched on
+# the day the counters below are for, they start again at the first call of new_day() on the next day
+day            = 0
+day_connects   = 0
+day_fast       = 0  # connects to the cached access point that worked
+day_failures   = 0
+day_connect_ms = 0  # total time of the connects that worked
+day_radio_ms   = 0
+last_connect_ms = 0
+# (day, connects, fast, failures, connect ms, radio ms) of the days before, newest last
+history = []
+
+
+
+#------------------------------------------------------------------------------
+def init():
+    '''
+        prepare the interface, the radio stays off until the first connect,
+        the access point of the last connection comes from the flash
+    '''
+    global wlan, bssid, channel
+    if config.run_system != 'pico':
+        return 0
+    wlan = network.WLAN(network.STA_IF)
+    try:
+        with open(config.wifi_cache_file, 'rb') as f:
+            bssid, channel = struct.unpack(CACHE_FORMAT, f.read(struct.calcsize(CACHE_FORMAT)))
+        log.info('WIFI : last access point', ':'.join(['%02x' % byte for byte in bssid]), 'on channel', channel)
+    except:
+        bssid, channel = b'', 0
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def save_cache(new_bssid, new_channel):
+    '''
+        remember the access point for the next connect, also over a deepsleep or power cut
+    '''
+    global bssid, channel
+    if (new_bssid == bssid) and (new_channel == channel):
+        return 0
+    bssid, channel = new_bssid, new_channel
+    try:
+        with open(config.wifi_cache_file, 'wb') as f:
+            f.write(struct.pack(CACHE_FORMAT, bssid, channel))
+    except:
+        log.warning('WIFI : error while writing', config.wifi_cache_file)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def radio_up():
+    '''
+        switch the radio on with the power management of the config
+    '''
+    global radio_on, radio_on_ticks
+    if radio_on:
+        return 0
+    wlan.active(True)
+    radio_on = True
+    radio_on_ticks = time.ticks_ms()
+    # 'on' keeps the radio fully awake, the others let it doze between the beacons
+    mode = 'PM_NONE' if config.wifi_power == 'on' else 'PM_POWERSAVE'
+    try:
+        wlan.config(pm=getattr(network.WLAN, mode))
+    except:
+        pass
+    if config.wifi_static_ip:
+        # no DHCP, the address is there as soon as the access point accepts the tower
+        wlan.ifconfig(config.wifi_static_ip)
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def radio_down():
+    '''
+        switch the radio off, until the next connect
+    '''
+    global radio_on, day_radio_ms
+    if not radio_on:
+        return 0
+    day_radio_ms += time.ticks_diff(time.ticks_ms(), radio_on_ticks)
+    wlan.disconnect()
+    wlan.active(False)
+    radio_on = False
+    return 0
+
+
+
+#------------------------------------------------------------------------------
+def is_connected():
+    '''
+        True when the tower can use the network right now
+    '''
+    if config.run_system != 'pico':
+        return True
+    return radio_on and (wlan.status() == STAT_GOT_IP)
+
+
+
+#------------------------------------------------------------------------------
+def ip():
+    if config.run_system != 'pico':
+        return '0.0.0.0'
+    return wlan.ifconfig()[0]
+
+
+
+#------------------------------------------------------------------------------
+async def wait_connected(seconds):
+    '''
+        wait for the connect to finish or fail, the other tasks keep running
+        returns True when connected
+    '''
+    start = time.ticks_ms()
+    while time.ticks_diff(time.ticks_ms(), start) < seconds * 1000:
+        status = wlan.status()
+        if (status < 0) or (status >= STAT_GOT_IP):
+            break
+        await asyncio.sleep_ms(100)
+    return wlan.status() == STAT_GOT_IP
+
+
+
+#------------------------------------------------------------------------------
+def find_access_point():
+    '''
+        the strongest access point of the network, (bssid, channel) or None when it is not there
+    '''
+    best = None
+    try:
+        for ssid, found_bssid, found_channel, rssi, security, hidden in wlan.scan():
+            if (ssid.decode() == config.wifi_ssid) and ((best == None) or (rssi > best[2])):
+                best = (found_bssid, found_channel, rssi)
+    except:
+        log.warning('WIFI : error while scanning')
+    if best == None:
+        return None
+    return best[0], best[1]
+
+
+
+#------------------------------------------------------------------------------
+async def connect():
+    '''
+        (re)connect when needed, first to the access point of the last connection,
+        then with a scan for the strongest one, then a plain connect
+        returns True when connected
+    '''
+    global day_connects, day_fast, day_failures, day_connect_ms, last_connect_ms
+    if is_connected():
+        return True
+    start = time.ticks_ms()
+    radio_up()
+    day_connects += 1
+    connected = False
+    if bssid:
+        log.info('WIFI : reconnecting to the last access point...')
+        wlan.connect(config.wifi_ssid, config.wifi_password, bssid=bssid)
+        connected = await wait_connected(config.wifi_fast_timeout)
+        if connected:
+            day_fast += 1
+    if not connected:
+        log.info('WIFI : trying to connect...')
+        wlan.disconnect()
+        access_point = find_access_point()
+        if access_point != None:
+            wlan.connect(config.wifi_ssid, config.wifi_password, bssid=access_point[0])
+        else:
+            wlan.connect(config.wifi_ssid, config.wifi_password)
+        connected = await wait_connected(config.wifi_timeout)
+        if connected and (access_point != None):
+            save_cache(access_point[0], access_point[1])
+    if not connected:
+        day_failures += 1
+        log.warning('WIFI : connection failed')
+        return False
+    last_connect_ms = time.ticks_diff(time.ticks_ms(), start)
+    day_connect_ms += last_connect_ms
+    log.info('WIFI : connected in', last_connect_ms, 'ms, ip =', ip())
+    return True
+
+
+
+#------------------------------------------------------------------------------
+def idle(stay_on):
+    '''
+        the network work is done, switch the radio off unless wifi_power keeps it on
+        or another task has to keep listening (stay_on)
+    '''
+    if (config.run_system != 'pico') or stay_on or (config.wifi_power != 'off'):
+        return 0
+    return radio_down()
+
+
+
+#------------------------------------------------------------------------------
+def radio_ms_today():
+    '''
+        radio on time of the day so far, including the time it is on now
+    '''
+    if radio_on:
+        return day_radio_ms + time.ticks_diff(time.ticks_ms(), radio_on_ticks)
+    return day_radio_ms
+
+
+
+#------------------------------------------------------------------------------
+def new_day(day_today):
+    '''
+        close the counters of the day before when the day changed, keeps config.wifi_history_days,
+        the counters from before the first call count for the first day
+    '''
+    global day, day_connects, day_fast, day_failures, day_connect_ms, day_radio_ms, radio_on_ticks
+    if day_today == day:
+        return 0
+    if day == 0:
+        day = day_today
+        return 0
+    radio_ms = radio_ms_today()
+    history.append((day, day_connects, day_fast, day_failures, day_connect_ms, radio_ms))
+    del history[0:max(0, len(history) - config.wifi_history_days)]
+    log.info('WIFI : day', day, day_connects, 'connects,', day_fast, 'fast,', day_failures, 'failed,',
+             day_connect_ms // max(1, day_connects - day_failures), 'ms per connect, radio on', radio_ms // 1000, 's')
+    day = day_today
+    day_connects, day_fast, day_failures, day_connect_ms, day_radio_ms = 0, 0, 0, 0, 0
+    if radio_on:
+        radio_on_ticks = time.ticks_ms()
+    return 0
@@ -0,0 +1,19 @@
+###############################################################################
+#
+#   pytest setup for the tests of the trash container signal tower
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, the device code runs on CPython with the
+#             MicroPython functions of fleet/pc_compat.py
+###############################################################################
+#
+#   python -m pytest -q tests
+#
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fleet'))
+import pc_compat
+pc_compat.install()
@@ -0,0 +1,62 @@
+###############################################################################
+#
+#   Tests of the day number / color mask calendar index
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, pickup scanner with nested objects, index and lookup
+###############################################################################
+import calendar_index
+import dates
+
+TYPE_MASKS = {'0' : calendar_index.COLOR_MASKS['GRAY'], '2' : calendar_index.COLOR_MASKS['BLUE']}
+
+
+
+#------------------------------------------------------------------------------
+def scan_pickups(document, chunk_size=7):
+    days = {}
+    scanner = calendar_index.scanner_pickups(days, 'pickupDates', 'pickupType', TYPE_MASKS)
+    for start in range(0, len(document), chunk_size):
+        chunk = bytearray(document[start:start + chunk_size])
+        scanner.feed(chunk, len(chunk))
+    return days
+
+
+
+#------------------------------------------------------------------------------
+def test_pickups_of_every_entry():
+    document = (b'{"dataList": [{"pickupDates": ["2026-01-05T00:00:00", "2026-01-19T00:00:00"], "pickupType": 0},'
+                b' {"pickupType": 2, "pickupDates": ["2026-01-05T00:00:00"]}]}')
+    assert scan_pickups(document) == {dates.day_number(2026, 1, 5)  : 0x05,
+                                      dates.day_number(2026, 1, 19) : 0x01}
+
+
+
+#------------------------------------------------------------------------------
+def test_object_inside_an_entry_keeps_the_entry():
+    document = (b'{"dataList": [{"pickupType": 0, "pickupDates": ["2026-01-05"],'
+                b' "extra": {"pickupType": 2, "pickupDates": ["2026-01-06"]}, "after": 1},'
+                b' {"pickupType": 2, "pickupDates": ["2026-01-07"]}]}')
+    for chunk_size in (1, 7, len(document)):
+        assert scan_pickups(document, chunk_size) == {dates.day_number(2026, 1, 5) : 0x01,
+                                                      dates.day_number(2026, 1, 7) : 0x04}
+
+
+
+#------------------------------------------------------------------------------
+def test_unknown_type_gives_no_pickup():
+    document = b'[{"pickupType": 99, "pickupDates": ["2026-01-05"]}]'
+    assert calendar_index.build_index(scan_pickups(document)) == calendar_index.build_index({})
+
+
+
+#------------------------------------------------------------------------------
+def test_index_lookup():
+    days = {dates.day_number(2026, 1, 5) : 0x01, dates.day_number(2026, 1, 19) : 0x06, dates.day_number(2026, 1, 7) : 0}
+    index = calendar_index.build_index(days)
+    assert len(index) == 2
+    for day in range(dates.day_number(2026, 1, 1), dates.day_number(2026, 2, 1)):
+        assert calendar_index.lookup(index, day) == days.get(day, 0)
+    assert calendar_index.mask_to_colors(0x06) == ['GREEN', 'BLUE']
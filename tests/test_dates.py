@@ -0,0 +1,71 @@
+###############################################################################
+#
+#   Tests of the integer day number date engine
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, round trips of the day numbers and the summer
+#             time changeover days
+###############################################################################
+import time
+import calendar
+
+import config # import the config file
+import dates
+
+HOUR = 60*60
+
+
+
+#------------------------------------------------------------------------------
+def test_day_number_round_trip():
+    assert dates.day_number(2000, 1, 1) == 0
+    for number in range(-800, 60000):
+        year, month, day = dates.date_from_day_number(number)
+        assert dates.day_number(year, month, day) == number
+        assert time.gmtime(calendar.timegm((2000, 1, 1, 0, 0, 0)) + number*24*HOUR)[0:3] == (year, month, day)
+
+
+
+#------------------------------------------------------------------------------
+def test_day_string_round_trip():
+    for number in range(9000, 10000):
+        text = dates.day_string(number)
+        assert len(text) == 10
+        assert dates.day_number_from_string(text + 'T00:00:00') == number
+
+
+
+#------------------------------------------------------------------------------
+def test_leap_years_and_last_sundays():
+    assert dates.days_in_month(2024, 2) == 29
+    assert dates.days_in_month(2100, 2) == 28
+    assert dates.days_in_month(2000, 2) == 29
+    assert dates.last_sunday(2026, 3) == dates.day_number(2026, 3, 29)
+    assert dates.last_sunday(2026, 10) == dates.day_number(2026, 10, 25)
+
+
+
+#------------------------------------------------------------------------------
+def test_summer_time_changeover_days():
+    assert config.time_zone_offset_minutes == 60 and config.time_zone_dst
+    for year, month, length in ((2026, 3, 23), (2026, 10, 25), (2027, 3, 23), (2027, 10, 25)):
+        changeover = dates.last_sunday(year, month)
+        assert dates.day_start(changeover + 1) - dates.day_start(changeover) == length*HOUR
+        # the clocks change at 01:00 UTC
+        switch = calendar.timegm(dates.date_from_day_number(changeover) + (1, 0, 0))
+        winter, summer = (switch - 1, switch) if month == 3 else (switch, switch - 1)
+        assert dates.utc_offset(winter) == HOUR
+        assert dates.utc_offset(summer) == 2*HOUR
+
+
+
+#------------------------------------------------------------------------------
+def test_local_days_around_midnight():
+    for number in range(dates.day_number(2026, 1, 1), dates.day_number(2028, 1, 1)):
+        start = dates.day_start(number)
+        assert dates.local_day(start) == number
+        assert dates.local_day(start - 1) == number - 1
+        assert dates.next_midnight(start - 1) == start
+        assert dates.next_midnight(start) == dates.day_start(number + 1)
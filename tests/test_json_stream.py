@@ -0,0 +1,106 @@
+###############################################################################
+#
+#   Tests of the streaming JSON scanner
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, documents fed in chunks of every size and
+#             multi byte characters cut off at MAX_TOKEN
+###############################################################################
+import io
+import binascii
+
+import json_stream
+
+DOCUMENT = (b'{"name": "tower", "dates": ["2026-01-05", "2026-01-19"], "count": 12, '
+            b'"skip": {"dates": "x", "list": [1, [2, 3]]}, "quote": "a\\"b", "flag": true}')
+
+
+
+#------------------------------------------------------------------------------
+def scan(document, keys, chunk_size):
+    '''
+        feed the document in chunks of chunk_size bytes
+        returns the list of (key, value) and the scanner
+    '''
+    values = []
+    scanner = json_stream.Scanner(keys, lambda key, value: values.append((key, value)))
+    for start in range(0, len(document), chunk_size):
+        chunk = bytearray(document[start:start + chunk_size])
+        scanner.feed(chunk, len(chunk))
+    scanner.finish()
+    return values, scanner
+
+
+
+#------------------------------------------------------------------------------
+def test_every_chunk_size_gives_the_same_values():
+    expected = [('name', 'tower'), ('dates', '2026-01-05'), ('dates', '2026-01-19'), ('count', '12'),
+                ('dates', 'x'), ('quote', 'a"b'), ('flag', 'true')]
+    for chunk_size in range(1, len(DOCUMENT) + 1):
+        values, scanner = scan(DOCUMENT, ('name', 'dates', 'count', 'quote', 'flag'), chunk_size)
+        assert values == expected, chunk_size
+        assert scanner.bytes_read == len(DOCUMENT)
+        assert scanner.crc == binascii.crc32(DOCUMENT)
+
+
+
+#------------------------------------------------------------------------------
+def test_parse_reads_a_stream():
+    values = []
+    scanner = json_stream.Scanner(('count',), lambda key, value: values.append((key, value)))
+    assert json_stream.parse(io.BytesIO(DOCUMENT), scanner) == len(DOCUMENT)
+    assert values == [('count', '12')]
+
+
+
+#------------------------------------------------------------------------------
+def test_nested_arrays_keep_the_key_of_the_object():
+    values, scanner = scan(DOCUMENT, ('list',), 7)
+    assert values == [('list', '1'), ('list', '2'), ('list', '3')]
+
+
+
+#------------------------------------------------------------------------------
+def test_key_depth_and_object_end():
+    document = b'{"a": [{"type": "1", "inner": {"type": "2"}}]}'
+    found = []
+    ends = []
+    scanner = json_stream.Scanner(('type',), lambda key, value: found.append((value, scanner.key_depth)), ends.append)
+    scanner.feed(bytearray(document), len(document))
+    # the document is depth 1, the array 2, the entry 3 and the object inside it 4
+    assert found == [('1', 3), ('2', 4)]
+    assert ends == [4, 3, 1]
+
+
+
+#------------------------------------------------------------------------------
+def test_character_cut_off_at_max_token_is_dropped():
+    for character in ('é', '€', '\U0001f5d1'):
+        size = len(character.encode())
+        for ascii_count in range(json_stream.MAX_TOKEN - size + 1, json_stream.MAX_TOKEN):
+            text = 'a' * ascii_count + character + 'tail'
+            document = ('{"key": "' + text + '"}').encode()
+            for chunk_size in (1, 3, len(document)):
+                values, scanner = scan(document, ('key',), chunk_size)
+                assert values == [('key', 'a' * ascii_count)], (character, ascii_count, chunk_size)
+
+
+
+#------------------------------------------------------------------------------
+def test_character_that_fits_max_token_is_kept():
+    text = 'a' * (json_stream.MAX_TOKEN - 3) + '€'
+    values, scanner = scan(('{"key": "' + text + 'more"}').encode(), ('key',), 5)
+    assert values == [('key', text)]
+
+
+
+#------------------------------------------------------------------------------
+def test_token_text():
+    assert json_stream.token_text(bytearray('abé'.encode()), 4) == 'abé'
+    # only at MAX_TOKEN a cut off character is dropped, otherwise it is invalid UTF-8
+    token = bytearray(b'a' * (json_stream.MAX_TOKEN - 1) + b'\xc3')
+    assert json_stream.token_text(token, json_stream.MAX_TOKEN) == 'a' * (json_stream.MAX_TOKEN - 1)
+    assert json_stream.token_text(bytearray(b'a\xc3'), 2) == ''
+    assert json_stream.token_text(bytearray(b'\xff\xfe'), 2) == ''
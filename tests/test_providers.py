@@ -0,0 +1,54 @@
+###############################################################################
+#
+#   Tests of the provider requests
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, month paging of RD4 and range paging of Twente
+###############################################################################
+import providers
+import dates
+
+RD4    = {'company' : 'rd4', 'postal_code' : '6411AA', 'house_number' : '1'}
+TWENTE = {'company' : 'twente', 'company_code' : 'abc', 'address_id' : '42'}
+
+
+
+#------------------------------------------------------------------------------
+def test_month_paging():
+    first_day = dates.day_number(2026, 11, 20)
+    last_day  = dates.day_number(2027, 2, 3)
+    requests = providers.requests_for(RD4, first_day, last_day)
+    assert [request[0] for request in requests] == ['2026-11', '2026-12', '2027-1', '2027-2']
+    assert [request[5:7] for request in requests] == [
+        (first_day, dates.day_number(2026, 11, 30)),
+        (dates.day_number(2026, 12, 1), dates.day_number(2026, 12, 31)),
+        (dates.day_number(2027, 1, 1), dates.day_number(2027, 1, 31)),
+        (dates.day_number(2027, 2, 1), last_day)]
+    label, method, url, headers, body = requests[2][0:5]
+    assert method == 'GET' and body == None
+    assert url.endswith('?year=2027&postal_code=6411AA&house_number=1&month=1')
+
+
+
+#------------------------------------------------------------------------------
+def test_month_paging_within_one_month():
+    day = dates.day_number(2026, 2, 10)
+    requests = providers.requests_for(RD4, day, day)
+    assert len(requests) == 1
+    assert requests[0][5:7] == (day, day)
+
+
+
+#------------------------------------------------------------------------------
+def test_range_paging_starts_at_the_first_of_the_month():
+    last_day = dates.day_number(2026, 7, 31)
+    requests = providers.requests_for(TWENTE, dates.day_number(2026, 1, 20), last_day)
+    assert len(requests) == 1
+    label, method, url, headers, body, first_day, request_last = requests[0]
+    assert (first_day, request_last) == (dates.day_number(2026, 1, 1), last_day)
+    assert method == 'POST'
+    assert body == 'companyCode=abc&uniqueAddressID=42&startDate=2026-01-01&endDate=2026-07-31'
+    # every day of the month gives the same request, so its validators stay usable
+    assert providers.requests_for(TWENTE, dates.day_number(2026, 1, 31), last_day) == requests
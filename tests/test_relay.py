@@ -0,0 +1,55 @@
+###############################################################################
+#
+#   Tests of the calendar frames of the LAN relay
+#
+###############################################################################
+#
+#   2026 - October
+#           - first version, round trip, clamped horizon and rejected frames
+###############################################################################
+from array import array
+
+import relay
+
+KEY     = 0x12345678
+SENDER  = 7
+FETCHED = 1790000000
+
+
+
+#------------------------------------------------------------------------------
+def make_index(first_day, count):
+    return array('I', [((first_day + 7*position) << 8) | (1 << (position % 5)) for position in range(count)])
+
+
+
+#------------------------------------------------------------------------------
+def test_round_trip():
+    index = make_index(9500, 40)
+    frame = relay.pack_frame(KEY, SENDER, FETCHED, 9800, index)
+    assert relay.read_frame(frame, KEY) == (SENDER, FETCHED, 9800, index)
+
+
+
+#------------------------------------------------------------------------------
+def test_horizon_is_clamped_when_records_are_left_out():
+    index = make_index(9500, relay.MAX_RECORDS + 10)
+    sender, fetched, horizon, received = relay.read_frame(relay.pack_frame(KEY, SENDER, FETCHED, 20000, index), KEY)
+    assert received == index[0:relay.MAX_RECORDS]
+    # the day before the first record that did not fit
+    assert horizon == (index[relay.MAX_RECORDS] >> 8) - 1
+    # a horizon before the cut stays
+    assert relay.read_frame(relay.pack_frame(KEY, SENDER, FETCHED, 9600, index), KEY)[2] == 9600
+
+
+
+#------------------------------------------------------------------------------
+def test_bad_frames_are_rejected():
+    frame = relay.pack_frame(KEY, SENDER, FETCHED, 9800, make_index(9500, 10))
+    for position in (0, 9, 20, len(frame) - 10, len(frame) - 1):
+        damaged = bytearray(frame)
+        damaged[position] ^= 0x01
+        assert relay.read_frame(bytes(damaged), KEY) == None, position
+    assert relay.read_frame(frame[0:-1], KEY) == None
+    assert relay.read_frame(frame[0:10], KEY) == None
+    assert relay.read_frame(frame, KEY + 1) == None